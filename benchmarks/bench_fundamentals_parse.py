@@ -0,0 +1,113 @@
+'''
+Compare the fundamentals table extraction and clean_data with their previous implementation.
+
+Usage:
+    python benchmarks/bench_fundamentals_parse.py [--pages DIR] [--repeat N]
+
+Without --pages, synthetic expanded Screener.in pages from fixtures.py are used. With --pages,
+every *.html file saved in DIR (an expanded company page) is parsed instead.
+'''
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from marketminer.fundamentals_scraper import _parse_page, _find_tables, _table_frame, clean_data
+
+from fixtures import screener_page
+
+_TITLES = {
+    "profit_loss": "Profit & Loss",
+    "balance_sheet": "Balance Sheet",
+    "cash_flows": "Cash Flows",
+    "ratios": "Ratios",
+}
+
+
+def _reference_clean_data(x):
+    # clean_data before vectorisation
+    x = x.T
+    x.columns = x.iloc[0]
+    a = list(x.index)
+    a[0] = 0
+    a = [''.join(filter(str.isdigit, str(item))) for item in a]
+    a = [int(item) for item in a]
+    x.index = a
+    x = x.drop(0)
+    x = x.replace({',': '', '%': ''}, regex=True)
+    x = x.apply(pd.to_numeric)
+    x.columns = x.columns.str.strip()
+    x.columns = x.columns.str.replace(' ', '')
+    x.columns = x.columns.str.replace('+', '')
+    x.columns = x.columns.str.replace('%', '')
+    x.columns = x.columns.str.replace('-', '')
+    x.columns = x.columns.str.strip()
+    return x
+
+
+def _reference_parse_page(html):
+    # One find() and one row loop per statement, as before
+    soup = BeautifulSoup(html, 'html.parser')
+    data = {}
+    for key, title in _TITLES.items():
+        table = soup.find('h2', string=title).find_next('table')
+        headers = [header.text.strip() for header in table.find_all('th')]
+        rows = []
+        for row in table.find_all('tr')[1:]:
+            rows.append([ele.text.strip().replace(',', '') for ele in row.find_all('td')])
+        frame = pd.DataFrame(rows, columns=headers).drop(columns='TTM', errors='ignore')
+        data[key] = _reference_clean_data(frame)
+    return data
+
+
+def _best(func, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", help="Directory with saved, expanded Screener.in pages (*.html)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [open(p, encoding="utf-8").read() for p in sorted(glob.glob(os.path.join(args.pages, "*.html")))]
+    else:
+        pages = [screener_page(seed) for seed in range(20)]
+
+    # Same output as before, up to int64 columns now being float64
+    for page in pages:
+        new, old = _parse_page(page), _reference_parse_page(page)
+        for key in _TITLES:
+            pd.testing.assert_frame_equal(new[key], old[key].astype("float64"))
+    print(f"{len(pages)} pages, outputs identical")
+
+    raw = []
+    for page in pages:
+        tables = _find_tables(BeautifulSoup(page, 'html.parser'))
+        raw.extend(_table_frame(tables[title]) for title in _TITLES.values())
+
+    print(f"{'stage':<22}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for stage, before, after, items in (
+        ("clean_data / table", _reference_clean_data, clean_data, raw),
+        ("parse page", _reference_parse_page, _parse_page, pages),
+    ):
+        old_ms, new_ms = _best(before, items, args.repeat), _best(after, items, args.repeat)
+        print(f"{stage:<22}{old_ms:>12.3f}{new_ms:>12.3f}{old_ms / new_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+'''
+Compare the HTML parsing backends of the news scraper on archive and article pages.
+
+Usage:
+    python benchmarks/bench_html_parsers.py [--pages DIR] [--repeat N]
+
+Without --pages, synthetic Economic Times-like pages from fixtures.py are used. With --pages,
+every archive*.html and article*.html file saved in DIR is parsed instead.
+'''
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from marketminer.html_parsers import (
+    ARCHIVE_SELECTOR,
+    BODY_SELECTOR,
+    available_backends,
+    extract_archive_links,
+    extract_article_body,
+)
+
+from fixtures import archive_page, article_page
+
+
+def _load(pages_dir):
+    if pages_dir is None:
+        return [archive_page(45000 + i) for i in range(5)], [article_page(10_000 + i) for i in range(50)]
+    def read(pattern):
+        paths = sorted(glob.glob(os.path.join(pages_dir, pattern)))
+        return [open(p, encoding="utf-8").read() for p in paths]
+    return read("archive*.html"), read("article*.html")
+
+
+def _full_tree_links(html, backend=None):
+    # The original approach: a full html.parser tree for every page
+    soup = BeautifulSoup(html, "html.parser")
+    return [(a.text, a.get("href", "")) for a in soup.select(ARCHIVE_SELECTOR)]
+
+
+def _full_tree_body(html, backend=None):
+    soup = BeautifulSoup(html, "html.parser")
+    return ' '.join(p.get_text() for p in soup.select(BODY_SELECTOR))
+
+
+def _time(func, pages, backend, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            func(page, backend)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(pages), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", help="Directory with saved archive*.html / article*.html pages")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    archives, articles = _load(args.pages)
+    backends = available_backends()
+    print(f"{len(archives)} archive pages, {len(articles)} article pages, backends: {', '.join(backends)}")
+
+    # All backends must agree before their speed means anything
+    reference = [extract_article_body(page, "bs4") for page in articles]
+    for backend in backends:
+        bodies = [extract_article_body(page, backend) for page in articles]
+        if [" ".join(b.split()) for b in bodies] != [" ".join(b.split()) for b in reference]:
+            print(f"WARNING: {backend} article bodies differ from bs4")
+        links = [extract_archive_links(page, backend) for page in archives]
+        if links != [extract_archive_links(page, "bs4") for page in archives]:
+            print(f"WARNING: {backend} archive links differ from bs4")
+
+    print(f"{'backend':<12}{'archive ms/page':>18}{'article ms/page':>18}")
+    for backend in backends:
+        archive_ms = _time(extract_archive_links, archives, backend, args.repeat) * 1000
+        article_ms = _time(extract_article_body, articles, backend, args.repeat) * 1000
+        print(f"{backend:<12}{archive_ms:>18.2f}{article_ms:>18.2f}")
+    archive_ms = _time(_full_tree_links, archives, None, args.repeat) * 1000
+    article_ms = _time(_full_tree_body, articles, None, args.repeat) * 1000
+    print(f"{'bs4 (full)':<12}{archive_ms:>18.2f}{article_ms:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+'''
+Measure the cold import time of marketminer and of each scraper entry point.
+
+Usage:
+    python benchmarks/bench_import_time.py [--repeat N] [--budget-ms MS]
+
+Every statement runs in a fresh interpreter. The script exits with status 1 when
+`import marketminer` loads a heavy dependency or takes longer than --budget-ms, so it
+can guard against import-time regressions in CI.
+'''
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies `import marketminer` alone must not load
+HEAVY = ("pandas", "numpy", "selenium", "aiohttp", "bs4", "requests", "pyarrow")
+
+STATEMENTS = {
+    "import marketminer": "import marketminer",
+    "news": "from marketminer import scrape_economic_times",
+    "fundamentals": "from marketminer import scrape_fundamentals",
+    "macros": "from marketminer import scrape_macro_india",
+}
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted({{m.split(".")[0] for m in sys.modules}})}}))
+'''
+
+
+def _measure(statement):
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Limit for a bare `import marketminer`")
+    args = parser.parse_args()
+
+    print(f"{'statement':<20}{'median ms':>12}  heavy modules loaded")
+    failed = False
+    for name, statement in STATEMENTS.items():
+        runs = [_measure(statement) for _ in range(args.repeat)]
+        ms = statistics.median(run["ms"] for run in runs)
+        heavy = [module for module in HEAVY if module in runs[0]["modules"]]
+        print(f"{name:<20}{ms:>12.1f}  {', '.join(heavy) or '-'}")
+        if name == "import marketminer" and (heavy or ms > args.budget_ms):
+            failed = True
+
+    if failed:
+        print(f"FAIL: `import marketminer` must load no heavy dependency and take under {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+'''
+Compare the RBI workbook readers with the previous pandas.read_excel path.
+
+Usage:
+    python benchmarks/bench_macro_excel.py [--periods N] [--repeat N]
+
+Synthetic workbooks shaped like the two RBI DBIE files are generated with fixtures.py.
+'''
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from marketminer.excel_readers import available_backends
+from marketminer.macros_scraper import clean_data
+
+from fixtures import rbi_workbook
+
+
+def _reference_clean_data(main, file_path):
+    # clean_data before the reader backends
+    df = pd.read_excel(file_path, sheet_name=None, engine='openpyxl', header=3 if main else 1)
+    cleaned_data = {}
+    for sheet_name, sheet_data in df.items():
+        sheet_data = sheet_data.iloc[:, 1:]
+        if not main:
+            sheet_data = sheet_data.drop(sheet_data.index[:1])
+        sheet_data.set_index(sheet_data.columns[0], inplace=True, drop=True)
+        sheet_data.index = pd.to_datetime(sheet_data.index, errors='coerce')
+        sheet_data = sheet_data.loc[:, ~sheet_data.columns.str.contains('^Unnamed')]
+        sheet_data.sort_index(inplace=True)
+        cleaned_data[sheet_name] = sheet_data
+    return cleaned_data
+
+
+def _best(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--periods", type=int, default=520, help="Rows per sheet")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for main_file in (True, False):
+            paths[main_file] = os.path.join(tmp, f"{'main' if main_file else 'other'}.xlsx")
+            rbi_workbook(paths[main_file], main_file, args.periods)
+
+        # Same values as before once '-' cells are typed as NaN. Dates stored as text are compared
+        # apart: read_excel guessed their format and read dd-mm-yyyy as mm-dd-yyyy
+        for main_file, path in paths.items():
+            old = _reference_clean_data(main_file, path)
+            for backend in available_backends():
+                new = clean_data(main_file, path, reader=backend)
+                for sheet, frame in new.items():
+                    expected = old[sheet].apply(pd.to_numeric, errors="coerce").astype("float64")
+                    common = frame.index.intersection(expected.index)
+                    assert len(common) >= 0.98 * len(frame), (sheet, len(common), len(frame))
+                    pd.testing.assert_frame_equal(
+                        frame.loc[common], expected.loc[common],
+                        check_index_type=False, check_column_type=False, check_names=False,
+                    )
+        print(f"{args.periods} rows per sheet, outputs match ({', '.join(available_backends())})")
+
+        print(f"{'workbook':<10}{'reader':<12}{'ms':>10}{'speedup':>10}")
+        for main_file, path in paths.items():
+            name = "main" if main_file else "other"
+            old_ms = _best(lambda: _reference_clean_data(main_file, path), args.repeat)
+            print(f"{name:<10}{'read_excel':<12}{old_ms:>10.1f}{1:>9.1f}x")
+            for backend in available_backends():
+                new_ms = _best(lambda: clean_data(main_file, path, reader=backend), args.repeat)
+                print(f"{name:<10}{backend:<12}{new_ms:>10.1f}{old_ms / new_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
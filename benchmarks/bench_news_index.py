@@ -0,0 +1,100 @@
+'''
+Compare regex scans of article bodies with NewsIndex for ticker/company lookups.
+
+Usage:
+    python benchmarks/bench_news_index.py [--articles N] [--entities N] [--repeat N]
+
+A synthetic corpus (one article body of fixtures-style sentences per row, with company names
+sprinkled in) is scanned with one compiled regex per entity, the way ad-hoc notebooks do it, and
+indexed once with NewsIndex; then the articles of one entity over a quarter are looked up both ways.
+'''
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from marketminer.news_index import NewsIndex, ahocorasick
+from marketminer.news_scraper import _to_frame
+
+from fixtures import _sentence
+
+
+def _corpus(n_articles, aliases, seed=0):
+    rng = random.Random(seed)
+    names = [name for names in aliases.values() for name in names]
+    start = pd.Timestamp("2021-01-01")
+    records = []
+    for i in range(n_articles):
+        sentences = [_sentence(rng, 25) for _ in range(12)]
+        for _ in range(rng.randint(0, 4)):
+            sentences.insert(rng.randrange(len(sentences)), f"{rng.choice(names)} shares moved.")
+        records.append({
+            "date": start + pd.Timedelta(days=i * 3 * 365 // n_articles),
+            "article_id": str(i),
+            "headline": _sentence(rng, 9),
+            "link": f"https://economictimes.indiatimes.com/markets/articleshow/{i}.cms",
+            "body": " ".join(sentences),
+        })
+    return _to_frame(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--entities", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200, help="Lookups timed per method")
+    args = parser.parse_args()
+
+    aliases = {f"T{i:04d}": [f"T{i:04d}", f"Company {i} Ltd"] for i in range(args.entities)}
+    aliases["INFY"] = ["INFY", "Infosys"]
+    df = _corpus(args.articles, aliases)
+    print(f"{len(df)} articles, {len(aliases)} entities, pyahocorasick {'installed' if ahocorasick else 'missing'}")
+
+    start = time.perf_counter()
+    patterns = {
+        entity: re.compile(r"\b(?:" + "|".join(map(re.escape, names)) + r")\b", re.IGNORECASE)
+        for entity, names in aliases.items()
+    }
+    texts = (df["headline"] + " " + df["body"]).tolist()
+    regex_hits = {entity: [i for i, text in enumerate(texts) if pattern.search(text)] for entity, pattern in patterns.items()}
+    print(f"{'regex scan, all entities':<34}{time.perf_counter() - start:>10.2f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("pyahocorasick", "python") if ahocorasick else ("python",):
+            with NewsIndex(os.path.join(tmp, f"{backend}.sqlite"), aliases, backend=backend) as index:
+                start = time.perf_counter()
+                index.add(df)
+                print(f"{'NewsIndex.add (' + backend + ')':<34}{time.perf_counter() - start:>10.2f} s")
+                indexed = sorted(map(int, index.query("INFY")))
+                assert indexed == regex_hits["INFY"], "index and regex disagree"
+
+        with NewsIndex(os.path.join(tmp, "python.sqlite"), backend="python") as index:
+            q_start, q_end = "2022-04-01", "2022-06-30"
+            in_q2 = (df.index >= q_start) & (df.index <= q_end)
+            pattern = patterns["INFY"]
+            q2_texts = [text for text, keep in zip(texts, in_q2) if keep]
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                hits = [text for text in q2_texts if pattern.search(text)]
+            regex_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                ids = index.query("INFY", q_start, q_end)
+            index_ms = (time.perf_counter() - start) / args.repeat * 1000
+            assert len(ids) == len(hits)
+            print(f"{'INFY in Q2 2022, regex':<34}{regex_ms:>10.3f} ms  ({len(hits)} articles)")
+            print(f"{'INFY in Q2 2022, NewsIndex.query':<34}{index_ms:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+'''
+Compare the memory and disk footprint of scraped news in the plain and compact formats.
+
+Usage:
+    python benchmarks/bench_news_storage.py [--parquet PATH] [--articles N]
+
+Use --parquet with a dataset written by write_economic_times_parquet (or any file read_news_parquet
+reads) to measure real Economic Times articles. Otherwise a synthetic corpus is generated; its bodies use a tiny vocabulary, so
+its compression ratios say little about real articles.
+'''
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from marketminer.news_scraper import _to_frame
+from marketminer.news_store import read_news_parquet, to_arrow_strings, write_news_parquet
+
+from fixtures import _sentence
+
+
+def _corpus(n_articles, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n_articles):
+        article_id = 100000000 + i * 7
+        headline = _sentence(rng, 10)
+        slug = headline.lower().rstrip(".").replace(" ", "-")
+        records.append({
+            "date": pd.Timestamp("2021-01-01") + pd.Timedelta(days=i // 100),
+            "article_id": str(article_id),
+            "headline": headline,
+            "link": f"https://economictimes.indiatimes.com/markets/stocks/news/{slug}/articleshow/{article_id}.cms",
+            # A rupee sign makes CPython store the whole body with two bytes per character
+            "body": " ".join(_sentence(rng, 30) for _ in range(rng.randint(8, 20))) + " Target price ₹1,250.",
+        })
+    return _to_frame(records)
+
+
+def _mb(n):
+    return f"{n / 1024 ** 2:>9.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--parquet", help="Parquet file or dataset of scraped articles to measure instead of a synthetic corpus")
+    parser.add_argument("--articles", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.parquet:
+        df = read_news_parquet(args.parquet, dtype_backend=None)
+    else:
+        df = _corpus(args.articles)
+    text = ["article_id", "headline", "link", "body"]
+    objects = df.astype({column: object for column in text})
+    arrow = to_arrow_strings(df)
+    print(f"{len(df)} articles")
+    print(f"{'in memory, Python str objects':<34}{_mb(objects.memory_usage(deep=True).sum())}")
+    print(f"{'in memory, Arrow strings':<34}{_mb(arrow.memory_usage(deep=True).sum())}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, compact in (("plain", False), ("compact", True)):
+            path = os.path.join(tmp, f"{name}.parquet")
+            start = time.perf_counter()
+            write_news_parquet(df, path, compact=compact)
+            write_s = time.perf_counter() - start
+            start = time.perf_counter()
+            read_news_parquet(path)
+            read_s = time.perf_counter() - start
+            print(f"{'on disk, ' + name:<34}{_mb(os.path.getsize(path))}  write {write_s:.2f} s, read {read_s:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
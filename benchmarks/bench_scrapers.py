@@ -0,0 +1,277 @@
+'''
+End-to-end throughput of the three scrapers against local stand-in servers.
+
+Usage:
+    python benchmarks/bench_scrapers.py [--stages news,fundamentals,fundamentals_browser,macros]
+        [--days N] [--articles N] [--pages DIR] [--latency S] [--error-rate R]
+        [--tickers N] [--workers N] [--sections all] [--periods N] [--output results.json]
+
+Every stage runs in its own interpreter so its peak RSS is its own. The report (printed and
+optionally written as JSON together with the git commit) holds articles/sec, tickers/min,
+peak RSS and per-stage latency percentiles, so results can be compared across commits.
+
+- news: scrape_economic_times against an Economic Times stand-in (synthetic or --pages recorded
+  pages, with --latency and --error-rate injected on article requests).
+- fundamentals: scrape_fundamentals over HTTP against a Screener.in stand-in, extracting the
+  comma separated --sections (default: the four statements).
+- fundamentals_browser: the same in headless Chrome; skipped when Chrome is not installed.
+- macros: scrape_macro_india on generated RBI-shaped workbooks. The browser download is replaced
+  by a copy of the workbook, so the stage measures parsing, merging and the store.
+'''
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+STAGES = ("news", "fundamentals", "fundamentals_browser", "macros")
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)
+
+
+def _summary(seconds):
+    '''
+    Latency percentiles in milliseconds of a list of durations in seconds.
+    '''
+    if not seconds:
+        return None
+    ordered = sorted(seconds)
+
+    def pct(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {"n": len(ordered), "p50_ms": pct(0.5), "p95_ms": pct(0.95), "max_ms": round(ordered[-1] * 1000, 2)}
+
+
+def _timed(func, durations):
+    '''
+    Wrap a sync or async function so every call's duration is appended to durations.
+    '''
+    import asyncio
+    import functools
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                durations.append(time.perf_counter() - start)
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                durations.append(time.perf_counter() - start)
+    return wrapper
+
+
+def _bench_news(args):
+    import logging
+
+    from marketminer import news_scraper as ns
+    from marketminer.fetcher import FetchConfig
+    from servers import EconomicTimesServer
+
+    logging.getLogger("marketminer").setLevel(logging.ERROR)
+    latency = {"archive_day": [], "article": [], "parse_archive": [], "parse_body": []}
+    ns._Crawler._crawl_day = _timed(ns._Crawler._crawl_day, latency["archive_day"])
+    ns.process_article = _timed(ns.process_article, latency["article"])
+    ns.extract_archive_links = _timed(ns.extract_archive_links, latency["parse_archive"])
+    ns.extract_article_body = _timed(ns.extract_article_body, latency["parse_body"])
+
+    with EconomicTimesServer(args.articles, args.pages, args.latency, args.error_rate) as server:
+        ns._BASE = server.url
+        start_date = date(2024, 1, 1)
+        end_date = start_date + timedelta(days=args.days - 1)
+        config = FetchConfig(backoff_base=0.05, backoff_max=1, initial_rate=1000, max_rate=5000)
+        start = time.perf_counter()
+        df = ns.scrape_economic_times(start_date, end_date, concurrency=args.concurrency, fetch_config=config)
+        seconds = time.perf_counter() - start
+        requests, errors = server.requests, server.errors
+
+    return {
+        "articles": len(df),
+        "seconds": round(seconds, 3),
+        "articles_per_sec": round(len(df) / seconds, 1),
+        "failed_days": len(df.attrs.get("failed", {})),
+        "requests": requests,
+        "injected_errors": errors,
+        "latency": {name: _summary(values) for name, values in latency.items()},
+    }
+
+
+def _bench_fundamentals(args, mode):
+    import logging
+
+    from marketminer import fundamentals_scraper as fs
+    from servers import ScreenerServer
+
+    logging.getLogger("marketminer").setLevel(logging.ERROR)
+    if mode == "browser":
+        browsers = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+        if not any(shutil.which(name) for name in browsers):
+            return {"skipped": "Chrome is not installed"}
+
+    with ScreenerServer(args.latency) as server:
+        fs._BASE = f"{server.url}/company/"
+        fs._SCHEDULES_API = f"{server.url}/api/company/{{company_id}}/schedules/"
+        fs._PEERS_API = f"{server.url}/api/company/{{warehouse_id}}/peers/"
+        tickers = [f"T{i:04d}" for i in range(args.tickers)]
+        sections = None if args.sections is None else args.sections if args.sections == "all" else args.sections.split(",")
+        start = time.perf_counter()
+        with fs.FundamentalsSession(args.workers, mode=mode, sections=sections) as session:
+            results, errors = session.scrape_many(tickers)
+            timings = dict(session.timings)
+        seconds = time.perf_counter() - start
+
+    phases = {}
+    for ticker_timings in timings.values():
+        for phase, value in ticker_timings.items():
+            phases.setdefault(phase, []).append(value)
+    return {
+        "tickers": len(results),
+        "errors": len(errors),
+        "seconds": round(seconds, 3),
+        "tickers_per_min": round(len(results) / seconds * 60, 1),
+        "latency": {phase: _summary(values) for phase, values in phases.items()},
+    }
+
+
+def _bench_macros(args):
+    import logging
+
+    from marketminer import macros_scraper as ms
+    from fixtures import rbi_workbook
+
+    logging.getLogger("marketminer").setLevel(logging.ERROR)
+    latency = {"download": [], "parse": [], "scrape": [], "store_hit": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        workbooks = {}
+        for source, (_, main) in ms._RBI_SOURCES.items():
+            workbooks[source] = os.path.join(tmp, f"{source}.xlsx")
+            rbi_workbook(workbooks[source], main, args.periods)
+
+        def download(button_text, filename, download_dir="macro_downloads", timeout=None):
+            # The browser download is replaced by a copy of the generated workbook
+            os.makedirs(download_dir, exist_ok=True)
+            if args.latency:
+                time.sleep(args.latency)
+            source = next(s for s, (text, _) in ms._RBI_SOURCES.items() if text == button_text)
+            return shutil.copy(workbooks[source], os.path.join(download_dir, filename))
+
+        ms.download_rbi_file = _timed(download, latency["download"])
+        ms.clean_data = _timed(ms.clean_data, latency["parse"])
+        scrape = _timed(ms.scrape_macro_india, latency["scrape"])
+        for _ in range(args.repeat):
+            data = scrape()
+
+        store = os.path.join(tmp, "store")
+        ms.scrape_macro_india(store=store)
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ms.scrape_macro_india("2010-01-01", "2015-12-31", store=store)
+            latency["store_hit"].append(time.perf_counter() - start)
+
+    return {
+        "sheets": len(data),
+        "rows": sum(len(frame) for frame in data.values()),
+        "latency": {name: _summary(values) for name, values in latency.items()},
+    }
+
+
+def _run_stage(stage, args):
+    if stage == "news":
+        result = _bench_news(args)
+    elif stage == "fundamentals":
+        result = _bench_fundamentals(args, "http")
+    elif stage == "fundamentals_browser":
+        result = _bench_fundamentals(args, "browser")
+    else:
+        result = _bench_macros(args)
+    if "skipped" not in result:
+        result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma separated subset of {STAGES}")
+    parser.add_argument("--days", type=int, default=5, help="Archive days scraped by the news stage")
+    parser.add_argument("--articles", type=int, default=100, help="Articles per synthetic archive page")
+    parser.add_argument("--pages", help="Directory with recorded archive/*.html and article/*.html pages")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of article requests failing with 503")
+    parser.add_argument("--tickers", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sections", help="Fundamentals sections to extract, comma separated or 'all'")
+    parser.add_argument("--periods", type=int, default=520, help="Rows per sheet of the generated workbooks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        print(json.dumps(_run_stage(args.run_stage, args)))
+        return
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "run_stage")},
+        "stages": {},
+    }
+    for stage in args.stages.split(","):
+        if stage not in STAGES:
+            parser.error(f"unknown stage {stage!r}")
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-stage", stage] + sys.argv[1:],
+            cwd=HERE, capture_output=True, text=True,
+        )
+        if out.returncode:
+            report["stages"][stage] = {"error": out.stderr.strip().splitlines()[-1] if out.stderr else "failed"}
+        else:
+            report["stages"][stage] = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{stage}: {json.dumps(report['stages'][stage])}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+'''
+Synthetic pages shaped like the sites marketminer scrapes, for offline benchmarks.
+'''
+
+import random
+
+_WORDS = (
+    "market shares index sensex nifty rupee crore bank profit quarter growth investors rally "
+    "inflation rbi policy rate earnings revenue stock exchange sebi fund demand export"
+).split()
+
+_BOILERPLATE = (
+    "<head><title>Economic Times</title>"
+    + "".join(f'<script src="/js/bundle{i}.js"></script>' for i in range(20))
+    + "<style>" + "body{margin:0}" * 200 + "</style></head>"
+)
+
+_NAV = "<nav>" + "".join(f'<a href="/section{i}">Section {i}</a>' for i in range(150)) + "</nav>"
+
+
+def _sentence(rng, n=18):
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def archive_page(serial, n_articles=200, seed=None):
+    '''
+    An archivelist page listing n_articles links across the scraped sections plus unrelated links.
+    '''
+    rng = random.Random(serial if seed is None else seed)
+    sections = ("markets/stocks/news", "industry/banking/finance", "tech/technology", "news/politics")
+    items = []
+    for i in range(n_articles):
+        section = sections[i % len(sections)]
+        article_id = serial * 1000 + i
+        items.append(
+            f'<li><a href="/{section}/story-{article_id}/articleshow/{article_id}.cms">{_sentence(rng, 9)}</a></li>'
+        )
+    return f"<html>{_BOILERPLATE}<body>{_NAV}<ul class='content'>{''.join(items)}</ul></body></html>"
+
+
+def article_page(article_id, n_paragraphs=12):
+    '''
+    An articleshow page with the body in .artText plus navigation, related stories and comments.
+    '''
+    rng = random.Random(article_id)
+    paragraphs = "".join(f"<p>{_sentence(rng, 30)}</p>" for _ in range(n_paragraphs))
+    related = "".join(
+        f'<div class="story"><a href="/markets/x/articleshow/{article_id + i}.cms">{_sentence(rng, 8)}</a></div>'
+        for i in range(60)
+    )
+    comments = "".join(f'<div class="comment"><span>{_sentence(rng, 15)}</span></div>' for _ in range(40))
+    return (
+        f"<html>{_BOILERPLATE}<body>{_NAV}<article><h1>{_sentence(rng, 10)}</h1>"
+        f'<div class="artText">{paragraphs}<div class="Normal">{_sentence(rng, 20)}</div></div>'
+        f"</article><aside>{related}</aside><section>{comments}</section></body></html>"
+    )
+
+
+_SCREENER_SECTIONS = (
+    ("profit-loss", "Profit & Loss", (
+        "Sales", "Expenses", "Operating Profit", "OPM %", "Other Income", "Interest", "Depreciation",
+        "Profit before tax", "Tax %", "Net Profit", "EPS in Rs", "Dividend Payout %",
+    )),
+    ("balance-sheet", "Balance Sheet", (
+        "Equity Capital", "Reserves", "Borrowings", "Other Liabilities", "Total Liabilities",
+        "Fixed Assets", "CWIP", "Investments", "Other Assets", "Total Assets",
+    )),
+    ("cash-flow", "Cash Flows", (
+        "Cash from Operating Activity", "Cash from Investing Activity", "Cash from Financing Activity",
+        "Net Cash Flow",
+    )),
+    ("ratios", "Ratios", (
+        "Debtor Days", "Inventory Days", "Days Payable", "Cash Conversion Cycle", "Working Capital Days",
+        "ROCE %",
+    )),
+)
+_SCREENER_QUARTERS = (
+    "Sales", "Expenses", "Operating Profit", "OPM %", "Other Income", "Interest", "Depreciation",
+    "Profit before tax", "Tax %", "Net Profit", "EPS in Rs",
+)
+_SCREENER_SHAREHOLDING = ("Promoters +", "FIIs +", "DIIs +", "Public +", "No. of Shareholders")
+_SCREENER_PEER_COLUMNS = (
+    "S.No.", "Name", "CMP Rs.", "P/E", "Mar Cap Rs.Cr.", "Div Yld %", "NP Qtr Rs.Cr.", "Qtr Profit Var %",
+    "Sales Qtr Rs.Cr.", "Qtr Sales Var %", "ROCE %",
+)
+# Rows with an expand button, and the sub-rows the button reveals
+_SCREENER_SCHEDULES = {
+    "Sales": ("Sales Growth %",),
+    "Expenses": ("Material Cost %", "Employee Cost %", "Power and Fuel", "Other Mfr. Exp %", "Selling and admin %"),
+    "Other Income": ("Exceptional items", "Other income normal"),
+    "Net Profit": ("Profit from Associates", "Minority share"),
+    "Borrowings": ("Long term Borrowings", "Short term Borrowings", "Lease Liabilities"),
+    "Other Liabilities": ("Trade Payables", "Advance from Customers", "Other liability items"),
+    "Fixed Assets": ("Land", "Building", "Plant Machinery", "Gross Block", "Accumulated Depreciation"),
+    "Other Assets": ("Inventories", "Trade receivables", "Cash Equivalents", "Loans n Advances"),
+    "Cash from Operating Activity": ("Profit from operations", "Working capital changes", "Direct taxes"),
+}
+
+
+def _screener_value(rng, label):
+    if "%" in label:
+        return f"{rng.randint(-20, 80)}%"
+    return f"{rng.uniform(-5000, 250000):,.0f}"
+
+
+def screener_periods(section, years=12):
+    '''
+    Column headings of a table: fiscal years, or the last quarters for the quarterly tables.
+    '''
+    if section in ("quarters", "shareholding"):
+        return [f"{('Mar', 'Jun', 'Sep', 'Dec')[i % 4]} {2021 + i // 4}" for i in range(years)]
+    return [f"Mar {2024 - years + 1 + i}" for i in range(years)]
+
+
+def screener_peers(seed=0, n=10):
+    '''
+    The peer comparison table, as served by the peers endpoint and inserted by the page's script.
+    '''
+    rng = random.Random(f"{seed}-peers")
+    header = "".join(f"<th>{column}</th>" for column in _SCREENER_PEER_COLUMNS)
+    rows = []
+    for i in range(n):
+        values = "".join(f"<td>{rng.uniform(1, 5000):,.2f}</td>" for _ in _SCREENER_PEER_COLUMNS[2:])
+        rows.append(f'<tr><td>{i + 1}.</td><td class="text"><a href="/company/P{seed}{i}/">Peer {seed}-{i}</a></td>{values}</tr>')
+    median = "".join(f"<td>{rng.uniform(1, 5000):,.2f}</td>" for _ in _SCREENER_PEER_COLUMNS[2:])
+    return (
+        f'<table class="data-table"><tbody><tr>{header}</tr>{"".join(rows)}</tbody>'
+        f'<tfoot><tr><td></td><td>Median: {n} Co.</td>{median}</tr></tfoot></table>'
+    )
+
+
+def _screener_ratios(rng):
+    price = rng.uniform(50, 5000)
+    low = price * rng.uniform(0.6, 0.95)
+    items = (
+        ("Market Cap", f"₹ <span class=\"number\">{rng.uniform(1e3, 2e6):,.0f}</span> Cr."),
+        ("Current Price", f"₹ <span class=\"number\">{price:,.0f}</span>"),
+        ("High / Low", f"₹ <span class=\"number\">{low / 0.8:,.0f}</span> / <span class=\"number\">{low:,.0f}</span>"),
+        ("Stock P/E", f"<span class=\"number\">{rng.uniform(5, 80):.1f}</span>"),
+        ("Book Value", f"₹ <span class=\"number\">{rng.uniform(10, 900):,.0f}</span>"),
+        ("Dividend Yield", f"<span class=\"number\">{rng.uniform(0, 5):.2f}</span> %"),
+        ("ROCE", f"<span class=\"number\">{rng.uniform(-5, 60):.1f}</span> %"),
+        ("ROE", f"<span class=\"number\">{rng.uniform(-5, 50):.1f}</span> %"),
+        ("Face Value", f"₹ <span class=\"number\">{rng.choice((1, 2, 5, 10))}</span>"),
+    )
+    lis = "".join(
+        f'<li class="flex flex-space-between"><span class="name">{name}</span><span class="nowrap value">{value}</span></li>'
+        for name, value in items
+    )
+    return f'<div class="company-ratios"><ul id="top-ratios">{lis}</ul></div>'
+
+
+def screener_schedule(parent, periods, seed=0):
+    '''
+    JSON payload of the schedules endpoint for one expandable row: {sub-row: {period: value}}.
+    '''
+    rng = random.Random(f"{seed}-{parent}")
+    return {
+        child: {period: _screener_value(rng, child) for period in periods}
+        for child in _SCREENER_SCHEDULES.get(parent, ())
+    }
+
+
+def screener_page(seed=0, years=12, expanded=True):
+    '''
+    A Screener.in company page, laid out like the real one: key ratios, peer comparison, quarterly
+    results, the four statement tables and the shareholding pattern.
+
+    With expanded=True the sub-rows of every expandable row and the peer comparison are already in
+    the page, as after clicking every expand button in a browser; otherwise only the buttons and an
+    empty peers section are there.
+    '''
+    rng = random.Random(seed)
+    # The sections other than the statements draw from their own generator, so the statements stay
+    # the same as in pages without those sections
+    extra = random.Random(f"{seed}-extra")
+    out = [
+        f"<html>{_BOILERPLATE}<body>{_NAV}",
+        '<div id="company-info" data-company-id="3365" data-warehouse-id="6599230"></div>',
+        f'<section id="top">{_screener_ratios(extra)}</section>',
+        '<section id="peers"><div class="flex"><h2>Peer comparison</h2></div>'
+        f'{screener_peers(seed) if expanded else ""}<div id="peers-table-placeholder"></div></section>',
+    ]
+    sections = (
+        ("quarters", "Quarterly Results", _SCREENER_QUARTERS),
+        *_SCREENER_SECTIONS,
+        ("shareholding", "Shareholding Pattern", _SCREENER_SHAREHOLDING),
+    )
+    for section_id, title, rows in sections:
+        periods = screener_periods(section_id, years)
+        ttm = section_id == "profit-loss"
+        values_rng = extra if section_id in ("quarters", "shareholding") else rng
+        header = "".join(f"<th>{p}</th>" for p in periods) + ("<th>TTM</th>" if ttm else "")
+        out.append(
+            f'<section id="{section_id}"><div class="flex"><h2>{title}</h2></div>'
+            f'<div class="responsive-holder"><table class="data-table"><thead><tr><th class="text"></th>{header}</tr>'
+            "</thead><tbody>"
+        )
+        for label in rows:
+            values = [_screener_value(values_rng, label) for _ in periods] + (["1,000"] if ttm else [])
+            cells = "".join(f"<td>{v}</td>" for v in values)
+            if label in _SCREENER_SCHEDULES and section_id != "shareholding":
+                button = (
+                    f'<button class="button-plain" onclick="Company.showSchedule(\'{label}\', \'{section_id}\', this)">'
+                    f'{label}&nbsp;<span class="blue-icon">+</span></button>'
+                )
+                out.append(f'<tr><td class="text">{button}</td>{cells}</tr>')
+                if expanded:
+                    for child, child_values in screener_schedule(label, periods, seed).items():
+                        child_cells = "".join(f"<td>{child_values[p]}</td>" for p in periods)
+                        out.append(f'<tr class="child"><td class="text">{child}</td>{child_cells}</tr>')
+            else:
+                out.append(f'<tr><td class="text">{label}</td>{cells}</tr>')
+        out.append("</tbody></table></div></section>")
+    out.append("</body></html>")
+    return "".join(out)
+
+
+# Sheets of the RBI DBIE workbooks: sheet -> (pandas frequency, number of indicators)
+_RBI_SHEETS = {"Weekly": ("W-FRI", 18), "Fortnightly": ("SMS", 6), "Monthly": ("MS", 20), "Quarterly": ("QS", 8)}
+
+
+def rbi_workbook(path, main=True, periods=520, seed=0):
+    '''
+    Write an .xlsx shaped like the RBI "50 Macroeconomic Indicators" workbook (main=True) or the
+    "Other Macroeconomic Indicators" one: title rows, a header row, a units row in the other
+    workbook, then one row per date with a serial number, the date and the indicators.
+    A few dates are stored as text, a few cells hold '-' and footnotes follow the data.
+    '''
+    from datetime import datetime
+
+    import pandas as pd
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    for sheet, (freq, n_indicators) in _RBI_SHEETS.items():
+        ws = workbook.create_sheet(sheet)
+        dates = pd.date_range("2000-01-07", periods=periods, freq=freq)
+        names = [f"{sheet} indicator {i}{'' if main else ' (other)'}" for i in range(n_indicators)]
+        if main:
+            ws.append(["Reserve Bank of India"])
+            ws.append([f"{sheet} Macroeconomic Indicators"])
+            ws.append([])
+            ws.append(["Sr. No.", "Date"] + names)
+        else:
+            ws.append([f"Other {sheet} Indicators"])
+            ws.append(["Sr. No.", "Date"] + names)
+            ws.append([None, None] + ["Rs. Crore"] * n_indicators)
+        for i, day in enumerate(dates):
+            when = day.strftime("%d-%m-%Y") if i % 97 == 5 else datetime(day.year, day.month, day.day)
+            values = ["-" if rng.random() < 0.01 else round(rng.uniform(-100, 100000), 2) for _ in names]
+            ws.append([i + 1, when] + values)
+        ws.append([])
+        ws.append(["Note: figures are provisional."])
+    workbook.save(path)
+
@@ -0,0 +1,186 @@
+'''
+Local stand-ins for the sites marketminer scrapes, for offline benchmarks.
+
+Each server runs an aiohttp application on its own event loop in a daemon thread and serves
+either pages recorded from the real site or the synthetic pages of fixtures.py.
+'''
+
+import asyncio
+import glob
+import itertools
+import os
+import random
+import re
+import threading
+
+from aiohttp import web
+
+from fixtures import archive_page, article_page, screener_page, screener_periods, screener_peers, screener_schedule
+
+# Expand buttons of the synthetic Screener page call Company.showSchedule; this stands in for
+# Screener's script so a browser can expand the rows against the schedules endpoint.
+_SCREENER_JS = """
+<script>
+var Company = {showSchedule: function (parent, section, button) {
+  var table = button.closest('table');
+  var periods = Array.from(table.querySelectorAll('th')).slice(1).map(function (th) { return th.textContent; });
+  var id = document.getElementById('company-info').dataset.companyId;
+  fetch('/api/company/' + id + '/schedules/?parent=' + encodeURIComponent(parent) + '&section=' + section)
+    .then(function (r) { return r.json(); })
+    .then(function (rows) {
+      var row = button.closest('tr');
+      Object.keys(rows).forEach(function (name) {
+        var tr = document.createElement('tr');
+        tr.innerHTML = '<td>' + name + '</td>' + periods.map(function (p) {
+          return '<td>' + (rows[name][p] || '') + '</td>';
+        }).join('');
+        row.after(tr);
+        row = tr;
+      });
+    });
+}};
+// The peer comparison is loaded separately, as on Screener
+fetch('/api/company/' + document.getElementById('company-info').dataset.warehouseId + '/peers/')
+  .then(function (r) { return r.text(); })
+  .then(function (html) {
+    document.getElementById('peers-table-placeholder').insertAdjacentHTML('beforebegin', html);
+  });
+</script>
+"""
+
+
+class _Server:
+    '''
+    Run an aiohttp application on 127.0.0.1 in a background thread.
+    Use as a context manager; `url` is the base URL once started.
+    '''
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.url = None
+        self._loop = None
+        self._runner = None
+
+    def _routes(self, app):
+        raise NotImplementedError
+
+    async def _delay(self):
+        '''
+        Apply the configured latency. Returns an error response when one is injected, else None.
+        '''
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503)
+        return None
+
+    def start(self):
+        app = web.Application()
+        self._routes(app)
+        self._loop = asyncio.new_event_loop()
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class EconomicTimesServer(_Server):
+    '''
+    Economic Times stand-in serving archivelist and articleshow pages.
+
+    Parameters:
+        n_articles (int): Article links per synthetic archive page.
+        pages (str, optional): Directory with recorded pages: archive/*.html and article/*.html are
+            replayed in rotation instead of the synthetic pages.
+        latency (float): Seconds added to every response.
+        error_rate (float): Share of article requests answered with 503.
+    '''
+
+    def __init__(self, n_articles=50, pages=None, latency=0.0, error_rate=0.0, seed=0):
+        super().__init__(latency, error_rate, seed)
+        self.n_articles = n_articles
+        self._recorded = None
+        if pages:
+            archives = [_read(p) for p in sorted(glob.glob(os.path.join(pages, "archive", "*.html")))]
+            articles = [_read(p) for p in sorted(glob.glob(os.path.join(pages, "article", "*.html")))]
+            if not archives or not articles:
+                raise ValueError(f"{pages} needs archive/*.html and article/*.html")
+            self._recorded = (itertools.cycle(archives), itertools.cycle(articles))
+
+    def _routes(self, app):
+        app.router.add_get("/archivelist/{rest}", self._archive)
+        app.router.add_get("/{tail:.*}/articleshow/{article_id}.cms", self._article)
+
+    async def _archive(self, request):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._recorded:
+            return web.Response(text=next(self._recorded[0]), content_type="text/html")
+        serial = int(re.search(r"starttime-(\d+)", request.match_info["rest"]).group(1))
+        return web.Response(text=archive_page(serial, self.n_articles), content_type="text/html")
+
+    async def _article(self, request):
+        error = await self._delay()
+        if error is not None:
+            return error
+        if self._recorded:
+            return web.Response(text=next(self._recorded[1]), content_type="text/html")
+        return web.Response(text=article_page(int(request.match_info["article_id"])), content_type="text/html")
+
+
+class ScreenerServer(_Server):
+    '''
+    Screener.in stand-in serving unexpanded company pages, the schedules endpoint behind their
+    expand buttons and the peers endpoint, with a small script so a browser can load them too.
+    '''
+
+    def _routes(self, app):
+        app.router.add_get("/company/{ticker}/", self._company)
+        app.router.add_get("/api/company/{company_id}/schedules/", self._schedules)
+        app.router.add_get("/api/company/{warehouse_id}/peers/", self._peers)
+
+    async def _company(self, request):
+        error = await self._delay()
+        if error is not None:
+            return error
+        page = screener_page(seed=sum(map(ord, request.match_info["ticker"])), expanded=False)
+        return web.Response(text=page.replace("</body>", f"{_SCREENER_JS}</body>"), content_type="text/html")
+
+    async def _schedules(self, request):
+        error = await self._delay()
+        if error is not None:
+            return error
+        periods = screener_periods(request.query.get("section"))
+        return web.json_response(screener_schedule(request.query["parent"], periods))
+
+    async def _peers(self, request):
+        error = await self._delay()
+        if error is not None:
+            return error
+        return web.Response(text=screener_peers(), content_type="text/html")
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
@@ -1,7 +1,12 @@
+import logging
+
 from marketminer.news_scraper import scrape_economic_times
 from datetime import datetime, timedelta
 
 if __name__ == "__main__":
+    # marketminer logs progress; show it on the console
+    logging.basicConfig(level=logging.INFO)
+
     # Choose a small date range to limit results
     df = scrape_economic_times('2025-02-10', '2025-02-11')
     print(df.head())
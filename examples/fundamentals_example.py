@@ -1,6 +1,11 @@
+import logging
+
 from marketminer.fundamentals_scraper import scrape_fundamentals
 
 if __name__ == "__main__":
+    # marketminer logs progress; show it on the console
+    logging.basicConfig(level=logging.INFO)
+
     # Example ticker for Reliance Industries Limited
     ticker = 'ADANIENT'
 
@@ -1,6 +1,11 @@
+import logging
+
 from marketminer.macros_scraper import scrape_macro_india
 
 if __name__ == "__main__":
+    # marketminer logs progress; show it on the console
+    logging.basicConfig(level=logging.INFO)
+
     # Example usage of the scrape_macro_india function
     start_date = "2020-01-01"
     end_date = "2023-12-31"
@@ -2,14 +2,60 @@
 MarketMiner: A Python library for scraping financial data from various sources.
 '''
 
+import importlib
+import logging
+
 __version__ = '0.5.0'
 
-from .news_scraper import scrape_economic_times
-from .fundamentals_scraper import scrape_fundamentals
-from .macros_scraper import scrape_macro_india
+# Library modules only log; applications decide where the records go (logging.basicConfig etc.)
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+# Public names and the submodule defining each. Submodules are imported on first access
+# (PEP 562), so `import marketminer` stays cheap and a news job never loads selenium.
+_LAZY = {
+    'scrape_economic_times': 'news_scraper',
+    'update_economic_times': 'news_scraper',
+    'iter_economic_times': 'news_scraper',
+    'write_economic_times_parquet': 'news_scraper',
+    'ScrapeError': 'news_scraper',
+    'scrape_fundamentals': 'fundamentals_scraper',
+    'scrape_fundamentals_many': 'fundamentals_scraper',
+    'FundamentalsSession': 'fundamentals_scraper',
+    'BrowserRequired': 'fundamentals_scraper',
+    'scrape_macro_india': 'macros_scraper',
+    'align_macro': 'macros_scraper',
+    'FetchConfig': 'fetcher',
+    'ResponseCache': 'http_cache',
+    'NewsState': 'news_state',
+    'NewsIndex': 'news_index',
+    'read_news_parquet': 'news_store',
+    'write_news_parquet': 'news_store',
+    'FundamentalsStore': 'fundamentals_store',
+    'MacroStore': 'macro_store',
+    'set_instrumentation': 'metrics',
+    'InMemoryRecorder': 'metrics',
+    'PrometheusInstrumentation': 'metrics',
+    'OpenTelemetryInstrumentation': 'metrics',
+    'ResourceBudget': 'resources',
+    'set_budget': 'resources',
+    'load_spec': 'scheduler',
+    'run_spec': 'scheduler',
+    'build_panel': 'fundamentals_panel',
+    'load_panel': 'fundamentals_panel',
+    'sustained': 'fundamentals_panel',
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    'scrape_economic_times',
-    'scrape_fundamentals',
-    'scrape_macro_india',
-]
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
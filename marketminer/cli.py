@@ -0,0 +1,86 @@
+'''
+Command line interface: `marketminer run jobs.toml`.
+'''
+
+import argparse
+import json
+import logging
+import sys
+
+from . import __version__
+
+
+def _summary(run):
+    lines = []
+    for name, report in run["jobs"].items():
+        line = f"{name:<20}{report['kind']:<14}{report['status']:<9}{report['units'] - len(report['failed']):>6}/{report['units']:<6}"
+        line += f"{report.get('seconds', 0):>9.1f}s  {report.get('output') or report.get('error', '')}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _run(args):
+    from .scheduler import load_spec, run_spec
+
+    spec = load_spec(args.spec)
+    if args.output_dir:
+        spec.output_dir = args.output_dir
+    if args.max_browsers:
+        spec.max_browsers = args.max_browsers
+    if args.max_http:
+        spec.max_http = args.max_http
+    if args.sequential:
+        spec.parallel = False
+    run = run_spec(spec, args.only.split(",") if args.only else None)
+    if args.json:
+        print(json.dumps(run, indent=2))
+    else:
+        print(_summary(run))
+    # 1 when any unit is still failing, so cron and CI notice
+    return 0 if all(report["status"] == "ok" for report in run["jobs"].values()) else 1
+
+
+def _validate(args):
+    from .scheduler import _RUNNERS, load_spec
+
+    spec = load_spec(args.spec)
+    print(f"output_dir: {spec.output_dir}")
+    print(f"resources: max_browsers={spec.max_browsers}, max_http={spec.max_http}, parallel={spec.parallel}")
+    for job in spec.jobs:
+        units = _RUNNERS[job.kind](job, spec.output_dir).units()
+        print(f"  {job.name}: {job.kind}, {len(units)} units, retries={job.retries}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="marketminer", description="Batch refreshes of MarketMiner data.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log debug messages")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only log warnings and errors")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the jobs of a spec file")
+    run.add_argument("spec", help="Job spec (.toml or .json)")
+    run.add_argument("--only", help="Comma separated names of the jobs to run")
+    run.add_argument("--output-dir", help="Override the spec's output_dir")
+    run.add_argument("--max-browsers", type=int, help="Override the spec's max_browsers")
+    run.add_argument("--max-http", type=int, help="Override the spec's max_http")
+    run.add_argument("--sequential", action="store_true", help="Run the jobs one after the other")
+    run.add_argument("--json", action="store_true", help="Print the run report as JSON")
+    run.set_defaults(func=_run)
+
+    validate = commands.add_parser("validate", help="Check a spec file and list its jobs")
+    validate.add_argument("spec", help="Job spec (.toml or .json)")
+    validate.set_defaults(func=_validate)
+
+    args = parser.parse_args(argv)
+    level = logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"marketminer: error: {e}\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+'''
+Module with pluggable xlsx reading backends for the macro scraper.
+
+Both backends return cell values only, with no styles, formulas or pandas type inference:
+    - 'calamine': Rust reader via python-calamine, the fastest.
+    - 'openpyxl': openpyxl in read-only streaming mode.
+'auto' picks the first one installed in that order.
+'''
+
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+BACKENDS = ("calamine", "openpyxl")
+
+# Formats tried, in order, on dates stored as text. Real date cells need no parsing.
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d-%b-%Y", "%b-%Y", "%b %Y")
+
+
+@lru_cache(maxsize=None)
+def available_backends():
+    '''
+    Returns:
+        tuple: Names of the installed reader backends, fastest first.
+    '''
+    backends = []
+    try:
+        import python_calamine  # noqa: F401
+        backends.append("calamine")
+    except ImportError:
+        pass
+    backends.append("openpyxl")
+    return tuple(backends)
+
+
+def resolve_backend(backend="auto"):
+    '''
+    Map 'auto' to the fastest installed backend and validate explicit choices.
+    '''
+    if backend == "auto":
+        return available_backends()[0]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown Excel reader {backend!r}, expected one of {BACKENDS} or 'auto'.")
+    if backend not in available_backends():
+        package = "python-calamine" if backend == "calamine" else backend
+        raise ImportError(f"Excel reader {backend!r} is not installed: pip install {package}")
+    return backend
+
+
+def read_workbook(path, backend="auto"):
+    '''
+    Read the cell values of every sheet of a workbook.
+    Parameters:
+        path (str): Path of the .xlsx file.
+        backend (str): Reader backend, see BACKENDS.
+    Returns:
+        dict: {sheet: list of row lists}, rows counted from the first row of the sheet and empty
+            cells as None.
+    '''
+    backend = resolve_backend(backend)
+    if backend == "calamine":
+        from python_calamine import CalamineWorkbook
+        workbook = CalamineWorkbook.from_path(path)
+        sheets = {}
+        for name in workbook.sheet_names:
+            rows = workbook.get_sheet_by_name(name).to_python(skip_empty_area=False)
+            # calamine reports empty cells as ''
+            sheets[name] = [[None if value == "" else value for value in row] for row in rows]
+        return sheets
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return {ws.title: [list(row) for row in ws.iter_rows(values_only=True)] for ws in workbook.worksheets}
+    finally:
+        workbook.close()
+
+
+def parse_dates(values, formats=DATE_FORMATS):
+    '''
+    Convert a column of date cells to datetimes.
+    Parameters:
+        values (list): Cell values: datetimes, dates, text or None.
+        formats (tuple): strptime formats tried in order on text cells.
+    Returns:
+        pd.DatetimeIndex: The parsed dates, NaT where nothing matched.
+    '''
+    cells = pd.Series(values, dtype=object)
+    is_date = cells.map(lambda v: isinstance(v, (datetime, date))).to_numpy(dtype=bool)
+    parsed = pd.Series(pd.NaT, index=cells.index, dtype="datetime64[ns]")
+    if is_date.any():
+        parsed[is_date] = pd.to_datetime(cells[is_date].tolist()).astype("datetime64[ns]")
+    text = cells[~is_date].dropna().astype(str).str.strip()
+    for fmt in formats:
+        if text.empty:
+            break
+        matched = pd.to_datetime(text, format=fmt, errors="coerce").dropna()
+        parsed[matched.index] = matched.astype("datetime64[ns]")
+        text = text.drop(matched.index)
+    return pd.DatetimeIndex(parsed)
+
+
+def to_float_block(rows, width):
+    '''
+    Convert data rows to a float64 block, with non-numeric cells as NaN.
+    Parameters:
+        rows (list): Row lists of cell values.
+        width (int): Number of columns.
+    Returns:
+        np.ndarray: A (len(rows), width) float64 array.
+    '''
+    padded = [row[:width] + [None] * (width - len(row)) for row in rows]
+    try:
+        # Fast path: every cell is a number or empty
+        return np.array(padded, dtype=np.float64).reshape(len(rows), width)
+    except (TypeError, ValueError):
+        block = np.array(padded, dtype=object).reshape(len(rows), width)
+        return np.column_stack(
+            [pd.to_numeric(pd.Series(block[:, i]), errors="coerce").to_numpy(dtype=np.float64) for i in range(width)]
+        ) if width else np.empty((len(rows), 0))
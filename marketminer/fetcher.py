@@ -0,0 +1,244 @@
+'''
+Module with the shared HTTP fetch layer used by the asynchronous scrapers.
+'''
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from . import metrics, resources
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FetchConfig:
+    '''
+    Tuning knobs for the fetch layer.
+
+    Attributes:
+        max_connections (int): Total connections kept open by the connection pool.
+        max_per_host (int): Requests allowed in flight to a single host.
+        dns_cache_ttl (int): Seconds a DNS lookup is cached by the connector.
+        keepalive_timeout (float): Seconds an idle keep-alive connection stays in the pool.
+        timeout (float): Total timeout in seconds for a single request.
+        max_retries (int): Retries after the first attempt for retryable failures.
+        backoff_base (float): Base delay in seconds of the exponential backoff.
+        backoff_max (float): Upper bound in seconds of a single backoff delay.
+        initial_rate (float): Starting request rate per host in requests per second.
+        min_rate (float): Lowest request rate the AIMD controller can fall to.
+        max_rate (float): Highest request rate the AIMD controller can climb to.
+        rate_increase (float): Requests per second added for every second of successful requests.
+        rate_decrease (float): Factor applied to the rate when the host throttles or errors.
+        retry_statuses (tuple): HTTP statuses that are retried and slow the host down.
+        gone_statuses (tuple): HTTP statuses meaning the page no longer exists, raised as PageGone.
+    '''
+    max_connections: int = 64
+    max_per_host: int = 16
+    dns_cache_ttl: int = 300
+    keepalive_timeout: float = 30.0
+    timeout: float = 30.0
+    max_retries: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    initial_rate: float = 50.0
+    min_rate: float = 1.0
+    max_rate: float = 200.0
+    rate_increase: float = 10.0
+    rate_decrease: float = 0.5
+    retry_statuses: tuple = field(default=(429, 500, 502, 503, 504))
+    gone_statuses: tuple = field(default=(404, 410))
+
+
+class PageGone(Exception):
+    '''
+    Raised by Fetcher.fetch when the server answers that the page does not exist (anymore), which
+    retrying or a later run will not change.
+    '''
+
+    def __init__(self, url, status):
+        super().__init__(f"{url} is gone (status {status})")
+        self.url = url
+        self.status = status
+
+
+class AIMDRateLimiter:
+    '''
+    Per-host request pacer with additive-increase / multiplicative-decrease rate control.
+
+    Every successful request nudges the rate up so that it grows by roughly `increase`
+    requests per second each second; a throttled or failed request cuts it by `decrease`,
+    at most once per second so a burst of concurrent failures only counts once.
+    '''
+
+    def __init__(self, rate, min_rate, max_rate, increase, decrease):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._next_slot = 0.0
+        self._last_decrease = 0.0
+
+    async def acquire(self):
+        '''
+        Wait until the next request slot for this host is due.
+        '''
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self):
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        logger.debug(f"Backing off: request rate lowered to {self.rate:.1f}/s")
+
+
+class Fetcher:
+    '''
+    Pooled, rate-limited HTTP client with retries.
+
+    Use as an async context manager; the underlying aiohttp session and its connector
+    are created on entry and closed on exit. When a ResponseCache is given, fresh cached
+    bodies are served without a request and stale ones are revalidated with a conditional GET.
+
+    Example:
+        async with Fetcher(headers=HEADERS) as fetcher:
+            html = await fetcher.fetch(url)
+    '''
+
+    def __init__(self, config: FetchConfig = None, headers: dict = None, cache=None):
+        self.config = config or FetchConfig()
+        self.headers = headers
+        self.cache = cache
+        self.session = None
+        self._limiters = {}
+        self._semaphores = {}
+
+    async def __aenter__(self):
+        cfg = self.config
+        connector = aiohttp.TCPConnector(
+            limit=cfg.max_connections,
+            limit_per_host=cfg.max_per_host,
+            ttl_dns_cache=cfg.dns_cache_ttl,
+            keepalive_timeout=cfg.keepalive_timeout,
+        )
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=cfg.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+        self.session = None
+
+    def _host_state(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._limiters:
+            cfg = self.config
+            self._limiters[host] = AIMDRateLimiter(
+                cfg.initial_rate, cfg.min_rate, cfg.max_rate, cfg.rate_increase, cfg.rate_decrease
+            )
+            self._semaphores[host] = asyncio.Semaphore(cfg.max_per_host)
+        return self._limiters[host], self._semaphores[host]
+
+    def _backoff(self, attempt, retry_after=None):
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        delay = random.uniform(0, min(self.config.backoff_max, self.config.backoff_base * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, min(self.config.backoff_max, float(retry_after)))
+            except ValueError:
+                pass
+        return delay
+
+    async def fetch(self, url, ttl=None):
+        """
+        Fetch a URL, retrying throttled and failed requests with jittered exponential backoff.
+
+        Parameters:
+        url (str): The URL to fetch.
+        ttl (float, optional): Seconds the response stays fresh in the cache. None caches it permanently.
+
+        Returns:
+            str: The response text, or None when the request ultimately failed.
+
+        Raises:
+            PageGone: The server answered with one of the gone_statuses.
+        """
+        # The cache compresses and does SQLite I/O, which would stall every other fetch on the loop
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache is not None else None
+        if cached is not None and cached.fresh:
+            metrics.counter(metrics.CACHE_HITS, result="fresh")
+            return cached.text
+        request_headers = {}
+        if cached is not None:
+            if cached.etag:
+                request_headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request_headers["If-Modified-Since"] = cached.last_modified
+
+        host = urlsplit(url).netloc
+        limiter, semaphore = self._host_state(url)
+        for attempt in range(self.config.max_retries + 1):
+            retry_after = None
+            await limiter.acquire()
+            start = None
+            status = "error"
+            try:
+                async with semaphore, resources.http_slot_async():
+                    start = time.perf_counter()
+                    async with self.session.get(url, headers=request_headers) as response:
+                        status = response.status
+                        if status == 200:
+                            body = await response.read()
+                            text = await response.text()
+                            metrics.counter(metrics.FETCH_BYTES, len(body), host=host)
+                            limiter.on_success()
+                            if self.cache is not None:
+                                await asyncio.to_thread(
+                                    self.cache.put, url, text, ttl,
+                                    etag=response.headers.get("ETag"),
+                                    last_modified=response.headers.get("Last-Modified"),
+                                )
+                            return text
+                        if status == 304 and cached is not None:
+                            metrics.counter(metrics.CACHE_HITS, result="revalidated")
+                            limiter.on_success()
+                            await asyncio.to_thread(self.cache.touch, url, ttl)
+                            return cached.text
+                        retry_after = response.headers.get("Retry-After")
+                reason = f"status {status}"
+                if status in self.config.gone_statuses:
+                    raise PageGone(url, status)
+                if status not in self.config.retry_statuses:
+                    logger.warning(f"Failed to fetch {url} with {reason}")
+                    return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                reason = f"{type(e).__name__}: {e}"
+            finally:
+                # One observation per attempt; status is 'error' when no response arrived
+                if start is not None:
+                    metrics.histogram(metrics.FETCH_SECONDS, time.perf_counter() - start, host=host, status=str(status))
+                    metrics.counter(metrics.FETCH_REQUESTS, host=host, status=str(status))
+
+            limiter.on_throttle()
+            if attempt == self.config.max_retries:
+                logger.warning(f"Failed to fetch {url} after {attempt + 1} attempts ({reason})")
+                return None
+            await asyncio.sleep(self._backoff(attempt, retry_after))
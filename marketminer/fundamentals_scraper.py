@@ -5,162 +5,710 @@ Module for scraping fundamental data from financial websites.
 import pandas as pd
 import numpy as np
 import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
+from bs4 import BeautifulSoup, SoupStrainer
 import time
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+import queue
+import re
+import threading
+
+from . import metrics, resources
+from .fundamentals_store import FundamentalsStore
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 _BASE = "https://www.screener.in/company/"
+# Seconds to wait for the first table of a page, and for the rows of one expanded table row
+DEFAULT_LOAD_TIMEOUT = 10
+DEFAULT_EXPAND_TIMEOUT = 5
+# Seconds between checks for a free browser slot of the resource budget
+_BUDGET_POLL = 0.1
+# Number of rows of the table holding an element, -1 when it is not inside a table
+_TABLE_ROWS_JS = "var t = arguments[0].closest('table'); return t ? t.rows.length : -1;"
+# Endpoint the page's expand buttons call to load the sub-rows of a table row
+_SCHEDULES_API = "https://www.screener.in/api/company/{company_id}/schedules/"
+# onclick="Company.showSchedule('Sales', 'profit-loss', this)"
+_SCHEDULE_RE = re.compile(r"showSchedule\(\s*'([^']*)'\s*,\s*'([^']*)'")
+# Endpoint the page's script calls to fill the peer comparison table
+_PEERS_API = "https://www.screener.in/api/company/{warehouse_id}/peers/"
+# Output key and page heading of every statement table
+_STATEMENTS = {
+    "profit_loss": "Profit & Loss",
+    "balance_sheet": "Balance Sheet",
+    "cash_flows": "Cash Flows",
+    "ratios": "Ratios",
+}
+# Output key and page heading of every table of a company page
+_TABLES = {
+    **_STATEMENTS,
+    "quarters": "Quarterly Results",
+    "shareholding": "Shareholding Pattern",
+    "peers": "Peer comparison",
+}
+# Id of the page section holding each table
+_SECTION_IDS = {
+    "profit_loss": "profit-loss",
+    "balance_sheet": "balance-sheet",
+    "cash_flows": "cash-flow",
+    "ratios": "ratios",
+    "quarters": "quarters",
+    "shareholding": "shareholding",
+    "peers": "peers",
+}
+# Sections whose rows have expand buttons backed by the schedules endpoint
+_EXPANDABLE = ("profit_loss", "balance_sheet", "cash_flows", "ratios", "quarters")
+# 'summary' holds the key ratios above the tables: market cap, current price, P/E, ...
+SECTIONS = (*_TABLES, "summary")
+DEFAULT_SECTIONS = tuple(_STATEMENTS)
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+                  " AppleWebKit/537.36 (KHTML, like Gecko)"
+                  " Chrome/120.0.0.0 Safari/537.36"
+}
+MODES = ("auto", "http", "browser")
+_TABLES_STRAINER = SoupStrainer(['h2', 'table'])
+# The key ratios are a list above the tables
+_SUMMARY_STRAINER = SoupStrainer(['h2', 'table', 'ul'])
+
+
+class BrowserRequired(RuntimeError):
+    '''
+    Raised when a page cannot be scraped over plain HTTP and needs a browser.
+    '''
+
+def _to_float(cells):
+    '''
+    Parse table cells such as '1,234' or '12%' as float64, NaN where they are not numbers.
+    '''
+    cells = pd.Series(cells, dtype=object).str.replace(r'[,%]', '', regex=True)
+    return pd.to_numeric(cells, errors='coerce').to_numpy(dtype=np.float64)
+
+def _clean_labels(labels):
+    # Remove spaces,+,%,- in column name
+    return pd.Index(labels).str.strip().str.replace(r'[ +%-]', '', regex=True).str.strip()
 
-def clean_data(x):
+def clean_data(x, quarterly=False):
     '''
     Clean the scraped financial data.
     Parameters:
         x (pd.DataFrame): The DataFrame containing scraped data.
+        quarterly (bool): Index the rows by the period end date ('Jun 2024' -> 2024-06-30) instead of
+            the year, for tables with several periods per year.
     Returns:
-        pd.DataFrame: Cleaned DataFrame with years as rows and values as columns.
-    '''
-    # Transpose data so that year are rows and values are columns
-    x=x.T
-    # 1st row is the new column headers
-    x.columns=x.iloc[0]
-    # Temp list for current index
-    a=list(x.index)
-    # Replace 1st index to 0
-    a[0]=0
-    # Remove all non-digit items from index
-    a = [''.join(filter(str.isdigit, str(item))) for item in a]
-    # Type cast index to int
-    a = [int(item) for item in a]
-    # Assign cleaned index to dataframe
-    x.index = a
-    # Drop the 1st row that became column headers
-    x = x.drop(0)
-    # Replace  , and % in the data
-    x = x.replace({',': '', '%': ''}, regex=True)
-    # Typecast data to numeric
-    x=x.apply(pd.to_numeric)
-    # Remove spaces,+,%,- in column name
-    x.columns = x.columns.str.strip()
-    x.columns = x.columns.str.replace(' ', '')
-    x.columns = x.columns.str.replace('+', '')
-    x.columns = x.columns.str.replace('%', '')
-    x.columns = x.columns.str.replace('-', '')
-    x.columns = x.columns.str.strip()
-    return x
+        pd.DataFrame: Cleaned DataFrame with years (or period end dates) as rows and values as columns.
+    '''
+    # The 1st column holds the row labels, the other columns are periods such as 'Mar 2024'
+    labels = pd.Index(x.iloc[:, 0], name=x.columns[0])
+    periods = x.columns[1:]
+    if quarterly:
+        index = pd.DatetimeIndex(pd.to_datetime([str(p).strip() for p in periods], format='%b %Y')) + pd.offsets.MonthEnd(0)
+    else:
+        # Keep only the digits of each period as the (year) index
+        index = pd.Index([int(''.join(filter(str.isdigit, str(p)))) for p in periods])
+    # Strip , and % from every cell at once and parse the transposed values as float64
+    values = _to_float(x.iloc[:, 1:].to_numpy(dtype=object).T.ravel()).reshape(len(periods), len(labels))
+    columns = _clean_labels(labels)
+    columns.name = labels.name
+    return pd.DataFrame(values, index=index, columns=columns)
 
-def scrape_fundamentals(ticker):
+def _sections(sections):
     '''
-    Scrape fundamental data for a given stock ticker from Screener.in.
-    Parameters:
-    ticker (str): Stock ticker symbol.
+    Validate a sections selector of scrape_fundamentals.
     Returns:
-    dict: A dictionary containing DataFrames for Profit & Loss, Balance Sheet, Cash Flow, and Ratios.
+        tuple: The requested section names, in order and without repeats.
+    '''
+    if sections is None:
+        return DEFAULT_SECTIONS
+    if sections == "all":
+        return SECTIONS
+    sections = (sections,) if isinstance(sections, str) else tuple(dict.fromkeys(sections))
+    unknown = [section for section in sections if section not in SECTIONS]
+    if unknown or not sections:
+        raise ValueError(f"sections must be 'all' or names out of {SECTIONS}, got {unknown or sections!r}")
+    return sections
+
+def _new_driver(release=None):
+    '''
+    Start a headless Chrome webdriver. It holds a browser slot of the resource budget until it is
+    quit with _quit_driver.
+    Parameters:
+        release (callable, optional): Release of a browser slot already taken for this driver.
+    '''
+    if release is None:
+        release = resources.acquire_browser()
+    try:
+        # selenium is only imported once a browser is needed, the HTTP path never loads it
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        # Set up chrome webdriver options for headless browsing i.e new chrome tab won't open
+        options = Options()
+        options.add_argument("--headless")
+        # Create chrome webdriver object with options
+        driver = webdriver.Chrome(options=options)
+    except BaseException:
+        release()
+        raise
+    driver._marketminer_release = release
+    return driver
+
+def _quit_driver(driver):
+    '''
+    Quit a webdriver started by _new_driver and give its browser slot back.
+    '''
+    try:
+        driver.quit()
+    finally:
+        release = driver.__dict__.pop("_marketminer_release", None)
+        if release is not None:
+            release()
 
+def _load_page(driver, ticker, timings, load_timeout=DEFAULT_LOAD_TIMEOUT, expand_timeout=DEFAULT_EXPAND_TIMEOUT,
+               sections=DEFAULT_SECTIONS):
+    '''
+    Open the Screener.in page of a ticker, expand the tables of the requested sections and return the page source.
+    Seconds spent loading and expanding are recorded in timings under 'page_load' and 'expand'.
     '''
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     # Provide url of screener with option to change ticker
     url = f"{_BASE}{ticker}/"
     logger.info(f"Scraping fundamentals for ticker: {ticker} from {url}")
-    # Set up chrome webdriver options for headless browsing i.e new chrome tab won't open
-    options = Options()
-    options.add_argument("--headless")
-    # Create chrome webdriver object with options
-    driver = webdriver.Chrome(options=options)
-    # Navigate to url
+    start = time.perf_counter()
+    # Navigate to url and wait until the tables are in the DOM
     driver.get(url)
-    # Give 5 seconds to load page
-    time.sleep(2.5)
-    # Find all elements in the page with class 'button-plain' to expand all tables. store in a list
-    expand_buttons = driver.find_elements(By.CLASS_NAME, "button-plain")
-    # Wait until all elements are found
-    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, 'table')))
-    # Ignoring the 1st button. click on all buttons as specified above
-    for button in expand_buttons[1:]:
+    WebDriverWait(driver, load_timeout).until(EC.presence_of_element_located((By.TAG_NAME, 'table')))
+    timings["page_load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Only the expand buttons of the requested sections are clicked
+    selector = ", ".join(f"#{_SECTION_IDS[section]} .button-plain" for section in sections if section in _EXPANDABLE)
+    expand_buttons = driver.find_elements(By.CSS_SELECTOR, selector) if selector else []
+    for button in expand_buttons:
+        rows_before = driver.execute_script(_TABLE_ROWS_JS, button)
         driver.execute_script("arguments[0].click();", button)
-        # 1 second pause to load
-        time.sleep(1)
-    # 2 second extra pause to ensure loading
-    time.sleep(2)
-    # Parse extended html content
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
-    # Close chrome tab
-    driver.quit()
-    # scrape P&L data
-    financial_table = soup.find('h2', text='Profit & Loss')
-    table = financial_table.find_next('table')
-    headers = [header.text.strip() for header in table.find_all('th')]
-    rows = []
-    for row in table.find_all('tr')[1:]:
-        cols = [ele.text.strip().replace(',', '') for ele in row.find_all('td')]
-        rows.append(cols)
-    # Store P&L data in a dataframe and clean
-    pl = pd.DataFrame(rows, columns=headers)
-    pl = pl.drop(columns='TTM', errors='ignore')
-    pl = clean_data(pl)
-
-    # Scrape balance sheet data
-    financial_table = soup.find('h2', text='Balance Sheet')
-    table = financial_table.find_next('table')
-    headers = [header.text.strip() for header in table.find_all('th')]
-    rows = []
-    for row in table.find_all('tr')[1:]:
-        cols = [ele.text.strip().replace(',', '') for ele in row.find_all('td')]
-        rows.append(cols)
-    # Store balance sheet data in a dataframe and clean
-    bs = pd.DataFrame(rows, columns=headers)
-    bs = bs.drop(columns='TTM', errors='ignore')
-    bs = clean_data(bs)
-
-    # Scrape cash flow data
-    financial_table = soup.find('h2', text='Cash Flows')
-    table = financial_table.find_next('table')
-    headers = [header.text.strip() for header in table.find_all('th')]
-    rows = []
-    for row in table.find_all('tr')[1:]:
-        cols = [ele.text.strip().replace(',', '') for ele in row.find_all('td')]
-        rows.append(cols)
-    # Store cashflow data in a dataframe and clean
-    cf = pd.DataFrame(rows, columns=headers)
-    cf = cf.drop(columns='TTM', errors='ignore')
-    cf = clean_data(cf)
-
-    # Scrape ratios data
-    financial_table = soup.find('h2', text='Ratios')
-    table = financial_table.find_next('table')
+        if rows_before < 0:
+            continue
+        # Wait until the expanded rows have been inserted into the button's table
+        try:
+            WebDriverWait(driver, expand_timeout, poll_frequency=0.05).until(
+                lambda d: d.execute_script(_TABLE_ROWS_JS, button) > rows_before
+            )
+        except TimeoutException:
+            metrics.counter(metrics.FUNDAMENTALS_EXPAND_TIMEOUTS)
+            logger.debug(f"No rows appeared after expanding a row of {ticker} within {expand_timeout}s")
+    if "peers" in sections:
+        # The page's script fills the peer comparison in after loading, once it is scrolled into view
+        driver.execute_script("var s = document.getElementById('peers'); if (s) s.scrollIntoView();")
+        try:
+            WebDriverWait(driver, load_timeout, poll_frequency=0.05).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, f"#{_SECTION_IDS['peers']} table"))
+            )
+        except TimeoutException:
+            logger.warning(f"The peer comparison of {ticker} did not load within {load_timeout}s")
+    timings["expand"] = time.perf_counter() - start
+    return driver.page_source
+
+def _load_page_http(ticker, session, timings, timeout=DEFAULT_LOAD_TIMEOUT, sections=DEFAULT_SECTIONS):
+    '''
+    Fetch the Screener.in page of a ticker without a browser and expand the tables of the requested
+    sections by calling the schedules endpoint behind every expand button. The peer comparison,
+    which the page's script loads separately, is fetched from its own endpoint when requested.
+    Seconds spent are recorded in timings under 'page_load' and 'expand'.
+    Returns:
+        BeautifulSoup: The page with the sub-rows inserted below their parent rows.
+    Raises:
+        BrowserRequired: When the static page or an expansion cannot be loaded.
+    '''
+    url = f"{_BASE}{ticker}/"
+    logger.info(f"Scraping fundamentals for ticker: {ticker} from {url} over HTTP")
+    start = time.perf_counter()
+    try:
+        with resources.http_slot():
+            response = session.get(url, timeout=timeout)
+    except requests.RequestException as e:
+        raise BrowserRequired(f"page request failed: {e!r}")
+    if response.status_code != 200:
+        raise BrowserRequired(f"page returned status {response.status_code}")
+    soup = BeautifulSoup(response.text, 'html.parser')
+    timings["page_load"] = time.perf_counter() - start
+    tables = _find_tables(soup)
+    missing = [_TABLES[s] for s in sections if s in _TABLES and s != "peers" and _TABLES[s] not in tables]
+    if missing:
+        raise BrowserRequired(f"static page has no {', '.join(missing)} table")
+
+    start = time.perf_counter()
+    company_info = soup.find(id="company-info")
+    company_id = company_info.get("data-company-id") if company_info else None
+    consolidated = "true" if response.url.rstrip("/").endswith("consolidated") else ""
+    for section in sections:
+        if section not in _EXPANDABLE:
+            continue
+        table = tables[_TABLES[section]]
+        periods = [th.text.strip() for th in table.find_all('th')][1:]
+        for button in table.find_all('button', class_='button-plain'):
+            match = _SCHEDULE_RE.search(button.get('onclick', ''))
+            if not match:
+                continue
+            if company_id is None:
+                raise BrowserRequired("page has no company id for its expand buttons")
+            parent, api_section = match.groups()
+            try:
+                with resources.http_slot():
+                    schedule = session.get(
+                        _SCHEDULES_API.format(company_id=company_id),
+                        params={"parent": parent, "section": api_section, "consolidated": consolidated},
+                        timeout=timeout,
+                    )
+                schedule.raise_for_status()
+                sub_rows = schedule.json()
+            except (requests.RequestException, ValueError) as e:
+                raise BrowserRequired(f"expanding {parent!r} failed: {e!r}")
+            # Insert the sub-rows right below their parent row, in the order the API returns them
+            row = button.find_parent('tr')
+            for name, values in sub_rows.items():
+                new_row = soup.new_tag('tr')
+                cell = soup.new_tag('td')
+                cell.string = name
+                new_row.append(cell)
+                for period in periods:
+                    cell = soup.new_tag('td')
+                    cell.string = str(values.get(period, ''))
+                    new_row.append(cell)
+                row.insert_after(new_row)
+                row = new_row
+    if "peers" in sections:
+        _insert_peers(soup, session, company_info, timeout)
+    timings["expand"] = time.perf_counter() - start
+    return soup
+
+def _insert_peers(soup, session, company_info, timeout):
+    '''
+    Fetch the peer comparison table and insert it below its heading, where the page's script puts it.
+    Raises:
+        BrowserRequired: When the page has no peers section or the table cannot be loaded.
+    '''
+    warehouse_id = company_info.get("data-warehouse-id") if company_info else None
+    heading = soup.find('h2', string=lambda text: text is not None and text.strip() == _TABLES["peers"])
+    if warehouse_id is None or heading is None:
+        raise BrowserRequired("page has no peer comparison to load")
+    try:
+        with resources.http_slot():
+            response = session.get(_PEERS_API.format(warehouse_id=warehouse_id), timeout=timeout)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise BrowserRequired(f"loading the peer comparison failed: {e!r}")
+    table = BeautifulSoup(response.text, 'html.parser').find('table')
+    if table is None:
+        raise BrowserRequired("the peer comparison has no table")
+    heading.insert_after(table.extract())
+
+def _find_tables(soup):
+    '''
+    Walk the page once and map every statement heading (h2) to the first table after it.
+    '''
+    tables = {}
+    heading = None
+    for element in soup.find_all(['h2', 'table']):
+        if element.name == 'h2':
+            heading = element.get_text(strip=True)
+        elif heading is not None:
+            tables.setdefault(heading, element)
+            heading = None
+    return tables
+
+def _table_frame(table):
+    '''
+    Read a statement table into a raw DataFrame: labels in the first column, one column per period.
+    '''
     headers = [header.text.strip() for header in table.find_all('th')]
-    rows = []
-    for row in table.find_all('tr')[1:]:
-        cols = [ele.text.strip().replace(',', '') for ele in row.find_all('td')]
-        rows.append(cols)
-    # Store ratios data in a dataframe and clean
-    rd = pd.DataFrame(rows, columns=headers)
-    rd = rd.drop(columns='TTM', errors='ignore')
-    rd = clean_data(rd)
-
-    # # extract market cap
-    # financial_table = soup.find('div', class_='company-ratios')
-    # # remove , then type cast to int and multiply by 1 crore
-    # mcap = int(financial_table.find('li').text.strip().split()[-2].replace(',', '')) * 10000000
-    #
-    # # extract current market price
-    # financial_table = soup.find('div', class_='font-size-18 strong line-height-14')
-    # text = financial_table.text.strip().replace(',', '')
-    # lines = text.split('\n')
-    # price_line = lines[0].strip()
-    # # remove comma and type cast to int
-    # if price_line.startswith('₹'):
-    #     cmp = int(price_line[1:].replace(',', '').strip())
-
-    logger.info(f"Scraped data for ticker: {ticker} successfully.")
-    return {
-        "profit_loss": pl,
-        "balance_sheet": bs,
-        "cash_flows": cf,
-        "ratios": rd
-    }
\ No newline at end of file
+    rows = [[ele.text.strip() for ele in row.find_all('td')] for row in table.find_all('tr')[1:]]
+    return pd.DataFrame(rows, columns=headers).drop(columns='TTM', errors='ignore')
+
+def _peers_frame(table):
+    '''
+    Read the peer comparison into a DataFrame indexed by company name, one column per metric.
+    The median row below the peers is left out.
+    '''
+    headers = [header.get_text(' ', strip=True) for header in table.find_all('th')]
+    rows = [[ele.get_text(strip=True) for ele in row.find_all('td')] for row in table.find_all('tr')]
+    # Peer rows start with their serial number, e.g. '1.'
+    rows = [row for row in rows if len(row) == len(headers) and row[0].rstrip('.').isdigit()]
+    names = pd.Index([row[1] for row in rows], name='Name')
+    values = _to_float([cell for row in rows for cell in row[2:]]).reshape(len(rows), len(headers) - 2)
+    return pd.DataFrame(values, index=names, columns=_clean_labels(headers[2:]))
+
+def _summary_series(soup):
+    '''
+    Read the key ratios above the tables (market cap, current price, P/E, ...) into a Series.
+    Amounts in crores are converted to rupees, and 'High / Low' gives a High and a Low entry.
+    '''
+    ratios = soup.find(id='top-ratios')
+    if ratios is None:
+        raise ValueError("Page has no key ratios")
+    names, cells = [], []
+    for item in ratios.find_all('li'):
+        name = item.find(class_='name')
+        numbers = [number.get_text(strip=True) for number in item.find_all(class_='number')]
+        if name is None or not numbers:
+            continue
+        name = name.get_text(strip=True)
+        parts = [part.strip() for part in name.split('/')] if len(numbers) > 1 else [name]
+        # e.g. 'Market Cap ₹ 12,34,567 Cr.'
+        crores = 'Cr.' in item.get_text()
+        for part, number in zip(parts, numbers):
+            names.append(part)
+            cells.append((number, crores))
+    values = _to_float([number for number, _ in cells]) * np.array([1e7 if crores else 1 for _, crores in cells])
+    return pd.Series(values, index=_clean_labels(names), dtype=np.float64)
+
+def _parse_page(page, sections=DEFAULT_SECTIONS):
+    '''
+    Extract the requested sections from an expanded page: by default the Profit & Loss, Balance Sheet,
+    Cash Flow and Ratios tables.
+    Parameters:
+        page (str | BeautifulSoup): Page source, or an already parsed page.
+        sections (tuple): Section names out of SECTIONS.
+    '''
+    # Parse extended html content, building a tree for the headings and tables (and key ratios) only
+    if not isinstance(page, BeautifulSoup):
+        strainer = _SUMMARY_STRAINER if "summary" in sections else _TABLES_STRAINER
+        page = BeautifulSoup(page, 'html.parser', parse_only=strainer)
+    soup = page
+    tables = _find_tables(soup)
+    missing = [_TABLES[s] for s in sections if s in _TABLES and _TABLES[s] not in tables]
+    if missing:
+        raise ValueError(f"Page has no {', '.join(missing)} table")
+    data = {}
+    for section in sections:
+        if section == "summary":
+            data[section] = _summary_series(soup)
+        elif section == "peers":
+            data[section] = _peers_frame(tables[_TABLES[section]])
+        else:
+            quarterly = section in ("quarters", "shareholding")
+            data[section] = clean_data(_table_frame(tables[_TABLES[section]]), quarterly)
+    return data
+
+
+def _http_session():
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    return session
+
+def latest_period(ticker, session=None, timeout=DEFAULT_LOAD_TIMEOUT):
+    '''
+    Latest annual period of a ticker's Profit & Loss table, read from the static page without expanding anything.
+    Parameters:
+    ticker (str): Stock ticker symbol.
+    session (requests.Session, optional): HTTP session to reuse.
+    Returns:
+    int: The latest year, or None when it could not be determined.
+    '''
+    try:
+        with resources.http_slot():
+            response = (session or _http_session()).get(f"{_BASE}{ticker}/", timeout=timeout)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    soup = BeautifulSoup(response.text, 'html.parser', parse_only=_TABLES_STRAINER)
+    table = _find_tables(soup).get(_STATEMENTS["profit_loss"])
+    if table is None:
+        return None
+    periods = [th.text.strip() for th in table.find_all('th')][1:]
+    years = [''.join(filter(str.isdigit, period)) for period in periods if period != 'TTM']
+    years = [int(year) for year in years if year]
+    return max(years) if years else None
+
+def _read_store(ticker, store, session=None, sections=DEFAULT_SECTIONS):
+    '''
+    Stored sections of a ticker when the store's freshness policy allows using them all, else None.
+    '''
+    meta = store.meta(ticker)
+    if meta is None:
+        return None
+    if store.is_fresh(ticker, sections):
+        return store.read(ticker, sections)
+    # A new annual period only tells about the annual statements; quarters, prices and peers change in between
+    if (store.check_period and meta.get("latest_period") is not None and set(sections) <= set(_STATEMENTS)
+            and store.age_days(ticker, sections) is not None):
+        if latest_period(ticker, session) == meta["latest_period"]:
+            data = store.read(ticker, sections)
+            if data is not None:
+                # Nothing new was published, the stored scrape is as good as a fresh one
+                store.touch(ticker, sections)
+                return data
+    return None
+
+def scrape_fundamentals(ticker, driver=None, load_timeout=DEFAULT_LOAD_TIMEOUT,
+                        expand_timeout=DEFAULT_EXPAND_TIMEOUT, timings=None, mode="auto", session=None,
+                        store=None, sections=None):
+    '''
+    Scrape fundamental data for a given stock ticker from Screener.in.
+    Parameters:
+    ticker (str): Stock ticker symbol.
+    driver (webdriver.Chrome, optional): Running webdriver to reuse. A new one is started
+        (and quit afterwards) when not given.
+    load_timeout (float): Seconds to wait for the page's tables to appear.
+    expand_timeout (float): Seconds to wait for the rows of each expanded table row.
+    timings (dict, optional): Filled with the seconds spent per phase: 'browser_start',
+        'page_load', 'expand', 'parse' and 'total'.
+    mode (str): 'http' fetches the static page and its expanded rows without a browser, 'browser'
+        always uses Chrome, and 'auto' tries HTTP first and falls back to the browser.
+    session (requests.Session, optional): HTTP session to reuse in the 'http' and 'auto' modes.
+    store (str | FundamentalsStore, optional): Local store to read through. Fresh tickers are served
+        from disk and scraped tickers are written back.
+    sections (list | str, optional): Sections to extract from the one page load, out of SECTIONS:
+        'profit_loss', 'balance_sheet', 'cash_flows', 'ratios', 'quarters' (quarterly results),
+        'shareholding' (quarterly shareholding pattern), 'peers' (peer comparison) and 'summary'
+        (market cap, current price and the other key ratios), or 'all'. Defaults to the four
+        annual statements. Only the tables of requested sections are expanded.
+    Returns:
+    dict: A DataFrame per requested section; 'summary' is a Series. Annual tables are indexed by
+        year, quarterly ones by period end date and the peers by company name.
+
+    '''
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    sections = _sections(sections)
+    if store is not None:
+        store = FundamentalsStore(store) if isinstance(store, str) else store
+        data = _read_store(ticker, store, session, sections)
+        if data is not None:
+            logger.info(f"Loaded fundamentals for ticker: {ticker} from {store.root}")
+            return data
+        data = scrape_fundamentals(ticker, driver, load_timeout, expand_timeout, timings, mode, session,
+                                   sections=sections)
+        store.write(ticker, data)
+        return data
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+    page = None
+    page_mode = "browser"
+    if mode != "browser":
+        try:
+            page = _load_page_http(ticker, session or _http_session(), timings, load_timeout, sections)
+            page_mode = "http"
+            timings.setdefault("browser_start", 0.0)
+        except BrowserRequired as e:
+            if mode == "http":
+                raise
+            metrics.counter(metrics.FUNDAMENTALS_FALLBACKS)
+            logger.info(f"Falling back to the browser for {ticker}: {e}")
+
+    if page is None:
+        browser_start = time.perf_counter()
+        own_driver = driver is None
+        if own_driver:
+            driver = _new_driver()
+            timings["browser_start"] = time.perf_counter() - browser_start
+        else:
+            # A reused browser costs nothing here; a pool records its own start-up time
+            timings.setdefault("browser_start", 0.0)
+        try:
+            page = _load_page(driver, ticker, timings, load_timeout, expand_timeout, sections)
+        finally:
+            if own_driver:
+                # Close chrome tab
+                _quit_driver(driver)
+    parse_start = time.perf_counter()
+    data = _parse_page(page, sections)
+    timings["parse"] = time.perf_counter() - parse_start
+    timings["total"] = time.perf_counter() - start
+    logger.info(
+        f"Scraped data for ticker: {ticker} successfully in {timings['total']:.2f}s ("
+        + ", ".join(f"{phase} {timings[phase]:.2f}s" for phase in ("browser_start", "page_load", "expand", "parse"))
+        + ")"
+    )
+    fetched_with = "http" if page_mode == "http" else "browser"
+    for phase in ("browser_start", "page_load", "expand", "parse", "total"):
+        # browser_start is 0 when no browser was started for this ticker
+        if phase != "browser_start" or timings[phase] > 0:
+            metrics.histogram(metrics.FUNDAMENTALS_PHASE_SECONDS, timings[phase], phase=phase, mode=fetched_with)
+    return data
+
+
+class FundamentalsSession:
+    '''
+    Pool of warm headless Chrome instances for scraping many tickers.
+
+    In the default 'auto' mode every ticker is first scraped over plain HTTP and only tickers
+    that need it are handed to a browser. Browsers are started lazily, at most `workers` of them,
+    and reused across tickers. A browser that crashes is quit and replaced on its next use; other
+    failures only affect their ticker.
+
+    Example:
+        with FundamentalsSession(workers=4, sections="all") as session:
+            results, errors = session.scrape_many(["TCS", "INFY", "HDFCBANK"])
+    '''
+
+    def __init__(self, workers: int = 4, load_timeout=DEFAULT_LOAD_TIMEOUT, expand_timeout=DEFAULT_EXPAND_TIMEOUT,
+                 mode="auto", store=None, sections=None):
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.workers = workers
+        # Sections extracted for every ticker, see scrape_fundamentals
+        self.sections = _sections(sections)
+        self.load_timeout = load_timeout
+        self.expand_timeout = expand_timeout
+        self.mode = mode
+        self.store = FundamentalsStore(store) if isinstance(store, str) else store
+        # One requests.Session per worker thread, sessions are not thread-safe
+        self._local = threading.local()
+        # Per-phase seconds of every scraped ticker, see scrape_fundamentals
+        self.timings = {}
+        self._drivers = queue.Queue()
+        self._all_drivers = []
+        self._lock = threading.Lock()
+        for _ in range(workers):
+            # None marks a slot whose browser has not been started yet
+            self._drivers.put(None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = _http_session()
+        return self._local.session
+
+    def scrape(self, ticker):
+        '''
+        Scrape one ticker, from the store when it is fresh there, over HTTP when possible and
+        with a browser from the pool otherwise.
+        Parameters:
+            ticker (str): Stock ticker symbol.
+        Returns:
+            dict: As returned by scrape_fundamentals.
+        '''
+        if self.store is not None:
+            data = _read_store(ticker, self.store, self._session(), self.sections)
+            if data is not None:
+                logger.info(f"Loaded fundamentals for ticker: {ticker} from {self.store.root}")
+                return data
+        data = self._scrape(ticker)
+        if self.store is not None:
+            self.store.write(ticker, data)
+        return data
+
+    def _scrape(self, ticker):
+        timings = {}
+        self.timings[ticker] = timings
+        if self.mode != "browser":
+            try:
+                return scrape_fundamentals(
+                    ticker, load_timeout=self.load_timeout, timings=timings, mode="http", session=self._session(),
+                    sections=self.sections,
+                )
+            except BrowserRequired as e:
+                if self.mode == "http":
+                    raise
+                logger.info(f"Falling back to the browser for {ticker}: {e}")
+
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+        driver = self._drivers.get()
+        try:
+            while driver is None:
+                # Never wait on the global budget: its slots may all be held by this session's own
+                # browsers, which only give them back in close(). Poll it instead, while waiting for
+                # one of those browsers to be handed back.
+                release = resources.acquire_browser(blocking=False)
+                if release is None:
+                    try:
+                        other = self._drivers.get(timeout=_BUDGET_POLL)
+                    except queue.Empty:
+                        continue
+                    # Keep a single slot: the browser that came back, else the unstarted one
+                    self._drivers.put(None)
+                    driver = other
+                    if driver is None:
+                        time.sleep(_BUDGET_POLL)
+                    continue
+                start = time.perf_counter()
+                driver = _new_driver(release)
+                timings["browser_start"] = time.perf_counter() - start
+                with self._lock:
+                    self._all_drivers.append(driver)
+            return scrape_fundamentals(
+                ticker, driver, self.load_timeout, self.expand_timeout, timings, mode="browser", sections=self.sections
+            )
+        except TimeoutException:
+            # A slow page, the browser is still fine for the next ticker
+            raise
+        except WebDriverException:
+            # The browser itself is broken: drop it so the slot starts a fresh one next time
+            self._discard(driver)
+            driver = None
+            raise
+        finally:
+            self._drivers.put(driver)
+
+    def scrape_many(self, tickers):
+        '''
+        Scrape several tickers concurrently, one per pooled browser.
+        Parameters:
+            tickers (list): Stock ticker symbols.
+        Returns:
+            tuple: (results, errors) dicts keyed by ticker, holding the scraped data for tickers
+                that succeeded and the exception for tickers that failed.
+        '''
+        results, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.scrape, ticker): ticker for ticker in dict.fromkeys(tickers)}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to scrape fundamentals for {ticker}: {e!r}")
+                    errors[ticker] = e
+        return results, errors
+
+    def _discard(self, driver):
+        if driver is None:
+            # The browser did not start, there is nothing to quit
+            return
+        with self._lock:
+            if driver in self._all_drivers:
+                self._all_drivers.remove(driver)
+        try:
+            _quit_driver(driver)
+        except Exception:
+            pass
+
+    def close(self):
+        '''
+        Quit every browser of the pool.
+        '''
+        with self._lock:
+            drivers, self._all_drivers = self._all_drivers, []
+        for driver in drivers:
+            try:
+                _quit_driver(driver)
+            except Exception as e:
+                logger.warning(f"Failed to quit browser: {e!r}")
+
+
+def scrape_fundamentals_many(tickers, workers=4, mode="auto", store=None, sections=None):
+    '''
+    Scrape fundamental data for many tickers with a pool of reused browsers.
+    Parameters:
+    tickers (list): Stock ticker symbols.
+    workers (int): Number of tickers (and at most browsers) scraped concurrently.
+    mode (str): 'auto', 'http' or 'browser', see scrape_fundamentals.
+    store (str | FundamentalsStore, optional): Local store to read through, see scrape_fundamentals.
+    sections (list | str, optional): Sections to extract per ticker, see scrape_fundamentals.
+    Returns:
+    tuple: (results, errors) dicts keyed by ticker. results maps tickers to the dict returned by
+        scrape_fundamentals; errors maps tickers that failed to their exception.
+    '''
+    with FundamentalsSession(workers, mode=mode, store=store, sections=sections) as session:
+        return session.scrape_many(tickers)
@@ -0,0 +1,151 @@
+'''
+Module with a local Parquet store for scraped fundamentals.
+'''
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STATEMENTS = ("profit_loss", "balance_sheet", "cash_flows", "ratios")
+# Sections scraped as a Series rather than a DataFrame
+_SERIES = ("summary",)
+
+
+class FundamentalsStore:
+    '''
+    Columnar on-disk store of fundamentals: one Parquet file per section (statement, quarters, ...)
+    and ticker, plus a small JSON metadata file per ticker with the time each section was scraped.
+
+    Layout:
+        <root>/<section>/<TICKER>.parquet
+        <root>/_meta/<TICKER>.json   {"scraped_at": ..., "latest_period": 2024, "sections": {"profit_loss": ...}}
+
+    A ticker's sections are fresh when they were all scraped within max_age_days. Stale tickers can still be served
+    from disk when check_period is set and a cheap probe shows that Screener.in has not published
+    a newer period since (see scrape_fundamentals).
+
+    Parameters:
+        root (str): Directory of the store.
+        max_age_days (float): Days a scrape stays fresh without any check.
+        check_period (bool): Probe the latest reported period of stale tickers before re-scraping.
+    '''
+
+    def __init__(self, root: str, max_age_days: float = 7, check_period: bool = True):
+        self.root = root
+        self.max_age_days = max_age_days
+        self.check_period = check_period
+        os.makedirs(os.path.join(root, "_meta"), exist_ok=True)
+
+    def _path(self, statement, ticker):
+        return os.path.join(self.root, statement, f"{ticker.upper()}.parquet")
+
+    def _meta_path(self, ticker):
+        return os.path.join(self.root, "_meta", f"{ticker.upper()}.json")
+
+    def tickers(self):
+        '''
+        Returns:
+            list: Tickers with data in the store.
+        '''
+        return sorted(name[:-5] for name in os.listdir(os.path.join(self.root, "_meta")) if name.endswith(".json"))
+
+    def meta(self, ticker):
+        '''
+        Returns:
+            dict: 'scraped_at' (unix time), 'latest_period' (year) and 'sections' (unix time each
+                section was scraped) of a ticker, or None if not stored.
+        '''
+        try:
+            with open(self._meta_path(ticker), encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        # Stores written before sections were selectable hold the statements only
+        meta.setdefault("sections", dict.fromkeys(STATEMENTS, meta["scraped_at"]))
+        return meta
+
+    def age_days(self, ticker, sections=STATEMENTS):
+        '''
+        Returns:
+            float: Days since the oldest of the sections was last scraped or confirmed unchanged,
+                None if any of them is not stored.
+        '''
+        meta = self.meta(ticker)
+        if meta is None or any(section not in meta["sections"] for section in sections):
+            return None
+        return (time.time() - min(meta["sections"][section] for section in sections)) / 86400
+
+    def is_fresh(self, ticker, sections=STATEMENTS):
+        age = self.age_days(ticker, sections)
+        return age is not None and age <= self.max_age_days
+
+    def read(self, ticker, sections=STATEMENTS):
+        '''
+        Returns:
+            dict: Section DataFrames (a Series for 'summary') of a ticker as returned by scrape_fundamentals,
+                or None if any of them is not stored.
+        '''
+        if self.meta(ticker) is None:
+            return None
+        data = {}
+        try:
+            for section in sections:
+                frame = pd.read_parquet(self._path(section, ticker))
+                data[section] = frame.iloc[:, 0].rename(None) if section in _SERIES else frame
+        except FileNotFoundError:
+            return None
+        return data
+
+    def write(self, ticker, data):
+        '''
+        Store the sections of a ticker and mark them as freshly scraped. Other stored sections are kept.
+        Parameters:
+            ticker (str): Stock ticker symbol.
+            data (dict): Section DataFrames as returned by scrape_fundamentals.
+        '''
+        for section, frame in data.items():
+            if section in _SERIES:
+                frame = frame.to_frame(section)
+            if frame.columns.duplicated().any():
+                # Parquet needs unique column names; keep the first row of a repeated label
+                logger.debug(f"{ticker} {section} has repeated rows, keeping the first of each")
+                frame = frame.loc[:, ~frame.columns.duplicated()]
+            path = self._path(section, ticker)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp"
+            frame.to_parquet(tmp)
+            os.replace(tmp, path)
+        meta = self.meta(ticker) or {"latest_period": None, "sections": {}}
+        latest_period = meta["latest_period"]
+        if "profit_loss" in data:
+            latest = data["profit_loss"].index.max()
+            latest_period = int(latest) if pd.notna(latest) else None
+        self._write_meta(ticker, latest_period, meta["sections"], data)
+
+    def touch(self, ticker, sections=STATEMENTS):
+        '''
+        Mark stored sections of a ticker as fresh without rewriting them, after confirming nothing new was published.
+        '''
+        meta = self.meta(ticker)
+        if meta is not None:
+            self._write_meta(ticker, meta.get("latest_period"), meta["sections"], sections)
+
+    def _write_meta(self, ticker, latest_period, scraped, sections):
+        now = time.time()
+        meta = {
+            "scraped_at": now,
+            "scraped_at_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "latest_period": latest_period,
+            "sections": {**scraped, **dict.fromkeys(sections, now)},
+        }
+        path = self._meta_path(ticker)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
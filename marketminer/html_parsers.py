@@ -0,0 +1,119 @@
+'''
+Module with pluggable HTML parsing backends for the news scraper.
+
+Three backends extract the same data from Economic Times pages:
+    - 'selectolax': lexbor C parser via selectolax, the fastest.
+    - 'lxml': libxml2 parser via lxml, matched with XPath.
+    - 'bs4': BeautifulSoup with html.parser, restricted with a SoupStrainer so only the
+      matching elements are turned into a tree.
+'auto' picks the first one installed in that order.
+'''
+
+import re
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+BACKENDS = ("selectolax", "lxml", "bs4")
+
+# Archive links to articles in these sections, and the containers holding an article's text
+ARCHIVE_SELECTOR = "a[href*='/industry/'], a[href*='/markets/'], a[href*='/tech/']"
+BODY_SELECTOR = ".artText, .Normal"
+
+_ARCHIVE_XPATH = (
+    "//a[contains(@href, '/industry/') or contains(@href, '/markets/') or contains(@href, '/tech/')]"
+)
+_BODY_XPATH = (
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' artText ')"
+    " or contains(concat(' ', normalize-space(@class), ' '), ' Normal ')]"
+)
+_ARCHIVE_STRAINER = SoupStrainer("a", href=re.compile(r"/(?:industry|markets|tech)/"))
+_BODY_STRAINER = SoupStrainer(class_=re.compile(r"(?:^|\s)(?:artText|Normal)(?:\s|$)"))
+
+
+@lru_cache(maxsize=None)
+def available_backends():
+    '''
+    Returns:
+        tuple: Names of the installed parsing backends, fastest first.
+    '''
+    backends = []
+    try:
+        import selectolax.lexbor  # noqa: F401
+        backends.append("selectolax")
+    except ImportError:
+        pass
+    try:
+        import lxml.html  # noqa: F401
+        backends.append("lxml")
+    except ImportError:
+        pass
+    backends.append("bs4")
+    return tuple(backends)
+
+
+def resolve_backend(backend="auto"):
+    '''
+    Map 'auto' to the fastest installed backend and validate explicit choices.
+    '''
+    if backend == "auto":
+        return available_backends()[0]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r}, expected one of {BACKENDS} or 'auto'.")
+    if backend not in available_backends():
+        raise ImportError(f"Parser backend {backend!r} is not installed: pip install {backend}")
+    return backend
+
+
+def extract_archive_links(html, backend="auto"):
+    '''
+    Extract article links from an archive page.
+    Parameters:
+        html (str): The archive page.
+        backend (str): Parsing backend, see BACKENDS.
+    Returns:
+        list: (headline, href) pairs in document order.
+    '''
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return [(a.text(), a.attributes.get("href") or "") for a in LexborHTMLParser(html).css(ARCHIVE_SELECTOR)]
+    if backend == "lxml":
+        tree = _lxml_tree(html)
+        if tree is None:
+            return []
+        return [(a.text_content(), a.get("href", "")) for a in tree.xpath(_ARCHIVE_XPATH)]
+    soup = BeautifulSoup(html, "html.parser", parse_only=_ARCHIVE_STRAINER)
+    return [(a.text, a.get("href", "")) for a in soup.select(ARCHIVE_SELECTOR)]
+
+
+def extract_article_body(html, backend="auto"):
+    '''
+    Extract the text of an article page.
+    Parameters:
+        html (str): The article page.
+        backend (str): Parsing backend, see BACKENDS.
+    Returns:
+        str: Text of every .artText / .Normal element joined by spaces.
+    '''
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return ' '.join(node.text() for node in LexborHTMLParser(html).css(BODY_SELECTOR))
+    if backend == "lxml":
+        tree = _lxml_tree(html)
+        if tree is None:
+            return ""
+        return ' '.join(node.text_content() for node in tree.xpath(_BODY_XPATH))
+    soup = BeautifulSoup(html, "html.parser", parse_only=_BODY_STRAINER)
+    return ' '.join(p.get_text() for p in soup.select(BODY_SELECTOR))
+
+
+def _lxml_tree(html):
+    import lxml.html
+    from lxml.etree import ParserError
+    try:
+        return lxml.html.fromstring(html)
+    except ParserError:
+        # Raised for empty documents
+        return None
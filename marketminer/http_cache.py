@@ -0,0 +1,220 @@
+'''
+Module with a persistent on-disk cache for HTTP responses.
+'''
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, bodies fall back to zlib
+    zstandard = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body BLOB NOT NULL,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+# Cache hits whose access time is kept in memory before it is written to the database
+_ACCESS_BATCH = 1000
+
+
+class CachedResponse:
+    '''
+    A response read back from the cache.
+
+    Attributes:
+        url (str): The cached URL.
+        text (str): The decoded response body.
+        etag (str): ETag sent by the server, if any.
+        last_modified (str): Last-Modified sent by the server, if any.
+        expires_at (float): Unix time after which the entry must be revalidated, None if permanent.
+    '''
+
+    __slots__ = ("url", "text", "etag", "last_modified", "expires_at")
+
+    def __init__(self, url, text, etag, last_modified, expires_at):
+        self.url = url
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return self.expires_at is None or self.expires_at > time.time()
+
+
+class ResponseCache:
+    '''
+    Content-addressed SQLite cache of response bodies keyed by URL.
+
+    Bodies are stored zstd-compressed (zlib when `zstandard` is not installed). Entries carry
+    an optional TTL; expired entries are revalidated with If-None-Match / If-Modified-Since
+    instead of being downloaded again. Once the stored bodies exceed `max_bytes` the least
+    recently used entries are evicted. Access times of cache hits are written in batches, and
+    before any eviction, rather than on every hit.
+
+    The cache can be used from several threads; the fetch layer calls it from worker threads so
+    the compression and SQLite I/O stay off the event loop.
+
+    Parameters:
+        path (str): Path of the SQLite database file.
+        max_bytes (int): Size budget for compressed bodies. None disables eviction.
+    '''
+
+    def __init__(self, path: str, max_bytes: int = 2 * 1024 ** 3):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._lock = threading.Lock()
+        self._accessed = {}
+        self._compressor = zstandard.ZstdCompressor(level=10) if zstandard else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _compress(self, text):
+        data = text.encode("utf-8")
+        if self._compressor:
+            return self._compressor.compress(data), "zstd"
+        return zlib.compress(data, 6), "zlib"
+
+    def _decompress(self, blob, codec):
+        if codec == "zstd":
+            if self._decompressor is None:
+                raise ImportError("zstandard is required to read this cache: pip install zstandard")
+            return self._decompressor.decompress(blob).decode("utf-8")
+        return zlib.decompress(blob).decode("utf-8")
+
+    def get(self, url):
+        '''
+        Look up a URL.
+        Parameters:
+            url (str): The URL to look up.
+        Returns:
+            CachedResponse: The cached entry, fresh or stale, or None when the URL is not cached.
+        '''
+        key = self.key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, codec, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= _ACCESS_BATCH:
+                self._flush_accessed()
+        body, codec, etag, last_modified, expires_at = row
+        return CachedResponse(url, self._decompress(body, codec), etag, last_modified, expires_at)
+
+    def put(self, url, text, ttl=None, etag=None, last_modified=None):
+        '''
+        Store a response body.
+        Parameters:
+            url (str): The fetched URL.
+            text (str): The response body.
+            ttl (float): Seconds the entry stays fresh. None keeps it forever.
+            etag (str): ETag response header, used for revalidation.
+            last_modified (str): Last-Modified response header, used for revalidation.
+        '''
+        key = self.key(url)
+        blob, codec = self._compress(text)
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, url, body, codec, size, etag, last_modified, fetched_at, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, blob, codec, len(blob), etag, last_modified, now, expires_at, now),
+            )
+            self._accessed.pop(key, None)
+            self._total += len(blob) - (old[0] if old else 0)
+            if self.max_bytes is not None and self._total > self.max_bytes:
+                self._evict()
+
+    def touch(self, url, ttl=None):
+        '''
+        Mark a cached entry as revalidated (after a 304 Not Modified) and restart its TTL.
+        '''
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        key = self.key(url)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?", (expires_at, now, key)
+            )
+            self._accessed.pop(key, None)
+
+    def _flush_accessed(self):
+        # Called with the lock held
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def evict(self, target_bytes=None):
+        '''
+        Drop least recently used entries until the stored bodies fit in target_bytes,
+        which defaults to 90% of max_bytes.
+        '''
+        with self._lock:
+            self._evict(target_bytes)
+
+    def _evict(self, target_bytes=None):
+        # The pending access times decide what is least recently used
+        self._flush_accessed()
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        victims = []
+        total = self._total
+        for key, size in rows:
+            if total <= target_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        rows.close()
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._total = total
+        logger.debug(f"Evicted {len(victims)} cached responses from {self.path}")
+
+    def close(self):
+        with self._lock:
+            self._flush_accessed()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,160 @@
+'''
+Module with a local Parquet store for parsed macroeconomic workbooks.
+'''
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Characters of sheet names that are not safe in file names
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+def file_sha256(path):
+    '''
+    Returns:
+        str: Hex sha256 of a file's contents.
+    '''
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MacroStore:
+    '''
+    Versioned on-disk store of parsed macro workbooks: one Parquet file per source workbook and
+    frequency sheet, plus a manifest with the sha256 of the raw workbook each source was parsed from.
+
+    Layout:
+        <root>/<source>/<sheet>.parquet
+        <root>/manifest.json   {source: {"sha256": ..., "fetched_at": ..., "sheets": {sheet: file}}}
+
+    A source is fresh when it was downloaded within max_age_days. A stale source is downloaded
+    again, but only re-parsed when the workbook's hash differs from the stored one.
+
+    Parameters:
+        root (str): Directory of the store.
+        max_age_days (float): Days a download stays fresh.
+    '''
+
+    def __init__(self, root: str, max_age_days: float = 1):
+        self.root = root
+        self.max_age_days = max_age_days
+        os.makedirs(root, exist_ok=True)
+
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.root, "manifest.json")
+
+    def manifest(self):
+        '''
+        Returns:
+            dict: {source: entry} for every stored source.
+        '''
+        try:
+            with open(self._manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def sources(self):
+        return sorted(self.manifest())
+
+    def sha256(self, source):
+        '''
+        Returns:
+            str: Hash of the workbook a source was parsed from, None if not stored.
+        '''
+        entry = self.manifest().get(source)
+        return None if entry is None else entry["sha256"]
+
+    def age_days(self, source):
+        '''
+        Returns:
+            float: Days since the source was last downloaded, None if not stored.
+        '''
+        entry = self.manifest().get(source)
+        return None if entry is None else (time.time() - entry["fetched_at"]) / 86400
+
+    def is_fresh(self, source):
+        age = self.age_days(source)
+        return age is not None and age <= self.max_age_days
+
+    def read(self, source):
+        '''
+        Returns:
+            dict: {sheet: DataFrame} of a source as returned by clean_data, or None if not stored.
+        '''
+        entry = self.manifest().get(source)
+        if entry is None:
+            return None
+        try:
+            return {
+                sheet: pd.read_parquet(os.path.join(self.root, source, name))
+                for sheet, name in entry["sheets"].items()
+            }
+        except FileNotFoundError:
+            return None
+
+    def write(self, source, sheets, sha256):
+        '''
+        Store the parsed sheets of a workbook and record its hash.
+        Parameters:
+            source (str): Name of the source workbook.
+            sheets (dict): {sheet: DataFrame} as returned by clean_data.
+            sha256 (str): Hash of the raw workbook.
+        '''
+        directory = os.path.join(self.root, source)
+        os.makedirs(directory, exist_ok=True)
+        files = {}
+        for sheet, frame in sheets.items():
+            name = f"{_UNSAFE.sub('_', sheet)}.parquet"
+            path = os.path.join(directory, name)
+            tmp = f"{path}.tmp"
+            _parquet_safe(frame).to_parquet(tmp)
+            os.replace(tmp, path)
+            files[sheet] = name
+        self._update(source, sha256, files)
+
+    def touch(self, source):
+        '''
+        Mark a stored source as freshly downloaded after its workbook turned out unchanged.
+        '''
+        entry = self.manifest().get(source)
+        if entry is not None:
+            self._update(source, entry["sha256"], entry["sheets"])
+
+    def _update(self, source, sha256, files):
+        manifest = self.manifest()
+        manifest[source] = {
+            "sha256": sha256,
+            "fetched_at": time.time(),
+            "fetched_at_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "sheets": files,
+        }
+        tmp = f"{self._manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, self._manifest_path)
+
+
+def _parquet_safe(frame):
+    '''
+    Parquet needs string column names and a single type per column. Workbook columns that mix
+    numbers with markers such as '-' are stored as numbers, with the markers as NaN.
+    '''
+    frame = frame.copy()
+    frame.columns = frame.columns.map(str)
+    for column in frame.columns[(frame.dtypes == object).to_numpy()]:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    return frame
@@ -4,18 +4,22 @@ Module for scraping macros data from various sources.
 
 import logging
 import os
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-logging.basicConfig(level=logging.INFO)
+from . import metrics, resources
+from .excel_readers import DATE_FORMATS, parse_dates, read_workbook, to_float_block
+from .macro_store import MacroStore, file_sha256
+
 logger = logging.getLogger(__name__)
 
 def setup_driver(download_dir="macro_downloads"):
+    # selenium is only imported once a download is needed, stored data never loads it
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
     # Make sure download folder exists
     os.makedirs(download_dir, exist_ok=True)
 
@@ -36,167 +40,347 @@ def setup_driver(download_dir="macro_downloads"):
     driver = webdriver.Chrome(options=chrome_options)
     return driver
 
-def download_rbi_file(button_text: str, filename: str, download_dir="macro_downloads"):
-    driver = setup_driver(download_dir)
+# Workbooks linked from the RBI DBIE home page: source name -> (link text, cleaned like the main file)
+_RBI_SOURCES = {
+    "macroeconomic_indicators": ("50 Macroeconomic Indicators", True),
+    "other_macroeconomic_indicators": ("Other Macroeconomic Indicators", False),
+}
+
+# Suffixes of files Chrome is still writing
+_PARTIAL_SUFFIXES = (".crdownload", ".tmp", ".part")
+
+DEFAULT_DOWNLOAD_TIMEOUT = 120
+
+
+def _wait_for_download(download_dir, before, timeout=DEFAULT_DOWNLOAD_TIMEOUT, poll=0.25):
+    """
+    Wait until a download started after `before` was snapshotted has finished.
+
+    A download is complete once a new file without a partial suffix exists, no partial file is
+    left in the directory and the file size is unchanged between two polls.
+
+    Parameters:
+    download_dir (str): The browser's download directory.
+    before (set): File names present in download_dir before the download was triggered.
+    timeout (float): Seconds to wait before giving up.
+    poll (float): Seconds between directory scans.
+
+    Returns:
+    str: Path of the downloaded file.
+    """
+    deadline = time.monotonic() + timeout
+    last_size = None
+    while time.monotonic() < deadline:
+        new = set(os.listdir(download_dir)) - before
+        partial = [f for f in new if f.endswith(_PARTIAL_SUFFIXES)]
+        done = [f for f in new if not f.endswith(_PARTIAL_SUFFIXES)]
+        if done and not partial:
+            if len(done) > 1:
+                raise RuntimeError(f"Expected one new download in {download_dir}, found {sorted(done)}")
+            path = os.path.join(download_dir, done[0])
+            size = os.path.getsize(path)
+            if size > 0 and size == last_size:
+                return path
+            last_size = size
+        time.sleep(poll)
+    raise TimeoutError(f"No download completed in {download_dir} within {timeout} seconds")
+
+
+def download_rbi_file(button_text: str, filename: str, download_dir="macro_downloads",
+                      timeout: float = DEFAULT_DOWNLOAD_TIMEOUT):
+    """
+    Download a workbook from the RBI DBIE home page.
+
+    Parameters:
+    button_text (str): Text of the link that starts the download.
+    filename (str): Name to give the downloaded file.
+    download_dir (str): Directory the browser downloads to.
+    timeout (float): Seconds to wait for the download to finish.
+
+    Returns:
+    str: Path of the downloaded file.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
 
+    # The browser holds a slot of the global resource budget until it has quit
+    release = resources.acquire_browser()
     try:
-        driver.get("https://data.rbi.org.in/DBIE/#/dbie/home")
+        driver = setup_driver(download_dir)
+
+        try:
+            driver.get("https://data.rbi.org.in/DBIE/#/dbie/home")
 
-        wait = WebDriverWait(driver, 20)
+            wait = WebDriverWait(driver, 20)
 
-        link = wait.until(
-            EC.element_to_be_clickable((By.XPATH, f"//a[contains(., '{button_text}')]"))
-        )
-        link.click()
+            link = wait.until(
+                EC.element_to_be_clickable((By.XPATH, f"//a[contains(., '{button_text}')]"))
+            )
 
-        # Wait for download to complete
-        time.sleep(15)  # adjust depending on network speed
+            # Snapshot the directory so only the file this click produces is picked up
+            before = set(os.listdir(download_dir))
+            link.click()
 
-        # Find latest downloaded file
-        files = sorted(
-            [os.path.join(download_dir, f) for f in os.listdir(download_dir)],
-            key=os.path.getctime
-        )
-        downloaded_file = files[-1]
+            # Return as soon as the download is complete instead of sleeping a fixed time
+            with metrics.timed(metrics.RBI_DOWNLOAD_WAIT_SECONDS, file=filename):
+                downloaded_file = _wait_for_download(download_dir, before, timeout)
 
-        # Rename to expected filename
-        new_path = os.path.join(download_dir, filename)
-        os.rename(downloaded_file, new_path)
+            # Rename to expected filename
+            new_path = os.path.join(download_dir, filename)
+            os.replace(downloaded_file, new_path)
 
-        print(f"✅ Downloaded: {new_path}")
-        return new_path
+            logger.info(f"Downloaded: {new_path}")
+            return new_path
 
+        finally:
+            driver.quit()
     finally:
-        driver.quit()
+        release()
+
+# Layout of the two workbooks: row of the column headers, and rows to skip between the headers
+# and the data (the other workbook has a units row there)
+_LAYOUTS = {
+    True: {"header": 3, "skip_rows": 0},
+    False: {"header": 1, "skip_rows": 1},
+}
+
+
+def _unique_names(names):
+    # Repeated headers get .1, .2, ... suffixes, as pandas names them
+    seen = {}
+    unique = []
+    for name in names:
+        if name in seen:
+            seen[name] += 1
+            unique.append(f"{name}.{seen[name]}")
+        else:
+            seen[name] = 0
+            unique.append(name)
+    return unique
+
+
+def _sheet_frame(rows, header, skip_rows, date_formats):
+    """
+    Build a typed frame from the cell values of one sheet.
+
+    The first column is dropped, the second holds the dates and becomes the index, and every
+    column with a header becomes a float64 column. Rows without a parseable date (blank rows,
+    footnotes) are dropped.
+
+    Parameters:
+    rows (list): Row lists of cell values as returned by read_workbook.
+    header (int): Row of the column headers.
+    skip_rows (int): Rows to skip between the headers and the data.
+    date_formats (tuple): Formats tried on dates stored as text.
+
+    Returns:
+    pd.DataFrame: Float frame indexed by date, sorted by date.
+    """
+    names = list(rows[header]) if len(rows) > header else []
+    data = rows[header + 1 + skip_rows:]
+
+    # Columns with a header, after the dropped first column and the date column
+    keep = [i for i in range(2, len(names)) if names[i] is not None and str(names[i]).strip()]
+    columns = _unique_names([names[i] if isinstance(names[i], str) else str(names[i]) for i in keep])
+
+    dates = parse_dates([row[1] if len(row) > 1 else None for row in data], date_formats)
+    values = to_float_block([[row[i] if i < len(row) else None for i in keep] for row in data], len(keep))
 
-def clean_data(main) -> dict:
+    frame = pd.DataFrame(values, index=dates, columns=pd.Index(columns, dtype=object))
+    frame.index.name = names[1] if len(names) > 1 else None
+    frame = frame[frame.index.notna()]
+    return frame.sort_index(kind="stable")
+
+
+def clean_data(main, file_path: str = None, reader: str = "auto", date_formats=DATE_FORMATS) -> dict:
     """
     Clean the DataFrame by combining all the sheets and cleaning the data.
 
     Parameters:
     main (bool): If True, clean like the main macro50 file.
                  If False, clean like the other macro file.
+    file_path (str, optional): Path of the workbook. Defaults to the file in macro_downloads.
+    reader (str, optional): Excel reader backend: 'calamine', 'openpyxl' or 'auto' (the fastest installed).
+    date_formats (tuple, optional): Formats tried, in order, on dates stored as text.
 
     Returns:
-    dict: A dictionary with cleaned DataFrames for each sheet.
+    dict: A dictionary with a float DataFrame indexed by date for each sheet.
     """
-    if main:
-        file_path = 'macro_downloads/macroeconomic_indicators.xlsx'
-
-        # Read the Excel file with all sheets
-        df = pd.read_excel(
-            file_path,
-            sheet_name=None,
-            engine='openpyxl',
-            header=3
-        )
-
-        cleaned_data = {}
-        for sheet_name, sheet_data in df.items():
-            # Drop the 1st column from each sheet
-            sheet_data = sheet_data.iloc[:, 1:]
-            # Set the first column as index
-            sheet_data.set_index(sheet_data.columns[0], inplace=True, drop=True)
-            # Make the index a datetime index
-            sheet_data.index = pd.to_datetime(sheet_data.index, errors='coerce')
-            # Drop columns with Unnamed in the name
-            sheet_data = sheet_data.loc[:, ~sheet_data.columns.str.contains('^Unnamed')]
-            # Sort index
-            sheet_data.sort_index(inplace=True)
-
-            cleaned_data[sheet_name] = sheet_data
-        return cleaned_data
+    if file_path is None:
+        file_path = 'macro_downloads/macroeconomic_indicators.xlsx' if main \
+            else 'macro_downloads/other_macroeconomic_indicators.xlsx'
 
-    else:
-        file_path = 'macro_downloads/other_macroeconomic_indicators.xlsx'
+    # Read cell values only, without pandas' per-cell type inference
+    sheets = read_workbook(file_path, reader)
+
+    layout = _LAYOUTS[bool(main)]
+    return {name: _sheet_frame(rows, date_formats=date_formats, **layout) for name, rows in sheets.items()}
+
+
+def _merge_sheets(frames):
+    """
+    Outer-join sheets of the same frequency on their dates.
+
+    A date repeated within a sheet keeps its last row, and where two sheets report the same
+    indicator on the same date the first sheet's value wins.
+
+    Parameters:
+    frames (list): DataFrames indexed by date.
+
+    Returns:
+    pd.DataFrame: One row per date, sorted by date, with the columns of every sheet.
+    """
+    merged = None
+    for frame in frames:
+        frame = frame[~frame.index.duplicated(keep="last")]
+        merged = frame if merged is None else merged.combine_first(frame)
+    return merged.sort_index()
+
+
+def align_macro(data: dict, freq: str = "MS", how: str = "last", ffill: bool = True) -> pd.DataFrame:
+    """
+    Put the sheets returned by scrape_macro_india on one calendar.
 
-        # Read the Excel file with all sheets
-        df = pd.read_excel(
-            file_path,
-            sheet_name=None,
-            engine='openpyxl',
-            header=1
-        )
+    Sheets reported more often than freq are downsampled with `how`; sheets reported less often
+    land in the period they were published in and, with ffill, carry forward until the next
+    release, so every row holds the values known as of that period.
 
-        cleaned_data = {}
+    Parameters:
+    data (dict): {sheet: DataFrame} as returned by scrape_macro_india.
+    freq (str, optional): Target pandas frequency, e.g. 'W-FRI', 'MS' or 'QS'. Defaults to 'MS'.
+    how (str, optional): Aggregation of the observations within a period, e.g. 'last' or 'mean'. Defaults to 'last'.
+    ffill (bool, optional): Forward fill periods without a new observation. Defaults to True.
 
-        for sheet_name, sheet_data in df.items():
-            # Drop the Unnamed: 0 column from each sheet
-            sheet_data = sheet_data.iloc[:, 1:]
-            # Drop the first 1 row
-            sheet_data = sheet_data.drop(sheet_data.index[:1])
-            # Set the first column as index
-            sheet_data.set_index(sheet_data.columns[0], inplace=True, drop=True)
-            # Make the index a datetime index
-            sheet_data.index = pd.to_datetime(sheet_data.index, errors='coerce')
-            # Drop columns with Unnamed in the name
-            sheet_data = sheet_data.loc[:, ~sheet_data.columns.str.contains('^Unnamed')]
-            # Sort index
-            sheet_data.sort_index(inplace=True)
+    Returns:
+    pd.DataFrame: One row per period, with (sheet, indicator) columns.
+    """
+    frames = {sheet: frame.resample(freq).agg(how) for sheet, frame in data.items() if not frame.empty}
+    if not frames:
+        return pd.DataFrame()
+    aligned = pd.concat(frames, axis=1, names=["sheet", "indicator"]).sort_index()
+    return aligned.ffill() if ffill else aligned
 
-            cleaned_data[sheet_name] = sheet_data
-        return cleaned_data
 
+def _parse_source(source, path, store=None, reader="auto"):
+    """
+    Clean a downloaded workbook, or reuse the stored sheets when the workbook is unchanged.
 
+    Parameters:
+    source (str): Name of the source workbook, a key of _RBI_SOURCES.
+    path (str): Path of the downloaded workbook.
+    store (MacroStore, optional): Store to compare against and update.
+    reader (str, optional): Excel reader backend, see clean_data.
 
-def scrape_macro_india(start_date: str = None, end_date: str = None)-> dict:
+    Returns:
+    dict: A dictionary with cleaned DataFrames for each sheet.
+    """
+    main = _RBI_SOURCES[source][1]
+    if store is None:
+        return clean_data(main, path, reader)
+
+    digest = file_sha256(path)
+    if digest == store.sha256(source):
+        sheets = store.read(source)
+        if sheets is not None:
+            logger.info(f"{source} is unchanged since the last download, using the stored sheets")
+            store.touch(source)
+            return sheets
+
+    store.write(source, clean_data(main, path, reader), digest)
+    # Read back so stored and freshly parsed sheets always have the same types
+    return store.read(source)
+
+
+def scrape_macro_india(start_date: str = None, end_date: str = None,
+                       download_timeout: float = DEFAULT_DOWNLOAD_TIMEOUT, store=None,
+                       reader: str = "auto") -> dict:
     """
     Scrape macroeconomic data for India from RBI website.
 
     Parameters:
     start_date (str, optional): Start date for the data in 'YYYY-MM-DD' format. Defaults to None.
     end_date (str, optional): End date for the data in 'YYYY-MM-DD' format. Defaults to None.
+    download_timeout (float, optional): Seconds to wait for each workbook download. Defaults to 120.
+    store (str | MacroStore, optional): Local store to read through. Workbooks downloaded within the
+        store's max_age_days are served from disk without starting a browser; stale ones are downloaded
+        again and only re-parsed when their contents changed.
+    reader (str, optional): Excel reader backend: 'calamine', 'openpyxl' or 'auto' (the fastest installed).
     Returns:
     dict: A dictionary containing cleaned DataFrames for each sheet.
+    Raises:
+    RuntimeError: When a workbook could not be downloaded; its `failed` attribute maps the workbooks
+        that failed to their exception. With a store, the workbooks that were downloaded are stored
+        first, so a retry only downloads the missing ones.
     """
 
     logger.info(f"Scraping macroeconomic data from RBI")
 
-    # Download both files
-    download_rbi_file("50 Macroeconomic Indicators", "macroeconomic_indicators.xlsx")
-    download_rbi_file("Other Macroeconomic Indicators", "other_macroeconomic_indicators.xlsx")
-
-    # Clean the data
-    d1 = clean_data(main=True)
-    d2 = clean_data(main=False)
+    data = _read_sources(list(_RBI_SOURCES), download_timeout, store, reader)
+    d1 = data["macroeconomic_indicators"]
+    d2 = data["other_macroeconomic_indicators"]
 
-    # Merge the two dictionaries key-wise
+    # Join the two workbooks sheet-wise on their dates
     # Weekly data will be merged with weekly data, monthly with monthly, etc.
-    merged = {}
-    for key in d1.keys():
-        if key in d2:
-            merged[key] = pd.concat([d1[key], d2[key]], axis=0)
-        else:
-            merged[key] = d1[key]
-
-    for key in d2.keys():
-        if key not in merged:
-            merged[key] = d2[key]
+    merged = {key: _merge_sheets([d[key] for d in (d1, d2) if key in d]) for key in {**d1, **d2}}
 
-    # Filter data based on start_date and end_date
+    # Filter data based on start_date and end_date; the indexes are sorted, so slice them
     start_date = pd.to_datetime(start_date) if start_date else None
     end_date = pd.to_datetime(end_date) if end_date else None
+    merged = {key: frame.loc[start_date:end_date] for key, frame in merged.items()}
 
-    for key in merged.keys():
-        if start_date:
-            merged[key] = merged[key][merged[key].index >= start_date]
-        if end_date:
-            merged[key] = merged[key][merged[key].index <= end_date]
-
-    # Delete the whole macro_downloads folder
-    download_dir = "macro_downloads"
-    if os.path.exists(download_dir):
-        for file in os.listdir(download_dir):
-            file_path = os.path.join(download_dir, file)
-            try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    os.rmdir(file_path)
-            except Exception as e:
-                logger.error(f"Failed to delete {file_path}. Reason: {e}")
-        os.rmdir(download_dir)
-            
     logger.info("Scraping completed for macroeconomic data successfully.")
 
     return merged
+
+
+def _read_sources(sources, download_timeout=DEFAULT_DOWNLOAD_TIMEOUT, store=None, reader="auto"):
+    '''
+    Read the given RBI workbooks, from the store when they are fresh there and downloaded otherwise.
+    Returns:
+        dict: {source: {sheet name: cleaned DataFrame}}
+    Raises:
+        RuntimeError: See scrape_macro_india.
+    '''
+    store = MacroStore(store) if isinstance(store, str) else store
+    data = {}
+    if store is not None:
+        for source in sources:
+            if store.is_fresh(source):
+                sheets = store.read(source)
+                if sheets is not None:
+                    data[source] = sheets
+    stale = [source for source in sources if source not in data]
+
+    if stale:
+        # Download the files at once, each with its own browser into its own directory of a
+        # per-call temporary folder, so concurrent callers never see each other's files
+        with tempfile.TemporaryDirectory(prefix="marketminer_rbi_") as tmp:
+            with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+                downloads = {
+                    source: pool.submit(
+                        download_rbi_file, _RBI_SOURCES[source][0], f"{source}.xlsx",
+                        os.path.join(tmp, source), download_timeout,
+                    )
+                    for source in stale
+                }
+                paths, errors = {}, {}
+                for source, download in downloads.items():
+                    try:
+                        paths[source] = download.result()
+                    except Exception as e:
+                        logger.error(f"Failed to download {source}: {e!r}")
+                        errors[source] = e
+
+            # Clean the data. When a download failed the workbooks that did arrive are still
+            # stored, so a retry only downloads the missing ones.
+            if not errors or store is not None:
+                for source, path in paths.items():
+                    data[source] = _parse_source(source, path, store, reader)
+            if errors:
+                error = RuntimeError(f"Failed to download {', '.join(errors)}")
+                error.failed = errors
+                raise error from next(iter(errors.values()))
+    else:
+        logger.info(f"Loaded macroeconomic data from {store.root}")
+    return data
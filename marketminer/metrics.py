@@ -0,0 +1,235 @@
+'''
+Module with the pluggable instrumentation used by the scrapers' hot paths.
+
+The scrapers report counters, histograms and spans through the functions of this module, which
+forward them to the active Instrumentation. The default does nothing; install a backend with
+set_instrumentation:
+    - InMemoryRecorder: keeps everything in memory, for tests and ad-hoc profiling.
+    - PrometheusInstrumentation: prometheus_client counters and histograms.
+    - OpenTelemetryInstrumentation: OpenTelemetry metrics and trace spans.
+'''
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Metric names. Histograms are in seconds unless the name says otherwise.
+FETCH_SECONDS = "marketminer_fetch_seconds"                     # host, status
+FETCH_REQUESTS = "marketminer_fetch_requests_total"             # host, status
+FETCH_BYTES = "marketminer_fetch_bytes_total"                   # host
+CACHE_HITS = "marketminer_cache_hits_total"                     # result: fresh | revalidated
+PARSE_SECONDS = "marketminer_parse_seconds"                     # page: archive | article, backend
+ARTICLES_SCRAPED = "marketminer_articles_scraped_total"
+ARTICLES_DROPPED = "marketminer_articles_dropped_total"         # reason
+FUNDAMENTALS_PHASE_SECONDS = "marketminer_fundamentals_phase_seconds"  # phase, mode
+FUNDAMENTALS_FALLBACKS = "marketminer_fundamentals_browser_fallbacks_total"
+FUNDAMENTALS_EXPAND_TIMEOUTS = "marketminer_fundamentals_expand_timeouts_total"
+RBI_DOWNLOAD_WAIT_SECONDS = "marketminer_rbi_download_wait_seconds"  # file
+
+
+class Instrumentation:
+    '''
+    No-op instrumentation, and the interface backends implement.
+    Label values are passed as keyword arguments and should have low cardinality.
+    '''
+
+    def counter(self, name, value=1, **labels):
+        '''Add value to a monotonically increasing counter.'''
+
+    def histogram(self, name, value, **labels):
+        '''Record one observation, e.g. a duration in seconds.'''
+
+    @contextmanager
+    def span(self, name, **attributes):
+        '''Trace a block of work.'''
+        yield
+
+
+class InMemoryRecorder(Instrumentation):
+    '''
+    Instrumentation keeping every counter, observation and span in memory.
+
+    Example:
+        recorder = InMemoryRecorder()
+        set_instrumentation(recorder)
+        scrape_economic_times('2024-01-01', '2024-01-07')
+        recorder.summary()
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.spans = []
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def counter(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def histogram(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.histograms.setdefault(key, []).append(value)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.spans.append((name, attributes, time.perf_counter() - start))
+
+    def value(self, name, **labels):
+        '''
+        Returns:
+            float: Sum of a counter over every label set matching the given labels.
+        '''
+        wanted = set(labels.items())
+        return sum(v for (n, key), v in self.counters.items() if n == name and wanted <= set(key))
+
+    def observations(self, name, **labels):
+        '''
+        Returns:
+            list: Observations of a histogram over every label set matching the given labels.
+        '''
+        wanted = set(labels.items())
+        return [v for (n, key), values in self.histograms.items() if n == name and wanted <= set(key) for v in values]
+
+    def summary(self):
+        '''
+        Returns:
+            dict: Counter totals and histogram count/sum/max per metric and label set.
+        '''
+        with self._lock:
+            counters = {f"{n}{dict(key)}": v for (n, key), v in self.counters.items()}
+            histograms = {
+                f"{n}{dict(key)}": {"count": len(values), "sum": sum(values), "max": max(values)}
+                for (n, key), values in self.histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+
+class PrometheusInstrumentation(Instrumentation):
+    '''
+    Instrumentation exporting to prometheus_client. Spans are not supported by Prometheus and
+    are ignored. Requires `pip install prometheus-client`.
+
+    Parameters:
+        registry (CollectorRegistry, optional): Registry to register the metrics in. Defaults to the
+            global registry.
+        buckets (tuple, optional): Histogram buckets in seconds.
+    '''
+
+    def __init__(self, registry=None, buckets=None):
+        try:
+            import prometheus_client
+        except ImportError:
+            raise ImportError("prometheus_client is required: pip install prometheus-client")
+        self._prometheus = prometheus_client
+        self._registry = registry or prometheus_client.REGISTRY
+        self._buckets = buckets or (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _metric(self, kind, name, labels):
+        # Metrics are created on first use with the label names of that call
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                options = {"buckets": self._buckets} if kind is self._prometheus.Histogram else {}
+                metric = kind(name, name.replace("_", " "), sorted(labels), registry=self._registry, **options)
+                self._metrics[name] = metric
+        return metric.labels(**labels) if labels else metric
+
+    def counter(self, name, value=1, **labels):
+        self._metric(self._prometheus.Counter, name, labels).inc(value)
+
+    def histogram(self, name, value, **labels):
+        self._metric(self._prometheus.Histogram, name, labels).observe(value)
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    '''
+    Instrumentation exporting to OpenTelemetry metrics and traces, through the globally configured
+    providers unless a meter and tracer are given. Requires `pip install opentelemetry-api`.
+    '''
+
+    def __init__(self, meter=None, tracer=None):
+        try:
+            from opentelemetry import metrics, trace
+        except ImportError:
+            raise ImportError("opentelemetry is required: pip install opentelemetry-api")
+        self._meter = meter or metrics.get_meter("marketminer")
+        self._tracer = tracer or trace.get_tracer("marketminer")
+        self._instruments = {}
+        self._lock = threading.Lock()
+
+    def _instrument(self, create, name):
+        with self._lock:
+            instrument = self._instruments.get(name)
+            if instrument is None:
+                instrument = self._instruments[name] = create(name)
+        return instrument
+
+    def counter(self, name, value=1, **labels):
+        self._instrument(self._meter.create_counter, name).add(value, labels)
+
+    def histogram(self, name, value, **labels):
+        self._instrument(self._meter.create_histogram, name).record(value, labels)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        with self._tracer.start_as_current_span(name, attributes=attributes):
+            yield
+
+
+_active = Instrumentation()
+
+
+def set_instrumentation(instrumentation):
+    '''
+    Install the instrumentation every scraper reports to.
+    Parameters:
+        instrumentation (Instrumentation): The backend, or None to restore the no-op default.
+    Returns:
+        Instrumentation: The previously installed instrumentation.
+    '''
+    global _active
+    previous = _active
+    _active = instrumentation if instrumentation is not None else Instrumentation()
+    return previous
+
+
+def get_instrumentation():
+    return _active
+
+
+def counter(name, value=1, **labels):
+    _active.counter(name, value, **labels)
+
+
+def histogram(name, value, **labels):
+    _active.histogram(name, value, **labels)
+
+
+def span(name, **attributes):
+    return _active.span(name, **attributes)
+
+
+@contextmanager
+def timed(name, **labels):
+    '''
+    Record the duration of a block in a histogram, inside a span of the same name.
+    '''
+    start = time.perf_counter()
+    with _active.span(name, **labels):
+        try:
+            yield
+        finally:
+            _active.histogram(name, time.perf_counter() - start, **labels)
@@ -0,0 +1,323 @@
+'''
+Module with a persistent inverted index of entity mentions in scraped news.
+'''
+
+import logging
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional, matching falls back to a pure-Python automaton
+    ahocorasick = None
+
+BACKENDS = ("pyahocorasick", "python")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    entity TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS aliases_entity ON aliases (entity);
+CREATE TABLE IF NOT EXISTS articles (
+    article_id TEXT PRIMARY KEY,
+    day TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    entity TEXT NOT NULL,
+    day TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (entity, day, article_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_article ON postings (article_id);
+"""
+
+# Anything that is not a letter or a digit separates words
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize(text):
+    '''
+    Lowercase text and collapse every run of punctuation and whitespace into one space, padded
+    with a space on both sides so that a padded alias only matches on word boundaries.
+    Parameters:
+        text (str): Headline, article body or alias.
+    Returns:
+        str: The normalized text, e.g. ' bajaj auto ltd ' for 'Bajaj-Auto Ltd.'.
+    '''
+    return f" {_SEPARATORS.sub(' ', text.lower()).strip()} "
+
+
+class _TokenAutomaton:
+    '''
+    Pure-Python stand-in for pyahocorasick: a trie over the words of the aliases, walked from
+    every word of the text. Finds the same matches (overlapping ones included) as an
+    Aho-Corasick automaton over the padded normalized aliases.
+    '''
+
+    def __init__(self, aliases):
+        self._root = {}
+        for alias, entity in aliases.items():
+            node = self._root
+            for word in alias.split():
+                node = node.setdefault(word, {})
+            node[None] = entity
+
+    def entities(self, text):
+        words = text.split()
+        root = self._root
+        for i, word in enumerate(words):
+            node = root.get(word)
+            j = i + 1
+            while node is not None:
+                entity = node.get(None)
+                if entity is not None:
+                    yield entity
+                if j == len(words):
+                    break
+                node = node.get(words[j])
+                j += 1
+
+
+class _AhoCorasick:
+    '''
+    Matcher over pyahocorasick's C automaton.
+    '''
+
+    def __init__(self, aliases):
+        self._automaton = ahocorasick.Automaton()
+        for alias, entity in aliases.items():
+            self._automaton.add_word(f" {alias} ", entity)
+        self._automaton.make_automaton()
+
+    def entities(self, text):
+        for _, entity in self._automaton.iter(text):
+            yield entity
+
+
+def resolve_backend(backend="auto"):
+    '''
+    Parameters:
+        backend (str): 'pyahocorasick', 'python' or 'auto' for pyahocorasick when it is installed.
+    Returns:
+        str: The backend name.
+    '''
+    if backend == "auto":
+        return "pyahocorasick" if ahocorasick is not None else "python"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown matcher backend {backend!r}, expected one of {BACKENDS} or 'auto'.")
+    if backend == "pyahocorasick" and ahocorasick is None:
+        raise ImportError("pyahocorasick is required: pip install marketminer[fast]")
+    return backend
+
+
+class NewsIndex:
+    '''
+    SQLite inverted index from entities (tickers, companies, keywords) to the articles
+    mentioning them, with the article dates.
+
+    Each entity has one or more aliases, e.g. {'INFY': ['Infosys', 'INFY']}. A keyword is an
+    entity whose only alias is itself. Headlines and bodies are matched against every alias in
+    one pass with a multi-pattern automaton (pyahocorasick when installed), case-insensitively
+    and on word boundaries. Postings are clustered by (entity, day), so looking up the articles
+    of one entity over a date range reads a single contiguous range of the table.
+
+    Articles are appended incrementally: already indexed article_ids are skipped, so the same
+    frames can be added again after a re-run.
+
+    Parameters:
+        path (str): Path of the SQLite database file.
+        aliases (dict, optional): Aliases to add, see add_aliases.
+        backend (str): Matcher: 'pyahocorasick', 'python' or 'auto'.
+    '''
+
+    def __init__(self, path: str, aliases: dict = None, backend: str = "auto"):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.backend = resolve_backend(backend)
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._matcher = None
+        if aliases:
+            self.add_aliases(aliases)
+
+    def add_aliases(self, aliases):
+        '''
+        Add entities and their aliases. Articles indexed before are not rescanned for the new
+        aliases; add them again with rescan=True for that.
+        Parameters:
+            aliases (dict): Maps each entity to an alias or a list of aliases. The entity name is
+                not matched unless it is listed among its aliases.
+        '''
+        rows = []
+        for entity, names in aliases.items():
+            for name in [names] if isinstance(names, str) else names:
+                alias = normalize(name).strip()
+                if not alias:
+                    raise ValueError(f"Alias {name!r} of {entity!r} has no letters or digits.")
+                rows.append((alias, entity))
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO aliases (alias, entity) VALUES (?, ?)", rows)
+        self._matcher = None
+
+    def aliases(self):
+        '''
+        Returns:
+            dict: Normalized alias -> entity.
+        '''
+        return dict(self._conn.execute("SELECT alias, entity FROM aliases"))
+
+    def entities(self):
+        '''
+        Returns:
+            list: Every entity with aliases, sorted.
+        '''
+        return [row[0] for row in self._conn.execute("SELECT DISTINCT entity FROM aliases ORDER BY entity")]
+
+    def _get_matcher(self):
+        if self._matcher is None:
+            aliases = self.aliases()
+            if not aliases:
+                raise ValueError("The index has no aliases: pass aliases= or call add_aliases first.")
+            self._matcher = (_AhoCorasick if self.backend == "pyahocorasick" else _TokenAutomaton)(aliases)
+        return self._matcher
+
+    def match(self, text):
+        '''
+        Count the entity mentions in a text.
+        Returns:
+            dict: entity -> number of mentions.
+        '''
+        counts = {}
+        for entity in self._get_matcher().entities(normalize(text)):
+            counts[entity] = counts.get(entity, 0) + 1
+        return counts
+
+    def add(self, df: pd.DataFrame, rescan: bool = False) -> int:
+        '''
+        Index articles in the format returned by scrape_economic_times: indexed by date, with
+        article_id, headline and body columns.
+        Parameters:
+            df (pd.DataFrame): The articles.
+            rescan (bool): Re-match articles that are already indexed, e.g. after adding aliases.
+        Returns:
+            int: Number of articles indexed.
+        '''
+        if df.empty:
+            return 0
+        matcher = self._get_matcher()
+        days = pd.DatetimeIndex(df.index).strftime("%Y-%m-%d")
+        ids = df["article_id"].astype(object)
+        # Articles without an id (links that are not articleshow pages) cannot be looked up later
+        keep = ids.notna().to_numpy()
+        if not keep.all():
+            logger.debug(f"Not indexing {(~keep).sum()} articles without an article_id.")
+        texts = (df["headline"].fillna("").astype(str) + " " + df["body"].fillna("").astype(str))
+        rows = zip(ids.to_numpy()[keep], days[keep], texts.to_numpy()[keep])
+
+        with self._conn:
+            self._conn.execute("BEGIN")
+            seen = set()
+            if not rescan:
+                seen = {row[0] for row in self._conn.execute("SELECT article_id FROM articles")}
+            articles = []
+            postings = []
+            for article_id, day, text in rows:
+                if article_id in seen:
+                    continue
+                seen.add(article_id)
+                articles.append((article_id, day))
+                counts = {}
+                for entity in matcher.entities(normalize(text)):
+                    counts[entity] = counts.get(entity, 0) + 1
+                postings.extend((entity, day, article_id, n) for entity, n in counts.items())
+            if rescan:
+                self._conn.executemany("DELETE FROM postings WHERE article_id = ?", ((a,) for a, _ in articles))
+            self._conn.executemany("INSERT OR REPLACE INTO articles (article_id, day) VALUES (?, ?)", articles)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO postings (entity, day, article_id, n) VALUES (?, ?, ?, ?)", postings
+            )
+        logger.debug(f"Indexed {len(articles)} articles, {len(postings)} entity mentions.")
+        return len(articles)
+
+    def _entity(self, name):
+        # Accept an entity or any of its aliases
+        row = self._conn.execute("SELECT 1 FROM aliases WHERE entity = ? LIMIT 1", (name,)).fetchone()
+        if row is not None:
+            return name
+        row = self._conn.execute("SELECT entity FROM aliases WHERE alias = ?", (normalize(name).strip(),)).fetchone()
+        if row is None:
+            raise KeyError(f"{name!r} is neither an entity nor an alias in the index.")
+        return row[0]
+
+    @staticmethod
+    def _range(start, end):
+        start = pd.Timestamp(start).strftime("%Y-%m-%d") if start is not None else "0000-00-00"
+        end = pd.Timestamp(end).strftime("%Y-%m-%d") if end is not None else "9999-99-99"
+        return start, end
+
+    def query(self, entity: str, start=None, end=None) -> list:
+        '''
+        Articles mentioning an entity within a date range, e.g. query('INFY', '2024-04-01', '2024-06-30').
+        Parameters:
+            entity (str): An entity or one of its aliases.
+            start, end (str | datetime, optional): First and last day, inclusive. Open-ended when None.
+        Returns:
+            list: article_id of the matching articles, by date.
+        '''
+        rows = self._conn.execute(
+            "SELECT article_id FROM postings WHERE entity = ? AND day BETWEEN ? AND ? ORDER BY day",
+            (self._entity(entity), *self._range(start, end)),
+        )
+        return [row[0] for row in rows]
+
+    def mentions(self, entities=None, start=None, end=None) -> pd.DataFrame:
+        '''
+        Entity mentions within a date range.
+        Parameters:
+            entities (list, optional): Entities or aliases to include. All entities when None.
+            start, end (str | datetime, optional): First and last day, inclusive.
+        Returns:
+            pd.DataFrame: Indexed by date, with entity, article_id and mentions (count within the
+                article) columns.
+        '''
+        start, end = self._range(start, end)
+        if entities is None:
+            rows = self._conn.execute(
+                "SELECT day, entity, article_id, n FROM postings WHERE day BETWEEN ? AND ?", (start, end)
+            ).fetchall()
+        else:
+            rows = []
+            for entity in dict.fromkeys(self._entity(e) for e in entities):
+                rows.extend(self._conn.execute(
+                    "SELECT day, entity, article_id, n FROM postings WHERE entity = ? AND day BETWEEN ? AND ?",
+                    (entity, start, end),
+                ))
+        df = pd.DataFrame.from_records(rows, columns=["date", "entity", "article_id", "mentions"])
+        df = df.astype({"entity": "category", "article_id": "string", "mentions": "int32"})
+        df["date"] = pd.to_datetime(df["date"]).astype("datetime64[ns]")
+        df.set_index("date", inplace=True)
+        df.sort_index(inplace=True, kind="stable")
+        return df
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
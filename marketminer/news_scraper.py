@@ -2,18 +2,24 @@
 Module for scraping news articles from various sources.
 '''
 
-import requests
-from bs4 import BeautifulSoup
 import logging
+import os
 import pandas as pd
 from datetime import datetime, timedelta, date
 import re
+import time
 from urllib.parse import urljoin
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import asyncio
-import aiohttp
-import nest_asyncio
 
-logging.basicConfig(level=logging.INFO)
+from .fetcher import Fetcher, FetchConfig, PageGone
+from .http_cache import ResponseCache
+from .news_state import NewsState
+from .news_index import NewsIndex
+from . import news_store
+from .html_parsers import extract_archive_links, extract_article_body, resolve_backend
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
 HEADERS = {
@@ -22,6 +28,24 @@ HEADERS = {
                   " Chrome/120.0.0.0 Safari/537.36"
 }
 _BASE = "https://economictimes.indiatimes.com"
+# Default number of articles fetched concurrently across the whole date range
+DEFAULT_CONCURRENCY = 32
+# Default number of archive days crawled concurrently
+DEFAULT_DAYS_IN_FLIGHT = 8
+# Archive pages of the last few days still change, so they are only cached for a while.
+# Older archive pages and articleshow pages are cached permanently.
+RECENT_ARCHIVE_DAYS = 3
+RECENT_ARCHIVE_TTL = 60 * 60
+
+# Output schema of the news scrapers; the index is the article date (datetime64)
+NEWS_COLUMNS = ["article_id", "headline", "link", "category", "body"]
+NEWS_DTYPES = {
+    "article_id": "string",
+    "headline": "string",
+    "link": "string",
+    "category": "category",
+    "body": "string",
+}
 
 def date_to_excel_serial(dt):
     '''
@@ -37,112 +61,612 @@ def date_to_excel_serial(dt):
         serial += 1
     return serial
 
-async def fetch(session, url):
-    """
-    Asynchronous function to fetch a URL using aiohttp.
 
-    Parameters:
-    session (aiohttp.ClientSession): The session to use for the request.
-    url (str): The URL to fetch.
+class ScrapeError(RuntimeError):
+    '''
+    Raised when a news scrape did not complete, carrying what was scraped before it stopped.
+
+    Attributes:
+        partial (pd.DataFrame): The articles that were scraped, in the usual output format.
+        failed (dict): {'YYYY-MM-DD': [error, ...]} for every day that was not scraped completely.
+    '''
+
+    def __init__(self, message, partial, failed):
+        super().__init__(message)
+        self.partial = partial
+        self.failed = failed
 
-    Returns:
-        str: The response text.
-    """
-    async with session.get(url) as response:
-        if response.status != 200:
-            logger.warning(f"Failed to fetch {url} with status {response.status}")
-            return None
-        return await response.text()
 
+def _run(make_coroutine):
+    '''
+    Run the coroutine returned by make_coroutine to completion from synchronous code.
+    '''
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(make_coroutine())
+    # This thread already runs an event loop (Jupyter, async services), which cannot be re-entered:
+    # run the scrape on its own loop in a worker thread. Async callers should await the *_async
+    # functions instead, which do not block their loop.
+    logger.debug("An event loop is already running, scraping on a separate thread.")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(lambda: asyncio.run(make_coroutine())).result()
 
-def scrape_economic_times(start_date: str | datetime | date, end_date: str | datetime | date) -> pd.DataFrame:
+def scrape_economic_times(start_date: str | datetime | date, end_date: str | datetime | date,
+                          concurrency: int = DEFAULT_CONCURRENCY,
+                          max_days_in_flight: int = DEFAULT_DAYS_IN_FLIGHT,
+                          fetch_config: FetchConfig = None,
+                          cache: str | ResponseCache = None,
+                          state: str | NewsState = None,
+                          parser: str = "auto",
+                          parse_workers: int = 0,
+                          on_error: str = "warn",
+                          index: str | NewsIndex = None,
+                          dtype_backend: str = None) -> pd.DataFrame:
     """
     Scrape news articles from Economic Times within a date range.
 
     Parameters:
     start_date (str): Start date in the format 'YYYY-MM-DD'.
     end_date (str): End date in the format 'YYYY-MM-DD'.
+    concurrency (int): Maximum number of articles fetched at the same time across all days.
+    max_days_in_flight (int): Maximum number of archive days being crawled at the same time.
+    fetch_config (FetchConfig, optional): Connection pool, per-host limit, retry and rate control settings.
+    cache (str | ResponseCache, optional): Path of (or open) on-disk response cache. Pages already in the
+        cache are not downloaded again.
+    state (str | NewsState, optional): Path of (or open) checkpoint store. Articles and completed days are
+        checkpointed as they finish, and a re-run skips everything already stored.
+    parser (str): HTML parsing backend: 'selectolax', 'lxml', 'bs4' or 'auto' for the fastest installed.
+    parse_workers (int): Number of worker processes parsing article pages off the event loop.
+        0 parses inline, which is best with the fast C backends.
+    on_error (str): What to do when some days could not be scraped completely: 'warn' logs them and
+        returns the articles that were scraped, 'raise' raises ScrapeError carrying those articles.
+        Either way the incomplete days are listed in df.attrs['failed'].
+    index (str | NewsIndex, optional): Path of (or open) entity index the scraped articles are added to.
+        The index must already hold its aliases.
+    dtype_backend (str, optional): 'pyarrow' to hold the text columns as Arrow-backed strings, which
+        take a fraction of the memory of Python strings on large ranges. Requires pyarrow.
 
     Returns:
         pd.DataFrame: DataFrame containing news articles.
+
+    Raises:
+        ScrapeError: When the scrape stops on an unexpected error after articles were scraped, or
+            with on_error='raise' when some days are incomplete. Its `partial` attribute holds the
+            scraped articles and `failed` the errors per day.
+    """
+    return _run(lambda: scrape_economic_times_async(
+        start_date, end_date, concurrency, max_days_in_flight, fetch_config, cache, state, parser, parse_workers,
+        on_error, index, dtype_backend,
+    ))
+
+def update_economic_times(state: str | NewsState, end_date: str | datetime | date = None,
+                          start_date: str | datetime | date = None, **kwargs) -> pd.DataFrame:
+    """
+    Scrape only the days of a checkpoint store that are not complete yet, starting from the earliest
+    incomplete day so days that failed in an earlier run are retried.
+
+    Parameters:
+    state (str | NewsState): Path of (or open) checkpoint store.
+    end_date (str, optional): Last day to scrape in the format 'YYYY-MM-DD'. Defaults to today.
+    start_date (str, optional): First day of the range. Defaults to the first day in the store, so it is
+        required when the store is still empty.
+    **kwargs: Passed on to scrape_economic_times.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the articles from the earliest incomplete day on.
+    """
+    return _run(lambda: update_economic_times_async(state, end_date, start_date, **kwargs))
+
+async def update_economic_times_async(state, end_date=None, start_date=None, **kwargs):
+    """
+    Asynchronous version of update_economic_times.
     """
+    news_state = NewsState(state) if isinstance(state, str) else state
     try:
-        return asyncio.run(scrape_economic_times_async(start_date, end_date))
-    except Exception as e:
-        # Fix for Jupyter or interactive environments
-        nest_asyncio.apply()
-        loop = asyncio.get_event_loop()
-        return loop.run_until_complete(scrape_economic_times_async(start_date, end_date))
-
-async def process_article(session, article, curr_date):
-    headline = article.text.strip()
-    link = article.get('href', '')
-    if link.startswith("/"):
-        link = urljoin(_BASE, link)
-    link = link.strip()
-
-    if 'live' in link or 'articleshow' not in link:
-        return None
+        if start_date is None:
+            start_date = news_state.first_day()
+            if start_date is None:
+                raise ValueError("The state store is empty: pass start_date for the first run.")
+        end_dt = _parse_date(end_date) if end_date else _parse_date(date.today())
+        # Completed days after it are skipped by the crawl itself
+        start_date = news_state.first_incomplete_day(_parse_date(start_date), end_dt)
+        if start_date is None:
+            logger.info("News state is already up to date.")
+            df = _to_frame([], kwargs.get("dtype_backend"))
+            df.attrs["failed"] = {}
+            return df
+        return await scrape_economic_times_async(start_date, end_dt, state=news_state, **kwargs)
+    finally:
+        if isinstance(state, str):
+            news_state.close()
 
-    html = await fetch(session, link)
+def _parse_date(value):
+    '''
+    Normalise a 'YYYY-MM-DD' string, date or datetime to a datetime at midnight.
+    '''
+    if isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.strptime(value, "%Y-%m-%d")
+
+def _archive_ttl(curr_date):
+    '''
+    Cache TTL for the archive page of a day: limited for recent days, permanent otherwise.
+    '''
+    if (datetime.now() - curr_date).days <= RECENT_ARCHIVE_DAYS:
+        return RECENT_ARCHIVE_TTL
+    return None
+
+def _archive_url(curr_date):
+    return f"{_BASE}/archivelist/year-{curr_date.year},month-{curr_date.month},starttime-{date_to_excel_serial(curr_date.date())}.cms"
+
+def _article_id(link):
+    match = re.search(r'/(?:amp_)?articleshow/(\d+)\.cms', link)
+    return match.group(1) if match else None
+
+async def process_article(fetcher, headline, link, article_id, curr_date, parser="auto", parse_pool=None):
+    '''
+    Fetch one article page and extract its body.
+    Parsing runs in parse_pool when one is given so the event loop keeps fetching meanwhile.
+    Returns:
+        dict: The article record, or None when the page could not be fetched.
+    Raises:
+        PageGone: The article was removed from the site.
+    '''
+    html = await fetcher.fetch(link)
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
-    match = re.search(r'/(?:amp_)?articleshow/(\d+)\.cms', link)
-    article_id = match.group(1) if match else None
-    body = ' '.join([p.get_text() for p in soup.select('.artText, .Normal')])
+    start = time.perf_counter()
+    if parse_pool is not None:
+        loop = asyncio.get_running_loop()
+        body = await loop.run_in_executor(parse_pool, extract_article_body, html, parser)
+    else:
+        body = extract_article_body(html, parser)
+    metrics.histogram(metrics.PARSE_SECONDS, time.perf_counter() - start, page="article", backend=parser)
 
     return {
         "article_id": article_id,
         "headline": headline,
         "link": link,
-        "date": curr_date.strftime("%Y-%m-%d"),
+        "date": curr_date,
         "body": body
     }
 
-async def scrape_economic_times_async(start_date, end_date):
+class _Crawler:
+    '''
+    One crawl of the Economic Times archive.
+
+    Archive pages for up to max_days_in_flight days are fetched concurrently and all of their
+    articles feed one bounded queue drained by `concurrency` workers, so slow days never stall
+    the rest of the range. With a NewsState, every scraped article is checkpointed immediately,
+    already stored articles are not fetched again, and a day is marked complete once all of its
+    articles are in.
+
+    Articles are deduplicated by article_id before they are fetched, both within an archive page
+    (the same story is often linked from several sections) and across days. With a state store the
+    ids of earlier runs are part of that index, so every article is downloaded once.
+    '''
+
+    def __init__(self, fetcher, concurrency, max_days_in_flight, state=None, parser="auto", parse_pool=None):
+        if concurrency < 1 or max_days_in_flight < 1:
+            raise ValueError("concurrency and max_days_in_flight must be at least 1.")
+        self.fetcher = fetcher
+        self.parser = resolve_backend(parser)
+        self.parse_pool = parse_pool
+        self.concurrency = concurrency
+        self.state = state
+        self.seen = state.seen_ids() if state is not None else set()
+        self.n_duplicates = 0
+        self.queue = asyncio.Queue(maxsize=concurrency * 4)
+        self.day_slots = asyncio.Semaphore(max_days_in_flight)
+
+    async def _worker(self):
+        '''
+        Consume (headline, link, article_id, date, future) items from the article queue until cancelled.
+        The result of process_article is handed back to the day that queued it through the future.
+        '''
+        while True:
+            headline, link, article_id, curr_date, future = await self.queue.get()
+            try:
+                record = await process_article(
+                    self.fetcher, headline, link, article_id, curr_date, self.parser, self.parse_pool
+                )
+                if record is not None and self.state is not None:
+                    self.state.add_article(record)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(record)
+            finally:
+                self.queue.task_done()
+
+    async def _crawl_day(self, curr_date):
+        with metrics.span("marketminer.news.crawl_day", day=curr_date.strftime("%Y-%m-%d")):
+            return await self._scrape_day(curr_date)
+
+    async def _scrape_day(self, curr_date):
+        '''
+        Fetch the archive page of one day and push its articles onto the shared queue.
+        Returns (date, records, errors) once every article of the day has been processed, with
+        records set to None when the archive page itself could not be fetched or parsed and errors
+        listing every page that failed.
+        '''
+        async with self.day_slots:
+            logger.info(f"Scraping archive for {curr_date.date()}...")
+            url = _archive_url(curr_date)
+            try:
+                html = await self.fetcher.fetch(url, ttl=_archive_ttl(curr_date))
+                if not html:
+                    return curr_date, None, [f"{url}: archive page could not be fetched"]
+                # Only (headline, href) pairs are kept, the parsed page is freed while articles are fetched
+                start = time.perf_counter()
+                anchors = extract_archive_links(html, self.parser)
+                metrics.histogram(
+                    metrics.PARSE_SECONDS, time.perf_counter() - start, page="archive", backend=self.parser
+                )
+            except Exception as e:
+                logger.warning(f"Failed to scrape the archive of {curr_date.date()}: {e!r}")
+                return curr_date, None, [f"{url}: {e!r}"]
+
+            loop = asyncio.get_running_loop()
+            links, futures = [], []
+            for headline, link in anchors:
+                if link.startswith("/"):
+                    link = urljoin(_BASE, link)
+                link = link.strip()
+                if 'live' in link or 'articleshow' not in link:
+                    metrics.counter(metrics.ARTICLES_DROPPED, reason="live" if 'live' in link else "not_article")
+                    continue
+                article_id = _article_id(link)
+                key = article_id or link
+                if key in self.seen:
+                    self.n_duplicates += 1
+                    metrics.counter(metrics.ARTICLES_DROPPED, reason="duplicate")
+                    continue
+                self.seen.add(key)
+                future = loop.create_future()
+                await self.queue.put((headline.strip(), link, article_id, curr_date, future))
+                links.append(link)
+                futures.append(future)
+            # A failing article only fails its own future, the rest of the day is kept
+            day_results = await asyncio.gather(*futures, return_exceptions=True)
+
+        records, errors = [], []
+        for link, result in zip(links, day_results):
+            if isinstance(result, PageGone):
+                # Removed articles are left out for good, they do not keep the day incomplete
+                logger.info(f"Skipping {link}: {result}")
+                metrics.counter(metrics.ARTICLES_DROPPED, reason="gone")
+            elif isinstance(result, Exception):
+                errors.append(f"{link}: {result!r}")
+                metrics.counter(metrics.ARTICLES_DROPPED, reason="error")
+            elif result is None:
+                errors.append(f"{link}: article could not be fetched")
+                metrics.counter(metrics.ARTICLES_DROPPED, reason="fetch_failed")
+            else:
+                records.append(result)
+        metrics.counter(metrics.ARTICLES_SCRAPED, len(records))
+        # Today's archive still grows, so only past days without failures count as complete
+        if self.state is not None and not errors and curr_date.date() < date.today():
+            self.state.complete_day(curr_date, len(records))
+        return curr_date, records, errors
+
+    async def iter_days(self, days):
+        '''
+        Crawl the given days and yield (date, records, errors) as each day completes.
+        Days are started in chronological order but may complete out of order.
+        '''
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        day_tasks = [asyncio.create_task(self._crawl_day(d)) for d in days]
+        try:
+            for next_day in asyncio.as_completed(day_tasks):
+                yield await next_day
+        finally:
+            for task in workers + day_tasks:
+                task.cancel()
+            await asyncio.gather(*workers, *day_tasks, return_exceptions=True)
+
+def _to_frame(results, dtype_backend=None):
+    '''
+    Build the output DataFrame from article records, with the NEWS_COLUMNS / NEWS_DTYPES schema
+    whether or not there are any records. With dtype_backend='pyarrow' the text columns are
+    Arrow-backed strings.
+    '''
+    df = pd.DataFrame.from_records(results, columns=["date", "article_id", "headline", "link", "body"])
+    # Category is the first path segment of the link, e.g. 'markets' or 'industry'
+    df["category"] = df["link"].str.extract(r"^https?://[^/]+/([^/?#]+)/", expand=False)
+    df = df.astype(NEWS_DTYPES)
+    df["date"] = pd.to_datetime(df["date"]).astype("datetime64[ns]")
+    df.set_index("date", inplace=True)
+    df.sort_index(inplace=True, kind="stable")
+    df = df[NEWS_COLUMNS]
+    if dtype_backend == "pyarrow":
+        df = news_store.to_arrow_strings(df)
+    return df
+
+def _add_to_index(index, df):
+    '''
+    Add scraped articles to an entity index given as a path or an open NewsIndex.
+    '''
+    news_index = NewsIndex(index) if isinstance(index, str) else index
+    try:
+        news_index.add(df)
+    finally:
+        if isinstance(index, str):
+            news_index.close()
+
+async def _iter_records(start_date, end_date, concurrency=DEFAULT_CONCURRENCY,
+                        max_days_in_flight=DEFAULT_DAYS_IN_FLIGHT, fetch_config=None, cache=None, state=None,
+                        parser="auto", parse_workers=0):
+    '''
+    Crawl a date range and yield (date, records, errors) for every day that has articles or
+    failed, as days complete.
+    With a state store, each day's records are read back from the store so articles checkpointed
+    by earlier runs are included.
+    '''
+    start_dt = _parse_date(start_date)
+    end_dt = _parse_date(end_date)
+    if start_dt > end_dt:
+        raise ValueError("Start date must be before end date.")
+
+    response_cache = ResponseCache(cache) if isinstance(cache, str) else cache
+    news_state = NewsState(state) if isinstance(state, str) else state
+    parse_pool = ProcessPoolExecutor(parse_workers) if parse_workers else None
+    try:
+        days = [start_dt + timedelta(days=i) for i in range((end_dt - start_dt).days + 1)]
+        if news_state is not None:
+            done = news_state.completed_days(start_dt, end_dt)
+            logger.info(f"Resuming: {len(done)} days already complete, {len(days) - len(done)} left to scrape.")
+            for curr_date in days:
+                if curr_date.strftime("%Y-%m-%d") in done:
+                    records = news_state.load_articles(curr_date, curr_date)
+                    if records:
+                        yield curr_date, records, []
+            days = [d for d in days if d.strftime("%Y-%m-%d") not in done]
+
+        async with Fetcher(fetch_config, headers=HEADERS, cache=response_cache) as fetcher:
+            crawler = _Crawler(fetcher, concurrency, max_days_in_flight, news_state, parser, parse_pool)
+            async for curr_date, records, errors in crawler.iter_days(days):
+                if records is not None and news_state is not None:
+                    records = news_state.load_articles(curr_date, curr_date)
+                if records or errors:
+                    yield curr_date, records or [], errors
+            if crawler.n_duplicates:
+                logger.info(f"Skipped {crawler.n_duplicates} duplicate article links.")
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+        if isinstance(cache, str):
+            response_cache.close()
+        if isinstance(state, str):
+            news_state.close()
+
+async def iter_economic_times(start_date, end_date, concurrency=DEFAULT_CONCURRENCY,
+                              max_days_in_flight=DEFAULT_DAYS_IN_FLIGHT, fetch_config=None, cache=None,
+                              state=None, parser="auto", parse_workers=0, dtype_backend=None):
     """
-    Asynchronously scrape news articles from Economic Times within a date range.
+    Asynchronously iterate over Economic Times articles one day at a time.
+
+    Only the days currently being crawled are held in memory, so arbitrarily long ranges can be
+    processed with flat memory use. Days are yielded as they complete, which is roughly but not
+    strictly chronological.
+
     Parameters:
     start_date (str): Start date in the format 'YYYY-MM-DD'.
     end_date (str): End date in the format 'YYYY-MM-DD'.
+    concurrency, max_days_in_flight, fetch_config, cache, state, parser, parse_workers, dtype_backend:
+        As for scrape_economic_times.
+    Yields:
+        pd.DataFrame: The articles of one day, in the same format as scrape_economic_times. Days that
+            were not scraped completely list their errors in attrs['failed'], and are yielded even
+            when no article of the day could be scraped.
+    """
+    async for curr_date, records, errors in _iter_records(start_date, end_date, concurrency, max_days_in_flight,
+                                                          fetch_config, cache, state, parser, parse_workers):
+        frame = _to_frame(records, dtype_backend)
+        frame.attrs["failed"] = {curr_date.strftime("%Y-%m-%d"): errors} if errors else {}
+        yield frame
+
+def write_economic_times_parquet(path: str, start_date: str | datetime | date, end_date: str | datetime | date,
+                                 compact: bool = False, index: str | NewsIndex = None, on_error: str = "warn",
+                                 **kwargs) -> int:
+    """
+    Scrape Economic Times articles straight into a date-partitioned Parquet dataset, one file per day
+    (`<path>/date=YYYY-MM-DD/part-0.parquet`) written as soon as the day completes.
+
+    A day file only appears once it is complete, so an interrupted run keeps every day written before
+    it. Re-running a range replaces its days and leaves the other days of the dataset alone; a day that
+    was not scraped completely does not replace a file already there.
+
+    Parameters:
+    path (str): Directory of the dataset.
+    start_date (str): Start date in the format 'YYYY-MM-DD'.
+    end_date (str): End date in the format 'YYYY-MM-DD'.
+    compact (bool): Write the compact format: bodies compressed with zstd and a dictionary trained on
+        the first DICT_SAMPLES scraped bodies (kept in `<path>/_body_dictionary.zstd` and reused by later
+        runs), and canonical links split into section and slug. Until the dictionary exists the first
+        days are held back to train it; a run that ends with fewer bodies writes them without a
+        dictionary and saves none. Requires zstandard.
+    index (str | NewsIndex, optional): Path of (or open) entity index every written day is added to.
+    on_error (str): 'warn' logs the days that were not scraped completely, 'raise' raises ScrapeError
+        listing them once the complete days are written.
+    **kwargs: Passed on to iter_economic_times.
+
     Returns:
-        pd.DataFrame: DataFrame containing news articles.
+        int: Number of articles written.
+
+    Raises:
+        ScrapeError: With on_error='raise' when some days are incomplete. Its `failed` attribute holds
+            the errors per day; `partial` is None, the articles are in the dataset.
+
+    Read the dataset back with read_news_parquet.
     """
-    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-    if start_dt > end_dt:
-        raise ValueError("Start date must be before end date.")
+    return _run(lambda: write_economic_times_parquet_async(
+        path, start_date, end_date, compact, index, on_error, **kwargs
+    ))
 
-    results = []
-    async with aiohttp.ClientSession(headers=HEADERS) as session:
-        curr_date = start_dt
-        while curr_date <= end_dt:
-            logger.info(f"Scraping archive for {curr_date.date()}...")
-            archive_url = f"{_BASE}/archivelist/year-{curr_date.year},month-{curr_date.month},starttime-{date_to_excel_serial(curr_date.date())}.cms"
-            html = await fetch(session, archive_url)
-            if not html:
-                curr_date += timedelta(days=1)
-                continue
+async def write_economic_times_parquet_async(path, start_date, end_date, compact=False, index=None,
+                                             on_error="warn", **kwargs):
+    """
+    Asynchronous version of write_economic_times_parquet.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("pyarrow is required to write Parquet: pip install marketminer[parquet]")
+    if compact and news_store.zstandard is None:
+        raise ImportError("zstandard is required for the compact format: pip install marketminer[zstd]")
+    if on_error not in ("warn", "raise"):
+        raise ValueError(f"on_error must be 'warn' or 'raise', not {on_error!r}.")
 
-            soup = BeautifulSoup(html, "html.parser")
-            articles = soup.select("a[href*='/industry/'], a[href*='/markets/'], a[href*='/tech/']")
+    schema = pa.schema([
+        ("date", pa.timestamp("ns")),
+        ("article_id", pa.string()),
+        ("headline", pa.string()),
+        ("link", pa.string()),
+        ("category", pa.dictionary(pa.int32(), pa.string())),
+        ("body", pa.string()),
+    ])
+    n_rows = 0
+    failed = {}
+    compressor = None
+    # The compact files need the dataset's body dictionary, so without one the first days are held
+    # back until there are enough bodies to train it
+    pending = []
+    n_pending = 0
 
-            tasks = [process_article(session, article, curr_date) for article in articles]
-            day_results = await asyncio.gather(*tasks)
-            results.extend([r for r in day_results if r])
+    def start_compact(dictionary):
+        nonlocal schema, compressor
+        schema = news_store.compact_schema(
+            dictionary, f"{_BASE}/articleshow/{{article_id}}.cms", dictionary_file=news_store.DICT_FILE
+        )
+        compressor = news_store.body_compressor(dictionary)
 
-            curr_date += timedelta(days=1)
+    def write(frame):
+        day = frame.index[0]
+        if frame.attrs["failed"] and os.path.exists(news_store.day_path(path, day)):
+            logger.warning(f"Keeping the stored articles of {day:%Y-%m-%d}, it was not scraped completely")
+            return 0
+        if compact:
+            table = news_store.compact_table(frame, schema, compressor)
+        else:
+            table = pa.Table.from_pandas(frame.reset_index(), schema=schema, preserve_index=False)
+        news_store.write_day(path, day, table, compact)
+        return len(frame)
 
-    logging.info(f"Dropping duplicate articles based on headline and link.")
-    # Convert results to DataFrame
-    df = pd.DataFrame(results)
-    if df.empty:
-        return pd.DataFrame(columns=["headline", "link", "category", "date", "body"])
+    def flush():
+        nonlocal n_rows, schema, compressor
+        if compact and compressor is None:
+            dictionary = b""
+            if n_pending >= news_store.DICT_SAMPLES:
+                bodies = (body for frame in pending for body in frame["body"].astype(object))
+                dictionary = news_store.train_dictionary(bodies)
+            if dictionary:
+                news_store.save_dictionary(path, dictionary)
+                start_compact(dictionary)
+            else:
+                # Too few bodies for a dictionary worth keeping: write these days without one and
+                # leave the training to a later run
+                logger.info(f"Writing {len(pending)} days without a body dictionary, only {n_pending} bodies")
+                schema = news_store.compact_schema(b"", f"{_BASE}/articleshow/{{article_id}}.cms")
+                compressor = news_store.body_compressor(b"")
+        for frame in pending:
+            n_rows += write(frame)
+        pending.clear()
 
-    df["date"] = pd.to_datetime(df["date"])
-    df.set_index("date", inplace=True)
-    df.sort_index(inplace=True)
+    os.makedirs(path, exist_ok=True)
+    if compact:
+        dictionary = news_store.load_dictionary(path)
+        if dictionary is not None:
+            start_compact(dictionary)
+    news_index = NewsIndex(index) if isinstance(index, str) else index
+    try:
+        async for frame in iter_economic_times(start_date, end_date, **kwargs):
+            failed.update(frame.attrs["failed"])
+            if frame.empty:
+                continue
+            if news_index is not None:
+                news_index.add(frame)
+            pending.append(frame)
+            n_pending += sum(isinstance(body, str) and body != "" for body in frame["body"].astype(object))
+            if not compact or compressor is not None or n_pending >= news_store.DICT_SAMPLES:
+                flush()
+    finally:
+        try:
+            # Also write the held back days when the scrape stops midway
+            if pending:
+                flush()
+        finally:
+            if isinstance(index, str):
+                news_index.close()
+    logger.info(f"Wrote {n_rows} articles to {path}.")
+    if failed:
+        message = f"{len(failed)} days were not scraped completely: {', '.join(sorted(failed))}"
+        if on_error == "raise":
+            raise ScrapeError(message, None, failed)
+        logger.warning(message)
+    return n_rows
+
+async def scrape_economic_times_async(start_date, end_date, concurrency=DEFAULT_CONCURRENCY,
+                                      max_days_in_flight=DEFAULT_DAYS_IN_FLIGHT, fetch_config=None, cache=None,
+                                      state=None, parser="auto", parse_workers=0, on_error="warn",
+                                      index=None, dtype_backend=None):
+    """
+    Asynchronously scrape news articles from Economic Times within a date range.
+    Use this instead of scrape_economic_times from code already running an event loop.
+    Parameters:
+    start_date (str): Start date in the format 'YYYY-MM-DD'.
+    end_date (str): End date in the format 'YYYY-MM-DD'.
+    concurrency (int): Maximum number of articles fetched at the same time across all days.
+    max_days_in_flight (int): Maximum number of archive days being crawled at the same time.
+    fetch_config (FetchConfig, optional): Connection pool, per-host limit, retry and rate control settings.
+    cache (str | ResponseCache, optional): Path of (or open) on-disk response cache.
+    state (str | NewsState, optional): Path of (or open) checkpoint store used to resume interrupted runs.
+    parser (str): HTML parsing backend: 'selectolax', 'lxml', 'bs4' or 'auto' for the fastest installed.
+    parse_workers (int): Number of worker processes parsing article pages off the event loop.
+    on_error (str): 'warn' or 'raise', see scrape_economic_times.
+    index (str | NewsIndex, optional): Path of (or open) entity index the scraped articles are added to.
+    dtype_backend (str, optional): 'pyarrow' for Arrow-backed text columns.
+    Returns:
+        pd.DataFrame: DataFrame containing news articles, with the incomplete days in attrs['failed'].
+    Raises:
+        ScrapeError: See scrape_economic_times.
+    """
+    if on_error not in ("warn", "raise"):
+        raise ValueError(f"on_error must be 'warn' or 'raise', not {on_error!r}.")
+    if dtype_backend not in (None, "pyarrow"):
+        raise ValueError(f"dtype_backend must be None or 'pyarrow', not {dtype_backend!r}.")
+    results = []
+    failed = {}
+    try:
+        async for curr_date, records, errors in _iter_records(start_date, end_date, concurrency,
+                                                              max_days_in_flight, fetch_config, cache, state,
+                                                              parser, parse_workers):
+            results.extend(records)
+            if errors:
+                failed[curr_date.strftime("%Y-%m-%d")] = errors
+    except Exception as e:
+        if not results and not failed:
+            raise
+        # Hand back what was scraped rather than losing it with the error
+        df = _to_frame(results, dtype_backend)
+        df.attrs["failed"] = failed
+        raise ScrapeError(f"Scrape stopped after {len(df)} articles: {e!r}", df, failed) from e
+
+    # Convert results to DataFrame
+    df = _to_frame(results, dtype_backend)
+    df.attrs["failed"] = failed
     logger.info(f"Scraped {len(df)} articles from Economic Times.")
-    return df
\ No newline at end of file
+    if index is not None:
+        _add_to_index(index, df)
+    if failed:
+        message = f"{len(failed)} days were not scraped completely: {', '.join(sorted(failed))}"
+        if on_error == "raise":
+            raise ScrapeError(message, df, failed)
+        logger.warning(f"{message}. See df.attrs['failed'].")
+    return df
@@ -0,0 +1,151 @@
+'''
+Module with the checkpoint store used for resumable news ingestion.
+'''
+
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    day TEXT PRIMARY KEY,
+    completed_at REAL NOT NULL,
+    n_articles INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    article_id TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    headline TEXT,
+    link TEXT,
+    body TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_day ON articles (day);
+"""
+
+_COLUMNS = ("article_id", "headline", "link", "date", "body")
+
+
+class NewsState:
+    '''
+    SQLite checkpoint of a news ingestion: completed days and every article scraped so far.
+
+    Articles are written as soon as they are scraped, and a day is marked complete once all
+    of its articles are in. A restarted run skips completed days and already stored article
+    ids, so a crash or Ctrl-C only loses the requests that were in flight.
+
+    Parameters:
+        path (str): Path of the SQLite database file.
+    '''
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def completed_days(self, start, end):
+        '''
+        Days in [start, end] that were fully scraped.
+        Parameters:
+            start (datetime): First day of the range.
+            end (datetime): Last day of the range.
+        Returns:
+            set: Completed days as 'YYYY-MM-DD' strings.
+        '''
+        rows = self._conn.execute(
+            "SELECT day FROM days WHERE day BETWEEN ? AND ?",
+            (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")),
+        )
+        return {row[0] for row in rows}
+
+    def last_completed_day(self):
+        '''
+        Returns:
+            datetime: The latest completed day, or None if nothing was scraped yet.
+        '''
+        row = self._conn.execute("SELECT MAX(day) FROM days").fetchone()
+        return datetime.strptime(row[0], "%Y-%m-%d") if row[0] else None
+
+    def first_day(self):
+        '''
+        Returns:
+            datetime: The earliest day that was completed or has stored articles, None if nothing was
+                scraped yet.
+        '''
+        row = self._conn.execute(
+            "SELECT MIN(day) FROM (SELECT MIN(day) AS day FROM days UNION ALL SELECT MIN(day) FROM articles)"
+        ).fetchone()
+        return datetime.strptime(row[0], "%Y-%m-%d") if row[0] else None
+
+    def first_incomplete_day(self, start, end):
+        '''
+        Parameters:
+            start (datetime): First day of the range.
+            end (datetime): Last day of the range.
+        Returns:
+            datetime: The earliest day in [start, end] that was not fully scraped, None if all were.
+        '''
+        completed = self.completed_days(start, end)
+        day = start
+        while day <= end:
+            if day.strftime("%Y-%m-%d") not in completed:
+                return day
+            day += timedelta(days=1)
+        return None
+
+    def seen_ids(self):
+        '''
+        Returns:
+            set: article_id of every stored article.
+        '''
+        return {row[0] for row in self._conn.execute("SELECT article_id FROM articles")}
+
+    def add_article(self, record):
+        '''
+        Store one scraped article record.
+        '''
+        self._conn.execute(
+            "INSERT OR IGNORE INTO articles (article_id, day, headline, link, body) VALUES (?, ?, ?, ?, ?)",
+            (
+                record["article_id"], record["date"].strftime("%Y-%m-%d"),
+                record["headline"], record["link"], record["body"],
+            ),
+        )
+
+    def complete_day(self, day, n_articles):
+        '''
+        Mark a day as fully scraped.
+        '''
+        self._conn.execute(
+            "INSERT OR REPLACE INTO days (day, completed_at, n_articles) VALUES (?, ?, ?)",
+            (day.strftime("%Y-%m-%d"), time.time(), n_articles),
+        )
+
+    def load_articles(self, start, end):
+        '''
+        Stored articles dated within [start, end].
+        Returns:
+            list: Article records as dicts, the same shape the scraper produces except that the
+                date is a 'YYYY-MM-DD' string.
+        '''
+        rows = self._conn.execute(
+            "SELECT article_id, headline, link, day, body FROM articles WHERE day BETWEEN ? AND ?",
+            (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")),
+        )
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,428 @@
+'''
+Module with the compact Parquet format for scraped news.
+
+Article bodies are almost all of the size of a news archive, and Economic Times bodies share a
+lot of boilerplate and vocabulary that a generic compressor only sees within one row group. The
+compact format compresses every body separately with zstd and a dictionary trained on the
+archive's own bodies, stored once in the file metadata, so single articles stay cheap to read.
+Canonical article links (<site>/<section>/<slug>/articleshow/<id>.cms) are split into a dictionary
+encoded section column, which takes a few distinct values, and a slug column, and rebuilt exactly on
+read. Other links are kept as is.
+
+Streamed scrapes are written as a date-partitioned dataset, one file per day:
+    <root>/date=YYYY-MM-DD/part-0.parquet
+    <root>/_body_dictionary.zstd    body dictionary shared by the compact day files
+Each day file is written to a temporary name and renamed once complete, so an interrupted scrape
+keeps every day written before it and a re-run replaces single days.
+'''
+
+import logging
+import os
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, only the compact format needs it
+    zstandard = None
+
+FORMAT = "marketminer.news.compact/2"
+# Files of the first version only kept the short links, read back as LINK_TEMPLATE
+_FORMAT_V1 = "marketminer.news.compact/1"
+LINK_TEMPLATE = "https://economictimes.indiatimes.com/articleshow/{article_id}.cms"
+# Dictionary size and the number of bodies sampled to train it
+DICT_SIZE = 112 * 1024
+DICT_SAMPLES = 2000
+# Higher levels make the per-body compression several times slower for a few percent less size
+COMPRESSION_LEVEL = 3
+
+_META_FORMAT = b"marketminer.format"
+_META_DICT = b"marketminer.body_dictionary"
+_META_LINK = b"marketminer.link_template"
+# Set instead of the dictionary in the day files of a dataset: name of the shared dictionary file
+_META_DICT_FILE = b"marketminer.body_dictionary_file"
+
+DICT_FILE = "_body_dictionary.zstd"
+PART_FILE = "part-0.parquet"
+
+# Dtypes of the in-memory frames with dtype_backend='pyarrow'
+ARROW_DTYPES = {
+    "article_id": "string[pyarrow]",
+    "headline": "string[pyarrow]",
+    "link": "string[pyarrow]",
+    "category": "category",
+    "body": "string[pyarrow]",
+}
+
+
+def _require(zstd=True):
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet: pip install marketminer[parquet]")
+    if zstd and zstandard is None:
+        raise ImportError("zstandard is required for the compact format: pip install marketminer[zstd]")
+    return pyarrow
+
+
+def to_arrow_strings(df):
+    '''
+    Convert the text columns of a news frame to Arrow-backed strings, which keep all values of a
+    column in one buffer instead of one Python object per value.
+    Parameters:
+        df (pd.DataFrame): Articles as returned by scrape_economic_times.
+    Returns:
+        pd.DataFrame: The same frame with ARROW_DTYPES.
+    '''
+    return df.astype({column: dtype for column, dtype in ARROW_DTYPES.items() if column in df.columns})
+
+
+def train_dictionary(bodies, dict_size=DICT_SIZE):
+    '''
+    Train a zstd dictionary on a sample of article bodies.
+    Parameters:
+        bodies (iterable): Article bodies; at most DICT_SAMPLES of them are used.
+        dict_size (int): Dictionary size in bytes.
+    Returns:
+        bytes: The dictionary, or b'' when there are too few bodies to train one.
+    '''
+    _require()
+    samples = []
+    for body in bodies:
+        if isinstance(body, str) and body:
+            samples.append(body.encode("utf-8"))
+            if len(samples) == DICT_SAMPLES:
+                break
+    # zstd needs enough samples (and sample bytes) to build a useful dictionary
+    if len(samples) < 20 or sum(map(len, samples)) < 8 * dict_size:
+        dict_size = max(1024, sum(map(len, samples)) // 8)
+    try:
+        return zstandard.train_dictionary(dict_size, samples).as_bytes()
+    except zstandard.ZstdError as e:
+        logger.debug(f"No body dictionary trained from {len(samples)} samples: {e}")
+        return b""
+
+
+def body_compressor(dictionary, level=COMPRESSION_LEVEL):
+    '''
+    Returns:
+        ZstdCompressor: Compressor for bodies with a dictionary from train_dictionary.
+    '''
+    _require()
+    dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+    return zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+
+
+def _decompressor(dictionary):
+    dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+    return zstandard.ZstdDecompressor(dict_data=dict_data)
+
+
+def compact_schema(dictionary, link_template=LINK_TEMPLATE, dictionary_file=None):
+    '''
+    Parameters:
+        dictionary (bytes): Body dictionary from train_dictionary.
+        link_template (str): Short link of an article on the site, its prefix is the site the
+            canonical links are rebuilt for.
+        dictionary_file (str, optional): Name of the dataset file holding the dictionary, stored in
+            the metadata instead of the dictionary itself.
+    Returns:
+        pa.Schema: Schema of the compact format, carrying the body dictionary and link template.
+    '''
+    pa = _require()
+    metadata = {_META_FORMAT: FORMAT.encode(), _META_LINK: link_template.encode()}
+    if dictionary_file is None:
+        metadata[_META_DICT] = dictionary
+    else:
+        metadata[_META_DICT] = b""
+        metadata[_META_DICT_FILE] = dictionary_file.encode()
+    return pa.schema([
+        ("date", pa.timestamp("ns")),
+        ("article_id", pa.int64()),
+        ("headline", pa.string()),
+        ("category", pa.dictionary(pa.int32(), pa.string())),
+        # Path of a canonical link between the site and the slug, and its slug
+        ("section", pa.dictionary(pa.int32(), pa.string())),
+        ("slug", pa.string()),
+        # Only for links that cannot be rebuilt from section, slug and article_id
+        ("link", pa.string()),
+        ("body", pa.binary()),
+    ], metadata=metadata)
+
+
+def compact_table(df, schema, compressor=None):
+    '''
+    Convert a news frame to a table of the compact schema.
+    Parameters:
+        df (pd.DataFrame): Articles as returned by scrape_economic_times.
+        schema (pa.Schema): Schema from compact_schema.
+        compressor (ZstdCompressor, optional): Compressor for the schema's dictionary, reused across
+            calls by streaming writers.
+    Returns:
+        pa.Table: The compact table.
+    '''
+    pa = _require()
+    compressor = compressor or body_compressor(schema.metadata[_META_DICT])
+    ids = pd.to_numeric(df["article_id"], errors="coerce").astype("Int64")
+    site = _site(schema.metadata[_META_LINK].decode())
+    sections, slugs, keep = [], [], []
+    for link, i in zip(df["link"].astype(object), ids):
+        parts = _split_link(link, site, i)
+        if parts is None:
+            # No article_id or not an articleshow link of that article on the site
+            sections.append(None)
+            slugs.append(None)
+            keep.append(link if isinstance(link, str) else None)
+        else:
+            # An empty section still marks the link as canonical, a missing link has none
+            sections.append(parts[0])
+            slugs.append(parts[1] or None)
+            keep.append(None)
+    bodies = [compressor.compress(b.encode("utf-8")) if isinstance(b, str) else None for b in df["body"].astype(object)]
+    return pa.table({
+        "date": pa.array(pd.DatetimeIndex(df.index).astype("datetime64[ns]"), pa.timestamp("ns")),
+        "article_id": pa.array(ids, pa.int64()),
+        "headline": pa.array(df["headline"].astype(object), pa.string()),
+        "category": pa.array(df["category"].astype(object), pa.string()).dictionary_encode(),
+        "section": pa.array(sections, pa.string()).dictionary_encode(),
+        "slug": pa.array(slugs, pa.string()),
+        "link": pa.array(keep, pa.string()),
+        "body": pa.array(bodies, pa.binary()),
+    }, schema=schema)
+
+
+def _site(link_template):
+    return link_template.split("/articleshow/")[0] + "/"
+
+
+def _join_link(site, section, slug, article_id):
+    return site + "".join(f"{part}/" for part in (section, slug) if part) + f"articleshow/{article_id}.cms"
+
+
+def _split_link(link, site, article_id):
+    # (section, slug) of a canonical link of the article, None when the link cannot be rebuilt from them
+    if not isinstance(link, str) or article_id is pd.NA:
+        return None
+    suffix = f"/articleshow/{article_id}.cms"
+    if not (link.startswith(site) and link.endswith(suffix)):
+        return None
+    section, _, slug = link[len(site):len(link) - len(suffix)].rpartition("/")
+    if _join_link(site, section, slug, article_id) != link:
+        return None
+    return section, slug
+
+
+def compact_writer(path, schema):
+    '''
+    Returns:
+        pq.ParquetWriter: Writer for compact tables. Bodies are already compressed, so their
+            column is stored without Parquet compression or dictionary encoding.
+    '''
+    _require()
+    import pyarrow.parquet as pq
+    compression = {name: "zstd" for name in schema.names}
+    compression["body"] = "none"
+    use_dictionary = [name for name in schema.names if name != "body"]
+    return pq.ParquetWriter(path, schema, compression=compression, use_dictionary=use_dictionary)
+
+
+def day_path(root, day):
+    '''
+    Returns:
+        str: Path of a day's file in a date-partitioned news dataset.
+    '''
+    return os.path.join(root, f"date={pd.Timestamp(day):%Y-%m-%d}", PART_FILE)
+
+
+def write_day(root, day, table, compact=False):
+    '''
+    Write the articles of one day to a dataset, replacing the day's previous file. The file only
+    appears under its final name once it is complete.
+    Parameters:
+        root (str): Directory of the dataset.
+        day (str | datetime): The day.
+        table (pa.Table): The day's articles, a compact_table when compact is True.
+        compact (bool): Write with the column settings of the compact format.
+    '''
+    _require(zstd=False)
+    import pyarrow.parquet as pq
+    path = day_path(root, day)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    if compact:
+        with compact_writer(tmp, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+
+def load_dictionary(root):
+    '''
+    Returns:
+        bytes: The body dictionary shared by the compact files of a dataset, None if it has none yet.
+    '''
+    try:
+        with open(os.path.join(root, DICT_FILE), "rb") as f:
+            # An empty file is no dictionary, the next run trains one
+            return f.read() or None
+    except FileNotFoundError:
+        return None
+
+
+def save_dictionary(root, dictionary):
+    '''
+    Store the body dictionary of a dataset, before any day file compressed with it.
+    '''
+    if not dictionary:
+        raise ValueError("Cannot save an empty body dictionary.")
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, DICT_FILE)
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(dictionary)
+    os.replace(f"{path}.tmp", path)
+
+
+def _day_files(root, start=None, end=None):
+    # Day directories in the range, found from their names without opening any file
+    files = []
+    for name in os.listdir(root):
+        if not name.startswith("date="):
+            continue
+        try:
+            day = pd.Timestamp(name[len("date="):])
+        except ValueError:
+            continue
+        if (start is None or day >= pd.Timestamp(start).normalize()) and (end is None or day <= pd.Timestamp(end)):
+            path = os.path.join(root, name, PART_FILE)
+            if os.path.exists(path):
+                files.append((day, path))
+    return [path for _, path in sorted(files)]
+
+
+def write_news_parquet(df: pd.DataFrame, path: str, compact: bool = True, dictionary: bytes = None) -> int:
+    '''
+    Write scraped articles to a Parquet file.
+    Parameters:
+        df (pd.DataFrame): Articles as returned by scrape_economic_times.
+        path (str): Path of the Parquet file.
+        compact (bool): Use the compact format (zstd bodies with a trained dictionary, canonical links
+            split into section and slug). Otherwise write plain zstd-compressed Parquet.
+        dictionary (bytes, optional): zstd dictionary for the bodies; trained on df when None.
+    Returns:
+        int: Number of articles written.
+    '''
+    pa = _require(zstd=compact)
+    if not compact:
+        import pyarrow.parquet as pq
+        pq.write_table(pa.Table.from_pandas(df.reset_index(), preserve_index=False), path, compression="zstd")
+        return len(df)
+    if dictionary is None:
+        dictionary = train_dictionary(df["body"].astype(object))
+    schema = compact_schema(dictionary)
+    with compact_writer(path, schema) as writer:
+        if not df.empty:
+            writer.write_table(compact_table(df, schema))
+    logger.info(f"Wrote {len(df)} articles to {path}.")
+    return len(df)
+
+
+def read_news_parquet(path: str, start=None, end=None, columns: list = None,
+                      dtype_backend: str = "pyarrow") -> pd.DataFrame:
+    '''
+    Read articles written by write_news_parquet or write_economic_times_parquet, in either format.
+    Parameters:
+        path (str): Path of the Parquet file, or directory of a date-partitioned dataset.
+        start, end (str | datetime, optional): First and last day to read, inclusive. Only the day
+            files of a dataset within the range are opened.
+        columns (list, optional): Subset of article_id, headline, link, category and body. Bodies
+            are only decompressed when requested.
+        dtype_backend (str): 'pyarrow' for Arrow-backed strings, None for the scraper's dtypes.
+    Returns:
+        pd.DataFrame: The articles indexed by date, as scrape_economic_times returns them. Compact files
+            of the first format version return the canonical links in their short LINK_TEMPLATE form.
+    '''
+    _require(zstd=False)
+    from .news_scraper import NEWS_COLUMNS, NEWS_DTYPES
+
+    columns = list(columns or NEWS_COLUMNS)
+    files = _day_files(path, start, end) if os.path.isdir(path) else [path]
+    frames = [_read_file(file, start, end, columns) for file in files]
+    if frames:
+        df = pd.concat(frames) if len(frames) > 1 else frames[0]
+    else:
+        df = pd.DataFrame({column: [] for column in columns}, index=pd.DatetimeIndex([], name="date"))
+    dtypes = ARROW_DTYPES if dtype_backend == "pyarrow" else NEWS_DTYPES
+    df = df.astype({c: dtypes[c] for c in columns})[columns]
+    df.index = df.index.astype("datetime64[ns]")
+    df.sort_index(inplace=True, kind="stable")
+    return df
+
+
+def _read_file(path, start, end, columns):
+    '''
+    Read one file of either format into a frame indexed by date, without the final dtypes.
+    '''
+    pa = _require(zstd=False)
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_schema(path).metadata or {}
+    compact = metadata.get(_META_FORMAT) in (FORMAT.encode(), _FORMAT_V1.encode())
+    v1 = metadata.get(_META_FORMAT) == _FORMAT_V1.encode()
+    filters = []
+    if start is not None:
+        filters.append(("date", ">=", pd.Timestamp(start)))
+    if end is not None:
+        filters.append(("date", "<", pd.Timestamp(end) + pd.Timedelta(days=1)))
+    read = ["date"] + columns
+    if compact and "link" in columns:
+        # Links of compact files are rebuilt from article_id, section and slug
+        read += ["article_id"] if v1 else ["article_id", "section", "slug"]
+    table = pq.read_table(path, columns=list(dict.fromkeys(read)), filters=filters or None)
+
+    if compact:
+        _require()
+        data = {}
+        if "article_id" in read:
+            ids = table.column("article_id").to_pandas().astype("Int64")
+        if "article_id" in columns:
+            data["article_id"] = ids.astype("string")
+        if "headline" in columns:
+            data["headline"] = table.column("headline").to_pandas()
+        if "link" in columns:
+            template = metadata[_META_LINK].decode()
+            stored = table.column("link").to_pylist()
+            if v1:
+                data["link"] = [
+                    link if link is not None else (template.format(article_id=i) if i is not pd.NA else None)
+                    for link, i in zip(stored, ids)
+                ]
+            else:
+                site = _site(template)
+                data["link"] = [
+                    link if link is not None else (_join_link(site, section, slug, i) if section is not None else None)
+                    for link, section, slug, i in zip(stored, table.column("section").to_pylist(),
+                                                      table.column("slug").to_pylist(), ids)
+                ]
+        if "category" in columns:
+            data["category"] = table.column("category").to_pandas()
+        if "body" in columns:
+            dictionary = metadata[_META_DICT]
+            if _META_DICT_FILE in metadata:
+                # A day file of a dataset: the dictionary is at the root, above the day directories
+                root = os.path.dirname(os.path.dirname(os.path.abspath(path)))
+                with open(os.path.join(root, metadata[_META_DICT_FILE].decode()), "rb") as f:
+                    dictionary = f.read()
+            decompressor = _decompressor(dictionary)
+            data["body"] = pa.array(
+                [decompressor.decompress(b).decode("utf-8") if b is not None else None
+                 for b in table.column("body").to_pylist()],
+                pa.large_string(),
+            ).to_pandas()
+        df = pd.DataFrame({name: pd.Series(values).reset_index(drop=True) for name, values in data.items()})
+    else:
+        df = table.drop(["date"]).to_pandas()
+    df.index = pd.DatetimeIndex(table.column("date").to_pandas(), name="date").astype("datetime64[ns]")
+    return df
@@ -0,0 +1,188 @@
+'''
+Module with the process-wide resource budget shared by every scraper.
+
+Without a budget each scraper sizes its own pools. Installing one with set_budget caps the
+headless Chrome instances and the outbound HTTP requests in flight across all scrapers of the
+process, whichever thread or event loop they run on:
+    - browsers: every Chrome started by the fundamentals and RBI scrapers holds a slot until it quits.
+    - http: every request of the news fetcher and the fundamentals HTTP mode holds a slot while in flight.
+'''
+
+import asyncio
+import collections
+import threading
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+
+
+class Slots:
+    '''
+    Counting semaphore that threads and coroutines of any event loop can wait on together.
+    Released slots are handed to waiters first come, first served.
+
+    Parameters:
+        limit (int): Number of slots.
+    '''
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("A resource limit must be at least 1.")
+        self.limit = limit
+        self._used = 0
+        self._lock = threading.Lock()
+        # Callbacks that hand a released slot to a blocked thread or coroutine
+        self._waiters = collections.deque()
+
+    @property
+    def in_use(self):
+        return self._used
+
+    def try_acquire(self):
+        '''
+        Returns:
+            bool: Whether a slot was free and is now held.
+        '''
+        with self._lock:
+            if self._used < self.limit and not self._waiters:
+                self._used += 1
+                return True
+        return False
+
+    def acquire(self):
+        '''
+        Wait for a slot in a thread.
+        '''
+        with self._lock:
+            if self._used < self.limit and not self._waiters:
+                self._used += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event.set)
+        event.wait()
+
+    async def acquire_async(self):
+        '''
+        Wait for a slot in a coroutine, without blocking the event loop.
+        '''
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        with self._lock:
+            if self._used < self.limit and not self._waiters:
+                self._used += 1
+                return
+            self._waiters.append(wake)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(wake)
+                    handed_over = False
+                except ValueError:
+                    # The slot was already handed to this waiter
+                    handed_over = True
+            if handed_over:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                # The slot passes straight to the next waiter, _used stays the same
+                self._waiters.popleft()()
+            else:
+                self._used -= 1
+
+    @contextmanager
+    def hold(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def hold_async(self):
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class ResourceBudget:
+    '''
+    Global caps on headless browsers and concurrent outbound HTTP requests.
+
+    Parameters:
+        max_browsers (int): Chrome instances running at the same time across all scrapers.
+        max_http (int): HTTP requests in flight at the same time across all scrapers.
+    '''
+
+    def __init__(self, max_browsers: int = 2, max_http: int = 32):
+        self.browsers = Slots(max_browsers)
+        self.http = Slots(max_http)
+
+    def __repr__(self):
+        return f"ResourceBudget(max_browsers={self.browsers.limit}, max_http={self.http.limit})"
+
+
+_active = None
+
+
+def set_budget(budget):
+    '''
+    Install the budget every scraper draws from.
+    Parameters:
+        budget (ResourceBudget): The budget, or None to remove the caps.
+    Returns:
+        ResourceBudget: The previously installed budget.
+    '''
+    global _active
+    previous = _active
+    _active = budget
+    return previous
+
+
+def get_budget():
+    return _active
+
+
+def _no_op():
+    pass
+
+
+def acquire_browser(blocking=True):
+    '''
+    Take a browser slot before starting Chrome.
+    Parameters:
+        blocking (bool): Wait for a slot when none is free.
+    Returns:
+        callable: Releases the slot; call it once the browser has quit. None when blocking is
+            False and no slot is free. Without a budget every call succeeds at once.
+    '''
+    budget = _active
+    if budget is None:
+        return _no_op
+    if blocking:
+        budget.browsers.acquire()
+    elif not budget.browsers.try_acquire():
+        return None
+    return budget.browsers.release
+
+
+def http_slot():
+    '''
+    Context manager holding an HTTP slot around a blocking request.
+    '''
+    return _active.http.hold() if _active is not None else nullcontext()
+
+
+def http_slot_async():
+    '''
+    Async context manager holding an HTTP slot around a request made from an event loop.
+    '''
+    return _active.http.hold_async() if _active is not None else nullcontext()
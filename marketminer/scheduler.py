@@ -0,0 +1,407 @@
+'''
+Module with the batch scheduler that runs scrape jobs from a declarative spec.
+
+A spec (JSON or TOML) lists jobs of three kinds, each split into units that are retried on their own:
+    - news: scrape_economic_times over a date range; a unit is a day.
+    - fundamentals: scrape_fundamentals over a ticker list; a unit is a ticker.
+    - macro: scrape_macro_india; a unit is one of the RBI workbooks.
+All jobs of a run share one ResourceBudget capping browsers and concurrent HTTP requests, and
+write their results below the spec's output directory.
+'''
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime, timedelta, timezone
+
+from . import resources
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("news", "fundamentals", "macro")
+# Options each kind of job accepts besides name, kind, retries and retry_delay
+_OPTIONS = {
+    "news": {"start_date", "end_date", "days", "compact", "cache", "state", "concurrency",
+             "max_days_in_flight", "parser", "parse_workers", "fetch"},
+    "fundamentals": {"tickers", "tickers_file", "workers", "mode", "max_age_days", "check_period", "sections"},
+    "macro": {"download_timeout", "reader", "max_age_days"},
+}
+REPORT_FILE = "last_run.json"
+
+
+@dataclass
+class Job:
+    '''
+    One job of a spec.
+
+    Attributes:
+        name (str): Unique name; the job writes below <output_dir>/<name>.
+        kind (str): 'news', 'fundamentals' or 'macro'.
+        options (dict): Settings of the job, see _OPTIONS and the runner of its kind.
+        retries (int): Extra passes over the units that failed.
+        retry_delay (float): Seconds before the first retry, doubled for every further one.
+    '''
+    name: str
+    kind: str
+    options: dict = field(default_factory=dict)
+    retries: int = 2
+    retry_delay: float = 5.0
+
+
+@dataclass
+class Spec:
+    '''
+    A parsed job spec.
+
+    Attributes:
+        output_dir (str): Directory every job writes to.
+        jobs (list): The jobs, in spec order.
+        max_browsers (int): Chrome instances allowed at the same time across all jobs.
+        max_http (int): HTTP requests allowed in flight at the same time across all jobs.
+        parallel (bool): Run the jobs at the same time rather than one after the other.
+    '''
+    output_dir: str
+    jobs: list
+    max_browsers: int = 2
+    max_http: int = 32
+    parallel: bool = True
+
+
+def load_spec(path: str) -> Spec:
+    '''
+    Read a job spec from a .json or .toml file. Relative paths in the spec are relative to the
+    spec file.
+    Parameters:
+        path (str): Path of the spec file.
+    Returns:
+        Spec: The parsed spec.
+    Raises:
+        ValueError: When the spec is invalid.
+    '''
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ImportError("Reading TOML specs needs Python 3.11+ or tomli: pip install tomli")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    return parse_spec(data, os.path.dirname(os.path.abspath(path)))
+
+
+def parse_spec(data: dict, base_dir: str = ".") -> Spec:
+    '''
+    Validate a job spec given as a dict, e.g.
+        {"output_dir": "data",
+         "resources": {"max_browsers": 2, "max_http": 32},
+         "defaults": {"retries": 2},
+         "jobs": [{"name": "news", "kind": "news", "days": 3},
+                  {"name": "fundamentals", "kind": "fundamentals", "tickers": ["TCS", "INFY"]},
+                  {"name": "macro", "kind": "macro"}]}
+    Parameters:
+        data (dict): The spec.
+        base_dir (str): Directory relative paths are resolved against.
+    Returns:
+        Spec: The parsed spec.
+    Raises:
+        ValueError: When the spec is invalid.
+    '''
+    unknown = set(data) - {"output_dir", "resources", "defaults", "parallel", "jobs"}
+    if unknown:
+        raise ValueError(f"Unknown spec keys: {', '.join(sorted(unknown))}")
+    if not data.get("jobs"):
+        raise ValueError("The spec has no jobs.")
+    budget = data.get("resources", {})
+    unknown = set(budget) - {"max_browsers", "max_http"}
+    if unknown:
+        raise ValueError(f"Unknown resources: {', '.join(sorted(unknown))}")
+    defaults = data.get("defaults", {})
+
+    jobs = []
+    for i, entry in enumerate(data["jobs"]):
+        entry = {**defaults, **entry}
+        kind = entry.pop("kind", None)
+        if kind not in KINDS:
+            raise ValueError(f"Job {i} has kind {kind!r}, expected one of {KINDS}.")
+        name = entry.pop("name", kind)
+        if name in {job.name for job in jobs}:
+            raise ValueError(f"Two jobs are named {name!r}: give them distinct names.")
+        retries = int(entry.pop("retries", 2))
+        retry_delay = float(entry.pop("retry_delay", 5.0))
+        unknown = set(entry) - _OPTIONS[kind]
+        if unknown:
+            raise ValueError(f"Job {name!r} has unknown {kind} options: {', '.join(sorted(unknown))}")
+        if kind == "news" and "start_date" not in entry and "days" not in entry:
+            raise ValueError(f"News job {name!r} needs start_date or days.")
+        if kind == "news" and entry.get("fetch"):
+            from .fetcher import FetchConfig
+            if not isinstance(entry["fetch"], dict):
+                raise ValueError(f"News job {name!r} has a fetch option that is not a table of FetchConfig settings.")
+            unknown = set(entry["fetch"]) - {f.name for f in fields(FetchConfig)}
+            if unknown:
+                raise ValueError(f"News job {name!r} has unknown fetch settings: {', '.join(sorted(unknown))}")
+        if kind == "fundamentals":
+            if "tickers_file" in entry:
+                entry["tickers_file"] = os.path.join(base_dir, entry["tickers_file"])
+            elif not entry.get("tickers"):
+                raise ValueError(f"Fundamentals job {name!r} needs tickers or tickers_file.")
+        jobs.append(Job(name, kind, entry, retries, retry_delay))
+
+    return Spec(
+        output_dir=os.path.join(base_dir, data.get("output_dir", "marketminer_output")),
+        jobs=jobs,
+        max_browsers=int(budget.get("max_browsers", 2)),
+        max_http=int(budget.get("max_http", 32)),
+        parallel=bool(data.get("parallel", True)),
+    )
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+def _ranges(days):
+    '''
+    Group sorted 'YYYY-MM-DD' days into (first, last) runs of consecutive days.
+    '''
+    runs = []
+    for day in map(_as_date, sorted(days)):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+class _NewsRunner:
+    '''
+    News job: days are scraped in runs of consecutive days straight into a date-partitioned
+    Parquet dataset, each day written as soon as it completes.
+    '''
+
+    def __init__(self, job, out):
+        opts = job.options
+        # start_date and days, or the last `days` days up to end_date (default today)
+        if "start_date" in opts:
+            self.start = _as_date(opts["start_date"])
+            if "end_date" in opts:
+                self.end = _as_date(opts["end_date"])
+            elif "days" in opts:
+                self.end = self.start + timedelta(days=int(opts["days"]) - 1)
+            else:
+                self.end = date.today()
+        else:
+            self.end = _as_date(opts["end_date"]) if "end_date" in opts else date.today()
+            self.start = self.end - timedelta(days=int(opts["days"]) - 1)
+        if self.start > self.end:
+            raise ValueError(f"News job {job.name!r} starts after it ends.")
+        self.compact = bool(opts.get("compact", False))
+        self.kwargs = {k: opts[k] for k in ("concurrency", "max_days_in_flight", "parser", "parse_workers") if k in opts}
+        if opts.get("cache"):
+            self.kwargs["cache"] = os.path.join(out, "cache.sqlite")
+        # The checkpoint store makes a retried day fetch only the articles it is still missing
+        if opts.get("state", True):
+            self.kwargs["state"] = os.path.join(out, "state.sqlite")
+        if opts.get("fetch"):
+            from .fetcher import FetchConfig
+            self.kwargs["fetch_config"] = FetchConfig(**opts["fetch"])
+        self.path = os.path.join(out, "economic_times")
+
+    def units(self):
+        n = (self.end - self.start).days + 1
+        return [(self.start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(n)]
+
+    def run(self, units):
+        from .news_scraper import ScrapeError, write_economic_times_parquet
+        failed = {}
+        for first, last in _ranges(units):
+            try:
+                write_economic_times_parquet(self.path, first, last, compact=self.compact, on_error="raise",
+                                             dtype_backend="pyarrow", **self.kwargs)
+            except ScrapeError as e:
+                failed.update(e.failed)
+            except Exception as e:
+                # Stopped midway: the days written so far are kept, the retry skips them through the state
+                failed.update({day: [repr(e)] for day in units if first <= _as_date(day) <= last})
+        return {day: "; ".join(errors) for day, errors in failed.items()}
+
+    def finish(self):
+        return self.path
+
+
+class _FundamentalsRunner:
+    '''
+    Fundamentals job: tickers are scraped through a FundamentalsStore in the output directory,
+    so tickers that succeeded are never scraped again on a retry or a re-run within max_age_days.
+    '''
+
+    def __init__(self, job, out):
+        from .fundamentals_scraper import _sections
+        opts = job.options
+        if "tickers_file" in opts:
+            with open(opts["tickers_file"], encoding="utf-8") as f:
+                tickers = [line.split("#")[0].strip() for line in f]
+        else:
+            tickers = opts["tickers"]
+        self.tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        self.workers = int(opts.get("workers", 4))
+        self.mode = opts.get("mode", "auto")
+        # Checked here so that `marketminer validate` reports a misspelt section
+        self.sections = _sections(opts.get("sections"))
+        self.store_options = {k: opts[k] for k in ("max_age_days", "check_period") if k in opts}
+        self.out = out
+
+    def units(self):
+        return self.tickers
+
+    def run(self, units):
+        from .fundamentals_scraper import FundamentalsSession
+        from .fundamentals_store import FundamentalsStore
+        store = FundamentalsStore(self.out, **self.store_options)
+        # A new session per pass, so no browser holds a budget slot while the job waits to retry
+        with FundamentalsSession(self.workers, mode=self.mode, store=store, sections=self.sections) as session:
+            _, errors = session.scrape_many(units)
+        return {ticker: repr(e) for ticker, e in errors.items()}
+
+    def finish(self):
+        return self.out
+
+
+class _MacroRunner:
+    '''
+    Macro job: the RBI workbooks are read through a MacroStore in the output directory. A pass
+    only reads its own units, so a retry only downloads the workbooks that failed.
+    '''
+
+    def __init__(self, job, out):
+        opts = job.options
+        self.kwargs = {k: opts[k] for k in ("download_timeout", "reader") if k in opts}
+        self.max_age_days = opts.get("max_age_days", 1)
+        self.out = out
+
+    def units(self):
+        from .macros_scraper import _RBI_SOURCES
+        return list(_RBI_SOURCES)
+
+    def run(self, units):
+        from .macro_store import MacroStore
+        from .macros_scraper import _read_sources
+        store = MacroStore(self.out, self.max_age_days)
+        try:
+            _read_sources(units, store=store, **self.kwargs)
+        except Exception as e:
+            # Download failures name their workbooks, any other error fails them all
+            failed = getattr(e, "failed", None)
+            if failed is None:
+                return {source: repr(e) for source in units}
+            return {source: repr(failed[source]) for source in units if source in failed}
+        return {}
+
+    def finish(self):
+        return self.out
+
+
+_RUNNERS = {"news": _NewsRunner, "fundamentals": _FundamentalsRunner, "macro": _MacroRunner}
+
+
+def run_job(job: Job, output_dir: str) -> dict:
+    '''
+    Run one job, retrying its failed units individually.
+    Parameters:
+        job (Job): The job.
+        output_dir (str): Output directory of the run; the job writes below <output_dir>/<name>.
+    Returns:
+        dict: Job report: status ('ok', 'partial' or 'failed'), the number of units, the units still
+            failing with their last error, the number of passes, seconds and the output path.
+    '''
+    start = time.perf_counter()
+    out = os.path.join(output_dir, job.name)
+    os.makedirs(out, exist_ok=True)
+    report = {"kind": job.kind, "status": "failed", "units": 0, "failed": {}, "passes": 0, "output": None}
+    try:
+        runner = _RUNNERS[job.kind](job, out)
+        pending = runner.units()
+        report["units"] = len(pending)
+        for attempt in range(job.retries + 1):
+            if attempt:
+                delay = job.retry_delay * 2 ** (attempt - 1)
+                logger.info(f"[{job.name}] Retrying {len(pending)} failed units in {delay:.0f}s "
+                            f"(retry {attempt} of {job.retries})")
+                time.sleep(delay)
+            try:
+                failed = runner.run(pending)
+            except Exception as e:
+                logger.exception(f"[{job.name}] Pass {attempt + 1} failed")
+                failed = {unit: repr(e) for unit in pending}
+            report["passes"] = attempt + 1
+            pending = sorted(failed)
+            report["failed"] = failed
+            if not pending:
+                break
+        report["output"] = runner.finish()
+        report["status"] = "ok" if not pending else "partial" if len(pending) < report["units"] else "failed"
+    except Exception as e:
+        logger.exception(f"[{job.name}] Job failed")
+        report["error"] = repr(e)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    if report["failed"]:
+        logger.warning(f"[{job.name}] {len(report['failed'])} of {report['units']} units failed: "
+                       f"{', '.join(sorted(report['failed']))}")
+    logger.info(f"[{job.name}] {report['status']} in {report['seconds']:.1f}s, output in {report['output']}")
+    return report
+
+
+def run_spec(spec: Spec | str, only: list = None) -> dict:
+    '''
+    Run the jobs of a spec under one shared resource budget and write the run report to
+    <output_dir>/last_run.json (and <output_dir>/runs/<time>.json).
+    Parameters:
+        spec (Spec | str): The spec, or the path of a spec file.
+        only (list, optional): Names of the jobs to run; all jobs when None.
+    Returns:
+        dict: Run report with a report per job, see run_job.
+    '''
+    spec = load_spec(spec) if isinstance(spec, str) else spec
+    jobs = spec.jobs
+    if only:
+        missing = set(only) - {job.name for job in jobs}
+        if missing:
+            raise ValueError(f"No jobs named {', '.join(sorted(missing))}")
+        jobs = [job for job in jobs if job.name in only]
+
+    os.makedirs(spec.output_dir, exist_ok=True)
+    started_at = datetime.now(timezone.utc)
+    budget = resources.ResourceBudget(spec.max_browsers, spec.max_http)
+    logger.info(f"Running {len(jobs)} jobs with {budget}")
+    previous = resources.set_budget(budget)
+    try:
+        with ThreadPoolExecutor(max_workers=len(jobs) if spec.parallel else 1) as pool:
+            reports = list(pool.map(lambda job: run_job(job, spec.output_dir), jobs))
+    finally:
+        resources.set_budget(previous)
+
+    run = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "output_dir": os.path.abspath(spec.output_dir),
+        "resources": {"max_browsers": spec.max_browsers, "max_http": spec.max_http},
+        "jobs": {job.name: report for job, report in zip(jobs, reports)},
+    }
+    os.makedirs(os.path.join(spec.output_dir, "runs"), exist_ok=True)
+    for path in (os.path.join(spec.output_dir, REPORT_FILE),
+                 os.path.join(spec.output_dir, "runs", f"{started_at:%Y%m%dT%H%M%SZ}.json")):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+    return run
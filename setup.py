@@ -25,10 +25,19 @@ setup(
         "beautifulsoup4",
         "pandas",
         "aiohttp",
-        "nest_asyncio",
         "selenium",
         "openpyxl",
     ],
+    extras_require={
+        "zstd": ["zstandard"],
+        "parquet": ["pyarrow"],
+        "fast": ["selectolax", "lxml", "python-calamine", "pyahocorasick"],
+        "prometheus": ["prometheus-client"],
+        "otel": ["opentelemetry-api"],
+    },
+    entry_points={
+        "console_scripts": ["marketminer=marketminer.cli:main"],
+    },
     python_requires=">=3.7",
     license="MIT",
     classifiers=[
@@ -0,0 +1,128 @@
+'''
+FundamentalsSession under a shared resource budget, with a stub in place of Chrome.
+'''
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from marketminer import fundamentals_scraper as fs
+from marketminer import resources
+
+from fixtures import screener_page
+
+webdriver = pytest.importorskip("selenium.webdriver")
+
+
+class _StubChrome:
+    '''
+    Just enough of a webdriver for scrape_fundamentals: the page is already expanded.
+    '''
+    page_source = screener_page(1)
+
+    def __init__(self, options=None):
+        pass
+
+    def get(self, url):
+        time.sleep(0.01)
+
+    def find_element(self, by, value):
+        return object()
+
+    def find_elements(self, by, value):
+        return []
+
+    def execute_script(self, script, *args):
+        return -1
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(webdriver, "Chrome", _StubChrome)
+    budget = resources.ResourceBudget(max_browsers=2)
+    previous = resources.set_budget(budget)
+    yield budget
+    resources.set_budget(previous)
+
+
+def test_session_waits_for_slots_held_elsewhere_without_deadlock(budget):
+    # Another job holds every browser slot for a moment, as two parallel RBI downloads do
+    budget.browsers.acquire()
+    budget.browsers.acquire()
+
+    def release_later():
+        time.sleep(0.3)
+        budget.browsers.release()
+        budget.browsers.release()
+
+    holder = threading.Thread(target=release_later)
+    holder.start()
+    outcome = {}
+    scraper = threading.Thread(
+        target=lambda: outcome.update(zip(("results", "errors"), fs.scrape_fundamentals_many(
+            [f"T{i}" for i in range(8)], workers=4, mode="browser"))),
+        daemon=True,
+    )
+    scraper.start()
+    scraper.join(timeout=30)
+    holder.join()
+    assert not scraper.is_alive(), "scrape_fundamentals_many deadlocked on the browser budget"
+    assert len(outcome["results"]) == 8 and not outcome["errors"]
+    assert budget.browsers.in_use == 0
+
+
+def test_session_never_exceeds_the_budget(budget, monkeypatch):
+    peak = []
+    start = fs._new_driver
+
+    def counting_new_driver(release=None):
+        driver = start(release)
+        peak.append(budget.browsers.in_use)
+        return driver
+
+    monkeypatch.setattr(fs, "_new_driver", counting_new_driver)
+    results, errors = fs.scrape_fundamentals_many([f"T{i}" for i in range(8)], workers=4, mode="browser")
+    assert len(results) == 8 and not errors
+    assert max(peak) <= 2
+    assert budget.browsers.in_use == 0
+
+
+def test_page_timeout_keeps_the_browser(budget, monkeypatch):
+    from selenium.common.exceptions import TimeoutException
+    started = []
+
+    class SlowChrome(_StubChrome):
+        def __init__(self, options=None):
+            started.append(self)
+
+        def get(self, url):
+            if "SLOW" in url:
+                raise TimeoutException("page load timed out")
+
+    monkeypatch.setattr(webdriver, "Chrome", SlowChrome)
+    results, errors = fs.scrape_fundamentals_many(["SLOW", "T1", "T2"], workers=1, mode="browser")
+    assert isinstance(errors["SLOW"], TimeoutException)
+    assert len(results) == 2
+    assert len(started) == 1
+    assert budget.browsers.in_use == 0
+
+
+def test_browser_that_fails_to_start_gives_its_slot_back(budget, monkeypatch):
+    from selenium.common.exceptions import WebDriverException
+
+    def broken(options=None):
+        raise WebDriverException("chrome not found")
+
+    monkeypatch.setattr(webdriver, "Chrome", broken)
+    results, errors = fs.scrape_fundamentals_many(["T1", "T2"], workers=2, mode="browser")
+    assert not results
+    assert all(isinstance(e, WebDriverException) for e in errors.values())
+    assert budget.browsers.in_use == 0
@@ -0,0 +1,73 @@
+'''
+ResponseCache on its own and behind the Fetcher, against a local server that supports ETags.
+'''
+
+import asyncio
+import os
+import sys
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from marketminer.fetcher import Fetcher, FetchConfig
+from marketminer.http_cache import ResponseCache
+
+from servers import _Server
+
+
+class _ETagServer(_Server):
+    '''
+    Serves /page with an ETag and answers 304 when the client already has it.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.statuses = []
+
+    def _routes(self, app):
+        app.router.add_get("/page", self._page)
+
+    async def _page(self, request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            self.statuses.append(304)
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        self.statuses.append(200)
+        return web.Response(text="page body", headers={"ETag": '"v1"'})
+
+
+async def _fetch(cache, url, ttl):
+    async with Fetcher(FetchConfig(initial_rate=1000), cache=cache) as fetcher:
+        return await fetcher.fetch(url, ttl=ttl)
+
+
+def test_stale_entries_are_revalidated(tmp_path):
+    with _ETagServer() as server, ResponseCache(str(tmp_path / "cache.sqlite")) as cache:
+        url = f"{server.url}/page"
+        assert asyncio.run(_fetch(cache, url, ttl=0)) == "page body"
+        # Expired at once: the second fetch sends the ETag and gets the body from the cache
+        assert asyncio.run(_fetch(cache, url, ttl=3600)) == "page body"
+        # Fresh now: no request at all
+        assert asyncio.run(_fetch(cache, url, ttl=3600)) == "page body"
+        assert server.statuses == [200, 304]
+        assert cache.get(url).fresh
+
+
+def test_hits_are_recorded_for_eviction_without_a_write_each(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path, max_bytes=None)
+    body = os.urandom(2000).hex()
+    for name in ("old", "new"):
+        cache.put(name, body)
+    accessed = dict(cache._conn.execute("SELECT url, accessed_at FROM responses"))
+    cache.get("old")
+    assert dict(cache._conn.execute("SELECT url, accessed_at FROM responses")) == accessed
+
+    # The pending hit makes 'new' the least recently used entry
+    cache.evict(target_bytes=cache._total // 2)
+    assert cache.get("old") is not None
+    assert cache.get("new") is None
+    cache.close()
+
+    with ResponseCache(path) as reopened:
+        assert reopened.get("old").text == body
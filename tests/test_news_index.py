@@ -0,0 +1,61 @@
+'''
+NewsIndex lookups on a small hand-written frame, with both matcher backends.
+'''
+
+import pandas as pd
+import pytest
+
+from marketminer.news_index import NewsIndex, ahocorasick
+
+_ALIASES = {"INFY": ["Infosys", "INFY"], "TCS": ["Tata Consultancy Services", "TCS"], "rbi": "RBI"}
+
+_BACKENDS = ["python"] + (["pyahocorasick"] if ahocorasick is not None else [])
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "article_id": ["1", "2", "3", "4"],
+            "headline": ["Infosys beats estimates", "RBI holds rates", "Tata Consultancy Services hires",
+                         "Infosystems is not a match"],
+            "body": ["INFY shares rose. Infosys, again.", "The rbi said TCS and Infosys", "", None],
+        },
+        index=pd.DatetimeIndex(["2024-04-01", "2024-04-15", "2024-05-02", "2024-05-03"], name="date"),
+    )
+
+
+@pytest.fixture(params=_BACKENDS)
+def index(request, tmp_path):
+    with NewsIndex(str(tmp_path / "index.sqlite"), _ALIASES, backend=request.param) as index:
+        index.add(_frame())
+        yield index
+
+
+def test_query_by_entity_or_alias_within_a_range(index):
+    assert index.query("INFY") == ["1", "2"]
+    assert index.query("infosys") == ["1", "2"]
+    assert index.query("TCS", "2024-05-01", "2024-05-31") == ["3"]
+    assert index.query("TCS", end="2024-04-30") == ["2"]
+    with pytest.raises(KeyError):
+        index.query("WIPRO")
+
+
+def test_mentions_count_every_alias_on_word_boundaries(index):
+    df = index.mentions(["INFY"])
+    assert df["mentions"].tolist() == [3, 1]
+    assert list(df.index.strftime("%Y-%m-%d")) == ["2024-04-01", "2024-04-15"]
+    # 'Infosystems' in article 4 is not Infosys
+    assert "4" not in set(index.mentions()["article_id"])
+
+
+def test_adding_the_same_articles_again_is_a_no_op(index):
+    assert len(index) == 4
+    assert index.add(_frame()) == 0
+    assert index.query("INFY") == ["1", "2"]
+
+
+def test_rescan_picks_up_new_aliases(index):
+    index.add_aliases({"INFY": ["Infosys", "INFY", "Infosystems"]})
+    assert index.query("INFY") == ["1", "2"]
+    assert index.add(_frame(), rescan=True) == 4
+    assert index.query("INFY") == ["1", "2", "4"]
@@ -0,0 +1,111 @@
+'''
+Resuming and deduplicating Economic Times scrapes with a NewsState, against a local stand-in site.
+'''
+
+import os
+import re
+import sys
+
+import pytest
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from marketminer import news_scraper as ns
+from marketminer.fetcher import FetchConfig
+from marketminer.news_state import NewsState
+
+from fixtures import archive_page
+from servers import EconomicTimesServer
+
+# One story linked from every day's archive
+_SHARED = 999
+
+
+class _Server(EconomicTimesServer):
+    '''
+    Archive pages that all link the _SHARED story, and articles that fail (503) or are gone (404) on demand.
+    '''
+
+    def __init__(self, n_articles):
+        super().__init__(n_articles)
+        self.failing = set()
+        self.gone = set()
+        self.fetched = []
+
+    async def _archive(self, request):
+        serial = int(re.search(r"starttime-(\d+)", request.match_info["rest"]).group(1))
+        shared = f'<li><a href="/markets/shared/articleshow/{_SHARED}.cms">Shared story</a></li>'
+        page = archive_page(serial, self.n_articles).replace("</ul>", f"{shared}</ul>")
+        return web.Response(text=page, content_type="text/html")
+
+    async def _article(self, request):
+        article_id = int(request.match_info["article_id"])
+        self.fetched.append(article_id)
+        if article_id in self.gone:
+            return web.Response(status=404)
+        if article_id in self.failing:
+            return web.Response(status=503)
+        return await super()._article(request)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with _Server(n_articles=5) as server:
+        monkeypatch.setattr(ns, "_BASE", server.url)
+        yield server
+
+
+@pytest.fixture
+def state(tmp_path):
+    with NewsState(str(tmp_path / "state.sqlite")) as state:
+        yield state
+
+
+_CONFIG = FetchConfig(initial_rate=1000, max_rate=5000, max_retries=0)
+
+
+def _ids(server, day):
+    serial = ns.date_to_excel_serial(ns._parse_date(day).date())
+    return [serial * 1000 + i for i in range(server.n_articles)]
+
+
+def test_resume_retries_failed_day_without_fetching_stored_articles(server, state):
+    failing = _ids(server, "2024-01-02")[0]
+    server.failing.add(failing)
+    df = ns.scrape_economic_times("2024-01-01", "2024-01-03", fetch_config=_CONFIG, state=state)
+    assert set(df.attrs["failed"]) == {"2024-01-02"}
+    assert state.completed_days(ns._parse_date("2024-01-01"), ns._parse_date("2024-01-03")) == {"2024-01-01", "2024-01-03"}
+
+    server.failing.clear()
+    server.fetched.clear()
+    df = ns.update_economic_times(state, end_date="2024-01-03", fetch_config=_CONFIG)
+    # Only the article that failed is fetched again, from the earliest incomplete day on
+    assert server.fetched == [failing]
+    assert not df.attrs["failed"]
+    assert state.first_incomplete_day(ns._parse_date("2024-01-01"), ns._parse_date("2024-01-03")) is None
+    assert str(failing) in set(df["article_id"])
+
+
+def test_story_linked_from_several_days_is_fetched_once(server, state):
+    df = ns.scrape_economic_times("2024-01-01", "2024-01-03", fetch_config=_CONFIG, state=state)
+    assert server.fetched.count(_SHARED) == 1
+    assert list(df["article_id"]).count(str(_SHARED)) == 1
+    assert len(server.fetched) == len(set(server.fetched)) == len(df)
+
+
+def test_gone_articles_do_not_keep_the_day_incomplete(server, state):
+    gone = _ids(server, "2024-01-01")[1]
+    server.gone.add(gone)
+    df = ns.scrape_economic_times("2024-01-01", "2024-01-01", fetch_config=_CONFIG, state=state)
+    assert not df.attrs["failed"]
+    assert str(gone) not in set(df["article_id"])
+    assert state.completed_days(ns._parse_date("2024-01-01"), ns._parse_date("2024-01-01")) == {"2024-01-01"}
+
+
+def test_update_of_a_complete_store_fetches_nothing(server, state):
+    ns.scrape_economic_times("2024-01-01", "2024-01-02", fetch_config=_CONFIG, state=state)
+    server.fetched.clear()
+    df = ns.update_economic_times(state, end_date="2024-01-02", fetch_config=_CONFIG)
+    assert df.empty
+    assert server.fetched == []
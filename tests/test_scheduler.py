@@ -0,0 +1,99 @@
+'''
+Job retries and report status of the scheduler, with stub runners and a stubbed RBI download.
+'''
+
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from marketminer import macros_scraper, scheduler
+from marketminer.scheduler import Job, parse_spec, run_job
+
+from fixtures import rbi_workbook
+
+
+class _FlakyRunner:
+    '''
+    Units fail until they have been tried `failures[unit]` times; 'broken' never succeeds.
+    '''
+    failures = {"a": 0, "b": 1, "c": 2}
+    passes = []
+
+    def __init__(self, job, out):
+        self.tries = {}
+
+    def units(self):
+        return sorted(self.failures)
+
+    def run(self, units):
+        type(self).passes.append(list(units))
+        failed = {}
+        for unit in units:
+            self.tries[unit] = self.tries.get(unit, 0) + 1
+            if self.tries[unit] <= self.failures[unit]:
+                failed[unit] = f"{unit} failed"
+        return failed
+
+    def finish(self):
+        return "out"
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    monkeypatch.setitem(scheduler._RUNNERS, "news", _FlakyRunner)
+    monkeypatch.setattr(_FlakyRunner, "passes", [])
+    return _FlakyRunner
+
+
+def test_retries_only_the_failed_units(flaky, tmp_path):
+    report = run_job(Job("flaky", "news", retries=2, retry_delay=0), str(tmp_path))
+    assert report["status"] == "ok"
+    assert report["passes"] == 3
+    assert flaky.passes == [["a", "b", "c"], ["b", "c"], ["c"]]
+
+
+def test_units_still_failing_make_the_job_partial(flaky, tmp_path):
+    report = run_job(Job("flaky", "news", retries=1, retry_delay=0), str(tmp_path))
+    assert report["status"] == "partial"
+    assert report["failed"] == {"c": "c failed"}
+    assert report["output"] == "out"
+
+
+def test_no_unit_succeeding_fails_the_job(flaky, monkeypatch, tmp_path):
+    monkeypatch.setattr(flaky, "failures", {"a": 5, "b": 5})
+    report = run_job(Job("flaky", "news", retries=1, retry_delay=0), str(tmp_path))
+    assert report["status"] == "failed"
+    assert sorted(report["failed"]) == ["a", "b"]
+
+
+def test_macro_retry_only_downloads_the_failed_workbook(monkeypatch, tmp_path):
+    workbooks = {}
+    for source, (_, main) in macros_scraper._RBI_SOURCES.items():
+        workbooks[source] = str(tmp_path / f"{source}.xlsx")
+        rbi_workbook(workbooks[source], main, 30)
+    downloads = []
+
+    def download(button_text, filename, download_dir, timeout=None):
+        source = next(s for s, (text, _) in macros_scraper._RBI_SOURCES.items() if text == button_text)
+        downloads.append(source)
+        if source == "other_macroeconomic_indicators" and downloads.count(source) == 1:
+            raise TimeoutError("download did not finish")
+        os.makedirs(download_dir, exist_ok=True)
+        return shutil.copy(workbooks[source], os.path.join(download_dir, filename))
+
+    monkeypatch.setattr(macros_scraper, "download_rbi_file", download)
+    spec = parse_spec({"jobs": [{"name": "rbi", "kind": "macro", "retries": 1, "retry_delay": 0}]}, str(tmp_path))
+    report = run_job(spec.jobs[0], spec.output_dir)
+    assert report["status"] == "ok"
+    assert report["passes"] == 2
+    assert sorted(downloads) == ["macroeconomic_indicators", "other_macroeconomic_indicators",
+                                 "other_macroeconomic_indicators"]
+
+
+def test_spec_rejects_unknown_fetch_settings():
+    with pytest.raises(ValueError, match="unknown fetch settings: max_rat"):
+        parse_spec({"jobs": [{"kind": "news", "days": 1, "fetch": {"max_rat": 5}}]})